@@ -17,6 +17,7 @@ except ImportError:
 
 from bluezero import constants
 from bluezero import dbus_tools
+from bluezero import instrumentation
 from bluezero import device
 
 dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
@@ -397,11 +398,13 @@ class Profile:
         self.profile_object = self.bus.get_object(
             constants.BLUEZ_SERVICE_NAME,
             self.profile_path)
-        self.profile_methods = dbus.Interface(
-            self.profile_object,
+        self.profile_methods = instrumentation.wrap_interface(
+            dbus.Interface(self.profile_object,
+                           constants.GATT_PROFILE_IFACE),
             constants.GATT_PROFILE_IFACE)
-        self.profile_props = dbus.Interface(self.profile_object,
-                                            dbus.PROPERTIES_IFACE)
+        self.profile_props = instrumentation.wrap_interface(
+            dbus.Interface(self.profile_object, dbus.PROPERTIES_IFACE),
+            dbus.PROPERTIES_IFACE)
 
     def release(self):
         """
@@ -444,18 +447,19 @@ class GattManager:
         """
         GATT Manager Initialisation.
 
-        :param manager_path: dbus path to the GATT Manager.
+        :param adapter_addr: Address, name or DBus path of the adapter.
         """
-        self.manager_path = dbus_tools.get_dbus_path(adapter_addr)
+        self.manager_path = dbus_tools.get_adapter_path(adapter_addr)
         self.bus = dbus.SystemBus()
         self.manager_obj = self.bus.get_object(
             constants.BLUEZ_SERVICE_NAME,
             self.manager_path)
-        self.manager_methods = dbus.Interface(
-            self.manager_obj,
+        self.manager_methods = instrumentation.wrap_interface(
+            dbus.Interface(self.manager_obj, constants.GATT_MANAGER_IFACE),
             constants.GATT_MANAGER_IFACE)
-        self.manager_props = dbus.Interface(self.manager_obj,
-                                            dbus.PROPERTIES_IFACE)
+        self.manager_props = instrumentation.wrap_interface(
+            dbus.Interface(self.manager_obj, dbus.PROPERTIES_IFACE),
+            dbus.PROPERTIES_IFACE)
 
     def register_application(self, application, options):
         """
@@ -2,6 +2,8 @@
 
 from __future__ import absolute_import, print_function, unicode_literals
 
+import time
+
 # D-Bus imports
 import dbus
 
@@ -9,6 +11,7 @@ import dbus
 from bluezero import constants
 from bluezero import dbus_tools
 from bluezero import async_tools
+from bluezero import instrumentation
 
 import logging
 try:  # Python 2.7+
@@ -24,25 +27,19 @@ logger.setLevel(logging.WARNING)
 logger.addHandler(NullHandler())
 
 
-class AdapterError(Exception):
-    pass
+# Defined with the adapter look up functions of dbus_tools
+AdapterError = dbus_tools.AdapterError
 
 
 def list_adapters():
     """Return list of adapters address available on system."""
-    paths = []
     addresses = []
-    bus = dbus.SystemBus()
-    manager = dbus.Interface(
-        bus.get_object(constants.BLUEZ_SERVICE_NAME, '/'),
-        constants.DBUS_OM_IFACE)
-    manager_obj = manager.GetManagedObjects()
-    for path, ifaces in manager_obj.items():
-        if constants.ADAPTER_INTERFACE in ifaces:
-            paths.append(path)
-            addresses.append(
-                manager_obj[path][constants.ADAPTER_INTERFACE]['Address'])
-    if len(paths) < 1:
+    for path in dbus_tools.get_adapter_paths():
+        adapter_props = dbus_tools.get_dbus_iface(
+            dbus.PROPERTIES_IFACE, dbus_tools.get_dbus_obj(path))
+        addresses.append(adapter_props.Get(constants.ADAPTER_INTERFACE,
+                                           'Address'))
+    if len(addresses) < 1:
         raise AdapterError('No Bluetooth adapter found')
     else:
         return addresses
@@ -68,38 +65,51 @@ class Adapter:
         Creates the interface to the local Bluetooth adapter device.
         If address is not given then first device is list is used.
 
-        :param adapter_addr: Address of Bluetooth adapter to use.
+        :param adapter_addr: Address of Bluetooth adapter to use. The
+                             adapter name (e.g. ``'hci1'``) or DBus path can
+                             also be given.
         """
         self.bus = dbus.SystemBus()
 
         if adapter_addr is None:
-            adapters = list_adapters()
-            if len(adapters) > 0:
-                adapter_addr = adapters[0]
-
-        self.path = dbus_tools.get_dbus_path(adapter=adapter_addr)
+            adapter_paths = dbus_tools.get_adapter_paths()
+            if len(adapter_paths) < 1:
+                raise AdapterError('No Bluetooth adapter found')
+            self.path = adapter_paths[0]
+        else:
+            self.path = dbus_tools.get_adapter_path(adapter_addr)
         self.adapter_object = self.bus.get_object(
             constants.BLUEZ_SERVICE_NAME,
             self.path)
-        self.adapter_methods = dbus.Interface(self.adapter_object,
-                                              constants.ADAPTER_INTERFACE)
+        self.adapter_methods = instrumentation.wrap_interface(
+            dbus.Interface(self.adapter_object, constants.ADAPTER_INTERFACE),
+            constants.ADAPTER_INTERFACE)
 
-        self.adapter_props = dbus.Interface(self.adapter_object,
-                                            dbus.PROPERTIES_IFACE)
+        self.adapter_props = instrumentation.wrap_interface(
+            dbus.Interface(self.adapter_object, dbus.PROPERTIES_IFACE),
+            dbus.PROPERTIES_IFACE)
 
-        self._nearby_timeout = 10
-        self._nearby_count = 0
         self.mainloop = async_tools.EventLoop()
 
-        self.bus.add_signal_receiver(dbus_tools.interfaces_added,
-                                     dbus_interface=constants.DBUS_OM_IFACE,
-                                     signal_name='InterfacesAdded')
-
-        self.bus.add_signal_receiver(dbus_tools.properties_changed,
-                                     dbus_interface=dbus.PROPERTIES_IFACE,
-                                     signal_name='PropertiesChanged',
-                                     arg0=constants.DEVICE_INTERFACE,
-                                     path_keyword='path')
+        self._last_seen = None
+        self._tracking_start = None
+        self._prune_timer = None
+
+        self.bus.add_signal_receiver(
+            instrumentation.wrap_signal_handler(dbus_tools.interfaces_added,
+                                                constants.DBUS_OM_IFACE,
+                                                'InterfacesAdded'),
+            dbus_interface=constants.DBUS_OM_IFACE,
+            signal_name='InterfacesAdded')
+
+        self.bus.add_signal_receiver(
+            instrumentation.wrap_signal_handler(dbus_tools.properties_changed,
+                                                dbus.PROPERTIES_IFACE,
+                                                'PropertiesChanged'),
+            dbus_interface=dbus.PROPERTIES_IFACE,
+            signal_name='PropertiesChanged',
+            arg0=constants.DEVICE_INTERFACE,
+            path_keyword='path')
 
     @property
     def address(self):
@@ -201,31 +211,616 @@ class Adapter:
         return self.adapter_props.Get(
             constants.ADAPTER_INTERFACE, 'Discovering')
 
-    def _discovering_timeout(self):
-        """Test to see if discovering should stop."""
-        self._nearby_count += 1
-        if self._nearby_count > self._nearby_timeout:
-            self.stop_discovery()
-            self.mainloop.quit()
-            return False
-        return True
-
     def nearby_discovery(self, timeout=10):
-        """Start discovery of nearby Bluetooth devices."""
-        self._nearby_timeout = timeout
-        self._nearby_count = 0
+        """Start discovery of nearby Bluetooth devices.
+
+        This blocks in the event loop until the timeout has expired. Use
+        :class:`DiscoverySession` to scan without blocking.
 
-        # GLib.timeout_add(1000, self._discovering_timeout)
-        self.mainloop.add_timer(1000, self._discovering_timeout)
-        self.adapter_methods.StartDiscovery()
+        :param timeout: Time in seconds to scan for
+        """
+        session = DiscoverySession(self, timeout,
+                                   timeout_cb=lambda session: self.quit())
+        session.start()
         self.mainloop.run()
 
     def stop_discovery(self):
         """Stop scanning of nearby Bluetooth devices."""
         self.adapter_methods.StopDiscovery()
 
+    def remove_device(self, device):
+        """Remove a remote device and its pairing information from BlueZ.
+
+        :param device: Address or DBus object path of the remote device
+        """
+        if not device.startswith('/'):
+            device = _device_path(self.path, device)
+        self.adapter_methods.RemoveDevice(device)
+
+    def prune_devices(self, max_age=None, min_rssi=None, unpaired=False,
+                      keep_paired=True):
+        """Remove stale devices from the BlueZ device cache in one pass.
+
+        The device cache grows during continuous scanning and makes every
+        ``GetManagedObjects`` call slower. A device is removed if it matches
+        any of the given policies. Connected devices are never removed.
+
+        The time a device was last seen is only known from the first call
+        of this method (or :meth:`start_pruning`) onwards. Devices that have
+        not been seen since then count as seen at that time.
+
+        :param max_age: Remove devices not seen for this many seconds
+        :param min_rssi: Remove devices with a weaker RSSI than this.
+                         Devices without an RSSI (not currently
+                         advertising) are also removed.
+        :param unpaired: Remove all devices that are not paired
+        :param keep_paired: Never remove paired or trusted devices
+        :return: List of the addresses of the removed devices
+
+        :Example:
+
+        >>> from bluezero import adapter
+        >>> dongle = adapter.Adapter()
+        >>> dongle.prune_devices(max_age=300, min_rssi=-90)
+
+        """
+        self._track_devices()
+        now = time.monotonic()
+        removed = []
+        mngd_objs = dbus_tools.get_managed_objects()
+        for path, ifaces in mngd_objs.items():
+            props = ifaces.get(constants.DEVICE_INTERFACE)
+            if props is None or not path.startswith(self.path + '/'):
+                continue
+            if props.get('Connected', False):
+                continue
+            paired = props.get('Paired', False) or props.get('Trusted', False)
+            if keep_paired and paired:
+                continue
+            stale = unpaired and not props.get('Paired', False)
+            if max_age is not None:
+                seen = self._last_seen.get(path, self._tracking_start)
+                stale = stale or now - seen > max_age
+            if min_rssi is not None:
+                rssi = props.get('RSSI')
+                stale = stale or rssi is None or rssi < min_rssi
+            if stale:
+                self._last_seen.pop(path, None)
+                self.adapter_methods.RemoveDevice(
+                    path,
+                    reply_handler=lambda: None,
+                    error_handler=self._remove_error)
+                removed.append(_device_address(path))
+        if removed:
+            logger.info('Pruned {} devices from {}'.format(len(removed),
+                                                           self.path))
+        return removed
+
+    def start_pruning(self, interval, **policy):
+        """Prune the device cache periodically from the event loop.
+
+        :param interval: Seconds between each prune
+        :param policy: Keyword arguments given to :meth:`prune_devices`
+        """
+        self.stop_pruning()
+        self._track_devices()
+
+        def _prune():
+            self.prune_devices(**policy)
+            return True
+
+        self._prune_timer = self.mainloop.add_timer(int(interval * 1000),
+                                                    _prune)
+
+    def stop_pruning(self):
+        """Stop the periodic pruning started by :meth:`start_pruning`."""
+        if self._prune_timer is not None:
+            self.mainloop.remove_timer(self._prune_timer)
+            self._prune_timer = None
+
+    def _track_devices(self):
+        """Start recording when devices on this adapter were last seen."""
+        if self._last_seen is not None:
+            return
+        self._last_seen = {}
+        self._tracking_start = time.monotonic()
+        self.bus.add_signal_receiver(
+            instrumentation.wrap_signal_handler(self._device_added,
+                                                constants.DBUS_OM_IFACE,
+                                                'InterfacesAdded'),
+            dbus_interface=constants.DBUS_OM_IFACE,
+            signal_name='InterfacesAdded')
+        self.bus.add_signal_receiver(
+            instrumentation.wrap_signal_handler(self._device_removed,
+                                                constants.DBUS_OM_IFACE,
+                                                'InterfacesRemoved'),
+            dbus_interface=constants.DBUS_OM_IFACE,
+            signal_name='InterfacesRemoved')
+        self.bus.add_signal_receiver(
+            instrumentation.wrap_signal_handler(self._device_changed,
+                                                dbus.PROPERTIES_IFACE,
+                                                'PropertiesChanged'),
+            dbus_interface=dbus.PROPERTIES_IFACE,
+            signal_name='PropertiesChanged',
+            arg0=constants.DEVICE_INTERFACE,
+            path_keyword='path')
+
+    def _device_added(self, path, interfaces):
+        if constants.DEVICE_INTERFACE in interfaces and \
+                path.startswith(self.path + '/'):
+            self._last_seen[path] = time.monotonic()
+
+    def _device_removed(self, path, interfaces):
+        if constants.DEVICE_INTERFACE in interfaces:
+            self._last_seen.pop(path, None)
+
+    def _device_changed(self, interface, changed, invalidated, path):
+        if path.startswith(self.path + '/'):
+            self._last_seen[path] = time.monotonic()
+
+    def _remove_error(self, error):
+        logger.warning('RemoveDevice on {} failed: {}'.format(self.path,
+                                                              error))
+
     def run(self):
         self.mainloop.run()
 
     def quit(self):
         self.mainloop.quit()
+
+
+def _device_path(adapter_path, device_addr):
+    """Return the BlueZ object path of a device on the given adapter."""
+    return '{}/dev_{}'.format(adapter_path,
+                              device_addr.upper().replace(':', '_'))
+
+
+def _device_address(device_path):
+    """Return the device address from a BlueZ device object path."""
+    return device_path.rsplit('/dev_', 1)[-1].replace('_', ':')
+
+
+class AdapterPool:
+    """Spread connections and scanning across several Bluetooth adapters.
+
+    The adapter with the fewest links (connected devices plus reservations
+    made by :meth:`acquire`) is chosen for each new connection. A per-adapter
+    link limit can be set. If an adapter is removed from the system then
+    the devices that were using it are moved to the remaining adapters and
+    ``failover_cb`` is called for each of them.
+
+    :Example:
+
+    >>> from bluezero import adapter
+    >>> from bluezero import central
+    >>> pool = adapter.AdapterPool(max_links=7)
+    >>> sensor = central.Central('F7:17:E4:09:C0:C6', adapter_pool=pool)
+
+    """
+
+    def __init__(self, adapter_addrs=None, max_links=None, failover_cb=None):
+        """Default initialiser.
+
+        :param adapter_addrs: Optional list of adapter addresses to use.
+                              All adapters on the system are used if None.
+        :param max_links: Maximum links per adapter. Either an integer for
+                          all adapters or a dictionary keyed on adapter
+                          address.
+        :param failover_cb: Called as ``failover_cb(device_addr, old_addr,
+                            new_addr)`` when an adapter disappears.
+                            ``new_addr`` is None if no adapter was available.
+        """
+        self.bus = dbus.SystemBus()
+        self.max_links = max_links
+        self.failover_cb = failover_cb
+        if adapter_addrs is None:
+            self._wanted = None
+        else:
+            self._wanted = set(addr.upper() for addr in adapter_addrs)
+
+        self._adapters = {}
+        self._devices = {}
+        self._connected = {}
+        self._reserved = {}
+        self._scans = {}
+        self.refresh()
+
+        self.bus.add_signal_receiver(
+            instrumentation.wrap_signal_handler(self._interfaces_added,
+                                                constants.DBUS_OM_IFACE,
+                                                'InterfacesAdded'),
+            dbus_interface=constants.DBUS_OM_IFACE,
+            signal_name='InterfacesAdded')
+        self.bus.add_signal_receiver(
+            instrumentation.wrap_signal_handler(self._interfaces_removed,
+                                                constants.DBUS_OM_IFACE,
+                                                'InterfacesRemoved'),
+            dbus_interface=constants.DBUS_OM_IFACE,
+            signal_name='InterfacesRemoved')
+        self.bus.add_signal_receiver(
+            instrumentation.wrap_signal_handler(self._properties_changed,
+                                                dbus.PROPERTIES_IFACE,
+                                                'PropertiesChanged'),
+            dbus_interface=dbus.PROPERTIES_IFACE,
+            signal_name='PropertiesChanged',
+            arg0=constants.DEVICE_INTERFACE,
+            path_keyword='path')
+
+    def refresh(self):
+        """Rebuild the adapter and link tables from the BlueZ object tree."""
+        mngd_objs = dbus_tools.get_managed_objects()
+        self._adapters = {}
+        self._devices = {}
+        self._connected = {}
+        for path, ifaces in mngd_objs.items():
+            if constants.ADAPTER_INTERFACE in ifaces:
+                self._add_adapter(path, ifaces[constants.ADAPTER_INTERFACE])
+        for path, ifaces in mngd_objs.items():
+            if constants.DEVICE_INTERFACE in ifaces:
+                self._add_device(path, ifaces[constants.DEVICE_INTERFACE])
+        for device_path, adapter_path in list(self._reserved.items()):
+            if adapter_path not in self._adapters:
+                del self._reserved[device_path]
+        if len(self._adapters) < 1:
+            raise AdapterError('No Bluetooth adapter found')
+
+    @property
+    def adapters(self):
+        """Return the addresses of the adapters in the pool."""
+        return [self._adapters[path] for path in sorted(self._adapters)]
+
+    def link_count(self, adapter_addr):
+        """Return the number of links in use on an adapter.
+
+        :param adapter_addr: Address of the adapter
+        """
+        return self._link_count(self._find_path(adapter_addr))
+
+    def scan_count(self, adapter_addr):
+        """Return the number of scans assigned to an adapter.
+
+        :param adapter_addr: Address of the adapter
+        """
+        return self._scans[self._find_path(adapter_addr)]
+
+    def choose(self, device_addr):
+        """Choose the adapter :meth:`acquire` would use, without reserving.
+
+        :param device_addr: Address of the remote device
+        :return: Address of the adapter to use
+        """
+        return self._adapters[self._choose(device_addr.upper())]
+
+    def acquire(self, device_addr, adapter_addr=None):
+        """Reserve a link for a device on the least loaded adapter.
+
+        Adapters that already know about the device (e.g. found it during
+        discovery) are preferred.
+
+        :param device_addr: Address of the remote device
+        :param adapter_addr: (optional) Address of the adapter to reserve
+                             the link on, e.g. one given by :meth:`choose`
+        :return: Address of the adapter to use
+        """
+        device_addr = device_addr.upper()
+        if adapter_addr is None:
+            adapter_path = self._choose(device_addr)
+        else:
+            adapter_path = self._find_path(adapter_addr)
+            if (_device_path(adapter_path, device_addr) not in
+                    self._reserved and not self._has_capacity(adapter_path)):
+                raise AdapterError('No free link on {} for {}'.format(
+                    adapter_addr, device_addr))
+        self._reserved[_device_path(adapter_path, device_addr)] = \
+            adapter_path
+        logger.debug('{} assigned to {}'.format(device_addr, adapter_path))
+        return self._adapters[adapter_path]
+
+    def _choose(self, device_addr):
+        for device_path, adapter_path in self._reserved.items():
+            if _device_address(device_path) == device_addr:
+                return adapter_path
+
+        candidates = [path for path in self._adapters
+                      if self._has_capacity(path)]
+        known = [path for path in candidates
+                 if _device_path(path, device_addr) in self._devices[path]]
+        if known:
+            candidates = known
+        if not candidates:
+            raise AdapterError('No adapter with a free link for {}'.format(
+                device_addr))
+
+        return min(candidates,
+                   key=lambda path: (self._link_count(path),
+                                     self._scans[path],
+                                     path))
+
+    def release(self, device_addr):
+        """Release the link reserved for a device.
+
+        :param device_addr: Address of the remote device
+        """
+        device_addr = device_addr.upper()
+        for device_path in list(self._reserved):
+            if _device_address(device_path) == device_addr:
+                del self._reserved[device_path]
+
+    def acquire_scanner(self):
+        """Choose the adapter with the fewest scans and links for discovery.
+
+        :return: Address of the adapter to use
+        """
+        adapter_path = min(self._adapters,
+                           key=lambda path: (self._scans[path],
+                                             self._link_count(path),
+                                             path))
+        self._scans[adapter_path] += 1
+        return self._adapters[adapter_path]
+
+    def release_scanner(self, adapter_addr):
+        """Release a scan assigned by :meth:`acquire_scanner`.
+
+        :param adapter_addr: Address of the adapter
+        """
+        adapter_path = self._find_path(adapter_addr)
+        if self._scans[adapter_path] > 0:
+            self._scans[adapter_path] -= 1
+
+    def _find_path(self, adapter_addr):
+        for path, address in self._adapters.items():
+            if address.upper() == adapter_addr.upper():
+                return path
+        raise AdapterError('Adapter {} is not in the pool'.format(
+            adapter_addr))
+
+    def _limit(self, adapter_path):
+        if isinstance(self.max_links, dict):
+            return self.max_links.get(self._adapters[adapter_path])
+        return self.max_links
+
+    def _link_count(self, adapter_path):
+        reserved = set(device_path
+                       for device_path, path in self._reserved.items()
+                       if path == adapter_path)
+        return len(self._connected[adapter_path] | reserved)
+
+    def _has_capacity(self, adapter_path):
+        limit = self._limit(adapter_path)
+        return limit is None or self._link_count(adapter_path) < limit
+
+    def _add_adapter(self, path, props):
+        address = str(props['Address'])
+        if self._wanted is not None and address.upper() not in self._wanted:
+            return
+        self._adapters[path] = address
+        self._devices[path] = set()
+        self._connected[path] = set()
+        self._scans.setdefault(path, 0)
+
+    def _add_device(self, path, props):
+        adapter_path = path.rsplit('/dev_', 1)[0]
+        if adapter_path not in self._adapters:
+            return
+        self._devices[adapter_path].add(path)
+        if props.get('Connected', False):
+            self._connected[adapter_path].add(path)
+
+    def _remove_adapter(self, path):
+        old_addr = self._adapters.pop(path)
+        lost = self._connected.pop(path) | set(
+            device_path for device_path, adapter_path
+            in self._reserved.items() if adapter_path == path)
+        del self._devices[path]
+        del self._scans[path]
+        for device_path in lost:
+            self._reserved.pop(device_path, None)
+
+        for device_path in sorted(lost):
+            device_addr = _device_address(device_path)
+            try:
+                new_addr = self.acquire(device_addr)
+            except AdapterError:
+                new_addr = None
+            logger.warning('Adapter {} removed, {} moved to {}'.format(
+                old_addr, device_addr, new_addr))
+            if self.failover_cb is not None:
+                self.failover_cb(device_addr, old_addr, new_addr)
+
+    def _interfaces_added(self, path, interfaces):
+        if constants.ADAPTER_INTERFACE in interfaces:
+            self._add_adapter(path, interfaces[constants.ADAPTER_INTERFACE])
+        if constants.DEVICE_INTERFACE in interfaces:
+            self._add_device(path, interfaces[constants.DEVICE_INTERFACE])
+
+    def _interfaces_removed(self, path, interfaces):
+        if constants.ADAPTER_INTERFACE in interfaces and \
+                path in self._adapters:
+            self._remove_adapter(path)
+        elif constants.DEVICE_INTERFACE in interfaces:
+            adapter_path = path.rsplit('/dev_', 1)[0]
+            if adapter_path in self._adapters:
+                self._devices[adapter_path].discard(path)
+                self._connected[adapter_path].discard(path)
+
+    def _properties_changed(self, interface, changed, invalidated, path):
+        if 'Connected' not in changed:
+            return
+        adapter_path = path.rsplit('/dev_', 1)[0]
+        if adapter_path not in self._adapters:
+            return
+        if changed['Connected']:
+            self._devices[adapter_path].add(path)
+            self._connected[adapter_path].add(path)
+        else:
+            self._connected[adapter_path].discard(path)
+
+
+# Number of running DiscoverySession objects per adapter path
+_discovery_sessions = {}
+
+
+# Device properties BlueZ updates when it receives an advertisement
+_ADVERTISED_PROPERTIES = ('RSSI', 'ManufacturerData', 'ServiceData',
+                          'TxPower')
+
+
+class DiscoverySession:
+    """Non-blocking discovery of nearby devices on one adapter.
+
+    The session does not run an event loop of its own so several sessions
+    (on different adapters) can run alongside active connections in one
+    process. If a timeout is given, discovery is stopped by a single timer
+    at the deadline.
+
+    :Example:
+
+    >>> from bluezero import adapter
+    >>> def found(address, props):
+    >>>     print(address, props.get('RSSI'))
+    >>> dongle = adapter.Adapter()
+    >>> session = adapter.DiscoverySession(dongle, timeout=30,
+    >>>                                    device_found_cb=found)
+    >>> session.start()
+    >>> dongle.run()
+
+    """
+
+    def __init__(self, dongle, timeout=None, device_found_cb=None,
+                 timeout_cb=None, discovery_filter=None):
+        """Default initialiser.
+
+        :param dongle: ``Adapter`` object to scan on
+        :param timeout: (optional) Seconds after which discovery stops
+        :param device_found_cb: (optional) Called as
+                                ``device_found_cb(address, props)`` once per
+                                session for each device advertising on this
+                                adapter, including devices BlueZ already
+                                knows about
+        :param timeout_cb: (optional) Called with the session when the
+                           timeout expires
+        :param discovery_filter: (optional) Dictionary given to BlueZ
+                                 ``SetDiscoveryFilter``
+        """
+        self.dongle = dongle
+        self.timeout = timeout
+        self.device_found_cb = device_found_cb
+        self.timeout_cb = timeout_cb
+        self.discovery_filter = discovery_filter
+        self._timer = None
+        self._signals = []
+        self._reported = set()
+        self._running = False
+
+    @property
+    def running(self):
+        """Return True if the session has been started and not stopped."""
+        return self._running
+
+    def start(self):
+        """Start discovery and return immediately."""
+        if self._running:
+            return
+        self._running = True
+
+        self._reported.clear()
+        if self.device_found_cb is not None:
+            self._signals.append(self.dongle.bus.add_signal_receiver(
+                instrumentation.wrap_signal_handler(self._interfaces_added,
+                                                    constants.DBUS_OM_IFACE,
+                                                    'InterfacesAdded'),
+                dbus_interface=constants.DBUS_OM_IFACE,
+                signal_name='InterfacesAdded'))
+            # Devices already in the BlueZ cache only change properties
+            self._signals.append(self.dongle.bus.add_signal_receiver(
+                instrumentation.wrap_signal_handler(self._properties_changed,
+                                                    dbus.PROPERTIES_IFACE,
+                                                    'PropertiesChanged'),
+                dbus_interface=dbus.PROPERTIES_IFACE,
+                signal_name='PropertiesChanged',
+                arg0=constants.DEVICE_INTERFACE,
+                path_keyword='path'))
+
+        if self.discovery_filter is not None:
+            self.dongle.adapter_methods.SetDiscoveryFilter(
+                self.discovery_filter)
+
+        running = _discovery_sessions.get(self.dongle.path, 0)
+        _discovery_sessions[self.dongle.path] = running + 1
+        if running == 0:
+            self.dongle.adapter_methods.StartDiscovery(
+                reply_handler=self._started,
+                error_handler=self._error)
+
+        if self.timeout is not None:
+            self._timer = self.dongle.mainloop.add_timer(
+                int(self.timeout * 1000), self._timed_out)
+
+    def stop(self):
+        """Stop discovery and cancel any pending timeout."""
+        if not self._running:
+            return
+        self._running = False
+
+        if self._timer is not None:
+            self.dongle.mainloop.remove_timer(self._timer)
+            self._timer = None
+        for signal in self._signals:
+            signal.remove()
+        self._signals = []
+
+        running = _discovery_sessions.get(self.dongle.path, 1) - 1
+        _discovery_sessions[self.dongle.path] = max(running, 0)
+        if running <= 0:
+            self.dongle.adapter_methods.StopDiscovery(
+                reply_handler=self._stopped,
+                error_handler=self._error)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _started(self):
+        logger.debug('Discovery started on {}'.format(self.dongle.path))
+
+    def _stopped(self):
+        logger.debug('Discovery stopped on {}'.format(self.dongle.path))
+
+    def _error(self, error):
+        logger.error('Discovery on {} failed: {}'.format(
+            self.dongle.path, error))
+
+    def _timed_out(self):
+        self._timer = None
+        self.stop()
+        if self.timeout_cb is not None:
+            self.timeout_cb(self)
+        return False
+
+    def _interfaces_added(self, path, interfaces):
+        if constants.DEVICE_INTERFACE not in interfaces:
+            return
+        if not path.startswith(self.dongle.path + '/'):
+            return
+        self._report(path, interfaces[constants.DEVICE_INTERFACE])
+
+    def _properties_changed(self, interface, changed, invalidated,
+                            path=None):
+        if interface != constants.DEVICE_INTERFACE or path is None:
+            return
+        if not path.startswith(self.dongle.path + '/'):
+            return
+        # Only changes caused by a received advertisement
+        if not any(key in changed for key in _ADVERTISED_PROPERTIES):
+            return
+        self._report(path, changed)
+
+    def _report(self, path, props):
+        """Call device_found_cb the first time a device is seen."""
+        if path in self._reported:
+            return
+        self._reported.add(path)
+        self.device_found_cb(_device_address(path), props)
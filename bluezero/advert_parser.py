@@ -0,0 +1,231 @@
+"""Decode beacon advertisements seen during discovery.
+
+The ``ManufacturerData``, ``ServiceData`` and ``Name`` properties BlueZ
+gives for a device in ``InterfacesAdded`` and ``PropertiesChanged`` signals
+are decoded into small named tuples, without creating ``Device`` objects.
+Parsers are found in dispatch tables keyed by company identifier, service
+UUID or name prefix and more can be registered.
+
+:Example:
+
+>>> from bluezero import advert_parser
+>>> from bluezero import constants
+>>> def interfaces_added(path, interfaces):
+>>>     device = interfaces.get(constants.DEVICE_INTERFACE, {})
+>>>     for record in advert_parser.parse(device):
+>>>         print(path, record)
+
+Functions:
+
+- parse -- Decode all beacon records in the properties of a device
+- parse_manufacturer_data -- Decode manufacturer data of one company
+- parse_service_data -- Decode service data of one service
+- register_manufacturer_parser -- Add a parser for a company identifier
+- register_service_parser -- Add a parser for a service UUID
+- register_name_parser -- Add a parser for a device name prefix
+"""
+import collections
+import struct
+import uuid
+
+from bluezero import tools
+
+IBeacon = collections.namedtuple('IBeacon', 'uuid major minor tx_power')
+AltBeacon = collections.namedtuple(
+    'AltBeacon', 'manufacturer beacon_id reference_rssi reserved')
+EddystoneUID = collections.namedtuple('EddystoneUID',
+                                      'namespace instance tx_power')
+EddystoneURL = collections.namedtuple('EddystoneURL', 'url tx_power')
+EddystoneTLM = collections.namedtuple(
+    'EddystoneTLM', 'battery temperature adv_count uptime')
+Microbit = collections.namedtuple('Microbit', 'name friendly_name')
+
+MICROBIT_NAME = 'BBC micro:bit'
+
+# Layouts of the advertising data after the company ID or service UUID.
+# Those of beacons bluezero can also broadcast are in tools.
+_ALTBEACON = struct.Struct('>2s20sbB')
+_EDDYSTONE_URL = struct.Struct('>BbB')
+_ALTBEACON_CODE = b'\xbe\xac'
+_BASE_UUID_SUFFIX = '-0000-1000-8000-00805F9B34FB'
+
+_manufacturer_parsers = {}
+_service_parsers = {}
+_name_parsers = {}
+# Parsers tried for manufacturer data of any company
+_any_manufacturer_parsers = []
+
+
+def _short_uuid(service_uuid):
+    """16-bit form of Bluetooth Base UUIDs, upper case otherwise."""
+    service_uuid = str(service_uuid).upper()
+    if (len(service_uuid) == 36 and service_uuid.startswith('0000') and
+            service_uuid.endswith(_BASE_UUID_SUFFIX)):
+        return service_uuid[4:8]
+    return service_uuid
+
+
+def register_manufacturer_parser(company_id, parser):
+    """
+    Add a parser for manufacturer data.
+
+    :param company_id: Company identifier or None to try the parser for
+                       data of every company
+    :param parser: Function called as ``parser(company_id, data)`` that
+                   returns a record or None if the data is not understood
+    """
+    if company_id is None:
+        _any_manufacturer_parsers.append(parser)
+    else:
+        _manufacturer_parsers[company_id] = parser
+
+
+def register_service_parser(service_uuid, parser):
+    """
+    Add a parser for service data.
+
+    :param service_uuid: 16-bit or 128-bit service UUID
+    :param parser: Function called as ``parser(data)`` that returns a
+                   record or None if the data is not understood
+    """
+    _service_parsers[_short_uuid(service_uuid)] = parser
+
+
+def register_name_parser(prefix, parser):
+    """
+    Add a parser for devices whose name starts with a prefix.
+
+    :param prefix: Start of the device name
+    :param parser: Function called as ``parser(name)`` that returns a
+                   record or None
+    """
+    _name_parsers[prefix] = parser
+
+
+def parse_manufacturer_data(company_id, data):
+    """
+    Decode the manufacturer data of one company.
+
+    :param company_id: Company identifier (the key of ``ManufacturerData``)
+    :param data: Manufacturer data as bytes or a list of octets
+    :return: record or None
+    """
+    data = bytes(data)
+    parser = _manufacturer_parsers.get(company_id)
+    if parser is not None:
+        record = parser(company_id, data)
+        if record is not None:
+            return record
+    for parser in _any_manufacturer_parsers:
+        record = parser(company_id, data)
+        if record is not None:
+            return record
+    return None
+
+
+def parse_service_data(service_uuid, data):
+    """
+    Decode the data of one service.
+
+    :param service_uuid: Service UUID (the key of ``ServiceData``)
+    :param data: Service data as bytes or a list of octets
+    :return: record or None
+    """
+    parser = _service_parsers.get(_short_uuid(service_uuid))
+    if parser is None:
+        return None
+    return parser(bytes(data))
+
+
+def parse(properties):
+    """
+    Decode every beacon record in the properties of a device.
+
+    :param properties: ``org.bluez.Device1`` properties from
+                       ``GetManagedObjects``, ``InterfacesAdded`` or the
+                       changed properties of ``PropertiesChanged``
+    :return: list of records
+    """
+    records = []
+    for company_id, data in properties.get('ManufacturerData', {}).items():
+        record = parse_manufacturer_data(int(company_id), data)
+        if record is not None:
+            records.append(record)
+    for service_uuid, data in properties.get('ServiceData', {}).items():
+        record = parse_service_data(service_uuid, data)
+        if record is not None:
+            records.append(record)
+    name = properties.get('Name')
+    if name is not None:
+        for prefix, parser in _name_parsers.items():
+            if name.startswith(prefix):
+                record = parser(str(name))
+                if record is not None:
+                    records.append(record)
+    return records
+
+
+def _ibeacon(company_id, data):
+    if (len(data) != tools.IBEACON.size or
+            not data.startswith(tools.IBEACON_TYPE)):
+        return None
+    _, beacon_uuid, major, minor, tx_power = tools.IBEACON.unpack(data)
+    return IBeacon(str(uuid.UUID(bytes=beacon_uuid)), major, minor, tx_power)
+
+
+def _altbeacon(company_id, data):
+    if len(data) != _ALTBEACON.size or not data.startswith(_ALTBEACON_CODE):
+        return None
+    _, beacon_id, reference_rssi, reserved = _ALTBEACON.unpack(data)
+    return AltBeacon(company_id, beacon_id, reference_rssi, reserved)
+
+
+def _decode_url(prefix, encoded):
+    """Expand an Eddystone-URL back to the full URL."""
+    if prefix >= len(tools.URL_PREFIXES):
+        return None
+    url = [tools.URL_PREFIXES[prefix]]
+    for octet in encoded:
+        if octet < len(tools.URL_EXPANSIONS):
+            url.append(tools.URL_EXPANSIONS[octet])
+        else:
+            url.append(chr(octet))
+    return ''.join(url)
+
+
+def _eddystone(data):
+    if not data:
+        return None
+    frame_type = data[0]
+    if frame_type == 0x00 and len(data) >= tools.EDDYSTONE_UID.size:
+        _, tx_power, namespace, instance = \
+            tools.EDDYSTONE_UID.unpack_from(data)
+        return EddystoneUID(namespace, instance, tx_power)
+    if frame_type == 0x10 and len(data) >= _EDDYSTONE_URL.size:
+        _, tx_power, prefix = _EDDYSTONE_URL.unpack_from(data)
+        url = _decode_url(prefix, data[_EDDYSTONE_URL.size:])
+        return None if url is None else EddystoneURL(url, tx_power)
+    if frame_type == 0x20 and len(data) == tools.EDDYSTONE_TLM.size:
+        _, version, battery, temperature, adv_count, uptime = \
+            tools.EDDYSTONE_TLM.unpack(data)
+        if version != 0:
+            return None
+        if temperature == tools.EDDYSTONE_NO_TEMPERATURE:
+            temperature = None
+        else:
+            temperature = temperature / 256
+        return EddystoneTLM(battery, temperature, adv_count, uptime / 10)
+    return None
+
+
+def _microbit(name):
+    friendly_name = None
+    if name.endswith(']') and '[' in name:
+        friendly_name = name[name.rindex('[') + 1:-1]
+    return Microbit(name, friendly_name)
+
+
+register_manufacturer_parser(tools.IBEACON_COMPANY_ID, _ibeacon)
+register_manufacturer_parser(None, _altbeacon)
+register_service_parser(tools.EDDYSTONE_UUID, _eddystone)
+register_name_parser(MICROBIT_NAME, _microbit)
@@ -4,12 +4,20 @@ This class requires BlueZ to have the experimental flag enabled
 
 Classes:
 
-- Advertisement -- Specifies the Advertisement Data to be broadcast
+- Advertisement -- Specifies the Advertisement Data to be broadcast.
+  Extended advertising properties (secondary channel, intervals, TX power,
+  duration, timeout and raw data) need BlueZ 5.60 or later
 - AdvertisingManager -- register Advertisement Data which should be
   broadcast to devices
+- AdvertisingPlanner -- work out advertising intervals and durations for a
+  set of payloads
 """
 from __future__ import absolute_import, print_function, unicode_literals
 
+import collections
+import math
+import time
+
 import dbus
 import dbus.exceptions
 import dbus.service
@@ -29,8 +37,10 @@ except ImportError:
 
 from bluezero import constants
 from bluezero import dbus_tools
+from bluezero import instrumentation
 from bluezero import async_tools
 from bluezero import adapter
+from bluezero import server_tools
 
 dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
 mainloop = GObject.MainLoop()
@@ -54,6 +64,64 @@ class InvalidArgsException(dbus.exceptions.DBusException):
     _dbus_error_name = 'org.freedesktop.DBus.Error.InvalidArgs'
 
 
+#: Bytes of advertising data in a legacy advertisement
+MAX_LEGACY_DATA = 31
+#: Bytes of advertising data in an extended advertisement sent by BlueZ
+MAX_EXTENDED_DATA = 251
+
+#: PHYs an extended advertisement can use on the secondary channel
+SECONDARY_CHANNELS = ('1M', '2M', 'Coded')
+
+# D-Bus types of the optional (extended advertising) properties. They are
+# only sent to BlueZ when set.
+_EXTENDED_PROPERTIES = (
+    ('SecondaryChannel', dbus.String),
+    ('MinInterval', dbus.UInt32),
+    ('MaxInterval', dbus.UInt32),
+    ('TxPower', dbus.Int16),
+    ('Duration', dbus.UInt16),
+    ('Timeout', dbus.UInt16),
+    ('Data', lambda data: dbus.Dictionary(
+        {dbus.Byte(ad_type): dbus.Array(value, signature='y')
+         for ad_type, value in data.items()}, signature='yv')),
+    ('Discoverable', dbus.Boolean),
+)
+
+
+def _uuid_size(uuid):
+    """Bytes a UUID takes in advertising data."""
+    return {4: 2, 8: 4}.get(len(str(uuid)), 16)
+
+
+def advertising_data_size(properties):
+    """
+    Bytes of advertising data the properties of an advertisement need.
+
+    Each AD structure takes a length and type octet as well as its data.
+    The flags BlueZ adds to discoverable adverts are counted.
+
+    :param properties: ``org.bluez.LEAdvertisement1`` properties
+    :return: size in bytes
+    """
+    size = 0
+    if (properties.get('Type') == 'peripheral' or
+            properties.get('Discoverable')):
+        size += 3
+    for key in ('ServiceUUIDs', 'SolicitUUIDs'):
+        uuid_sizes = [_uuid_size(uuid) for uuid in properties.get(key) or []]
+        for uuid_size in set(uuid_sizes):
+            size += 2 + uuid_size * uuid_sizes.count(uuid_size)
+    for uuid, data in (properties.get('ServiceData') or {}).items():
+        size += 2 + _uuid_size(uuid) + len(data)
+    for data in (properties.get('ManufacturerData') or {}).values():
+        size += 4 + len(data)
+    for data in (properties.get('Data') or {}).values():
+        size += 2 + len(data)
+    if properties.get('IncludeTxPower'):
+        size += 3
+    return size
+
+
 class Advertisement(dbus.service.Object):
     """Advertisement data to broadcast Class.
 
@@ -79,11 +147,18 @@ class Advertisement(dbus.service.Object):
         Creates the interface to the specified advertising data.
         The DBus path must be specified.
 
-        :param advert_id: Unique ID of advertisement.
+        :param advert_id: Unique ID of advertisement. If None a unique path
+                          is allocated so that several advertisements can
+                          be used in one process.
         :param ad_type: Possible values: "broadcast" or "peripheral"
         """
         # Setup D-Bus object paths and register service
-        self.path = '/ukBaz/bluezero/advertisement{0:04d}'.format(advert_id)
+        if advert_id is None:
+            self.path = server_tools.allocate_path(
+                '/ukBaz/bluezero/advertisement')
+        else:
+            self.path = '/ukBaz/bluezero/advertisement{0:04d}'.format(
+                advert_id)
         self.bus = dbus.SystemBus()
         self.eventloop = async_tools.EventLoop()
         self.interface = constants.LE_ADVERTISEMENT_IFACE
@@ -95,9 +170,29 @@ class Advertisement(dbus.service.Object):
                 'ManufacturerData': None,
                 'SolicitUUIDs': None,
                 'ServiceData': None,
-                'IncludeTxPower': False
+                'IncludeTxPower': False,
+                'SecondaryChannel': None,
+                'MinInterval': None,
+                'MaxInterval': None,
+                'TxPower': None,
+                'Duration': None,
+                'Timeout': None,
+                'Data': None,
+                'Discoverable': None
             }
         }
+        # Set when registered with an AdvertisingManager
+        self.ad_manager = None
+        # Register again to apply updates if BlueZ ignores PropertiesChanged
+        self.reregister = False
+        self._pending = {}
+        self._pending_since = None
+        self._update_timer = None
+        self._update_stats = dict.fromkeys(
+            ('requested', 'applied', 'reregistered'), 0)
+        self._update_latency = 0.0
+        self._max_update_latency = 0.0
+        self._apply_time = 0.0
 
     def start(self):
         self.eventloop.run()
@@ -135,14 +230,52 @@ class Advertisement(dbus.service.Object):
                  'ServiceUUIDs',
                  UUID)
 
+    @property
     def manufacturer_data(self):
-        """Manufacturer Data to be broadcast (Currently not supported)"""
-        pass
+        """Manufacturer Data to be broadcast keyed by company identifier"""
+        return self.props[constants.LE_ADVERTISEMENT_IFACE][
+            'ManufacturerData']
+
+    @manufacturer_data.setter
+    def manufacturer_data(self, data):
+        if data is not None:
+            data = {dbus.UInt16(company_id): dbus.Array(bytes(value),
+                                                        signature='y')
+                    for company_id, value in data.items()}
+        self.Set(constants.LE_ADVERTISEMENT_IFACE, 'ManufacturerData', data)
+        self.check_size()
 
     def solicit_UUIDs(self):
         """Manufacturer Data to be broadcast (Currently not supported)"""
         pass
 
+    @property
+    def data_size(self):
+        """Bytes of advertising data the advertisement needs."""
+        return advertising_data_size(
+            self.props[constants.LE_ADVERTISEMENT_IFACE])
+
+    @property
+    def max_data_size(self):
+        """Bytes of advertising data that fit in the advertisement."""
+        if self.props[constants.LE_ADVERTISEMENT_IFACE]['SecondaryChannel']:
+            return MAX_EXTENDED_DATA
+        return MAX_LEGACY_DATA
+
+    def check_size(self):
+        """
+        Warn if the advertising data will not fit in the advertisement.
+
+        :return: True if the data fits
+        """
+        size = self.data_size
+        if size > self.max_data_size:
+            logger.warning('Advertisement %s needs %d bytes of data but '
+                           'only %d fit', self.path, size,
+                           self.max_data_size)
+            return False
+        return True
+
     @property
     def service_data(self):
         """Service Data to be broadcast"""
@@ -167,6 +300,94 @@ class Advertisement(dbus.service.Object):
         return self.Set(constants.LE_ADVERTISEMENT_IFACE,
                         'IncludeTxPower', state)
 
+    @property
+    def secondary_channel(self):
+        """PHY of the secondary channel: ``'1M'``, ``'2M'`` or ``'Coded'``.
+
+        Setting it makes BlueZ use extended advertising, which allows up to
+        251 bytes of advertising data instead of 31.
+        """
+        return self.props[constants.LE_ADVERTISEMENT_IFACE][
+            'SecondaryChannel']
+
+    @secondary_channel.setter
+    def secondary_channel(self, phy):
+        if phy is not None and phy not in SECONDARY_CHANNELS:
+            raise ValueError('Secondary channel must be one of {}'.format(
+                ', '.join(SECONDARY_CHANNELS)))
+        self.Set(constants.LE_ADVERTISEMENT_IFACE, 'SecondaryChannel', phy)
+
+    @property
+    def min_interval(self):
+        """Minimum advertising interval in milliseconds."""
+        return self.props[constants.LE_ADVERTISEMENT_IFACE]['MinInterval']
+
+    @min_interval.setter
+    def min_interval(self, interval):
+        self.Set(constants.LE_ADVERTISEMENT_IFACE, 'MinInterval', interval)
+
+    @property
+    def max_interval(self):
+        """Maximum advertising interval in milliseconds."""
+        return self.props[constants.LE_ADVERTISEMENT_IFACE]['MaxInterval']
+
+    @max_interval.setter
+    def max_interval(self, interval):
+        self.Set(constants.LE_ADVERTISEMENT_IFACE, 'MaxInterval', interval)
+
+    @property
+    def tx_power(self):
+        """Requested transmit power in dBm (-127 to 20)."""
+        return self.props[constants.LE_ADVERTISEMENT_IFACE]['TxPower']
+
+    @tx_power.setter
+    def tx_power(self, power):
+        if power is not None and not -127 <= power <= 20:
+            raise ValueError('TX power must be between -127 and 20 dBm')
+        self.Set(constants.LE_ADVERTISEMENT_IFACE, 'TxPower', power)
+
+    @property
+    def duration(self):
+        """Seconds this advertisement is broadcast for before BlueZ rotates
+        to the next registered advertisement."""
+        return self.props[constants.LE_ADVERTISEMENT_IFACE]['Duration']
+
+    @duration.setter
+    def duration(self, seconds):
+        self.Set(constants.LE_ADVERTISEMENT_IFACE, 'Duration', seconds)
+
+    @property
+    def timeout(self):
+        """Seconds until BlueZ removes the advertisement."""
+        return self.props[constants.LE_ADVERTISEMENT_IFACE]['Timeout']
+
+    @timeout.setter
+    def timeout(self, seconds):
+        self.Set(constants.LE_ADVERTISEMENT_IFACE, 'Timeout', seconds)
+
+    @property
+    def data(self):
+        """Raw advertising data structures keyed by AD type.
+
+        :Example:
+
+        >>> beacon.data = {0x26: [0x01, 0x01, 0x00]}
+        """
+        return self.props[constants.LE_ADVERTISEMENT_IFACE]['Data']
+
+    @data.setter
+    def data(self, data):
+        self.Set(constants.LE_ADVERTISEMENT_IFACE, 'Data', data)
+
+    @property
+    def discoverable(self):
+        """Advertise as general discoverable."""
+        return self.props[constants.LE_ADVERTISEMENT_IFACE]['Discoverable']
+
+    @discoverable.setter
+    def discoverable(self, state):
+        self.Set(constants.LE_ADVERTISEMENT_IFACE, 'Discoverable', state)
+
     @dbus.service.method(constants.DBUS_PROP_IFACE,
                          in_signature='s',
                          out_signature='a{sv}')
@@ -190,13 +411,20 @@ class Advertisement(dbus.service.Object):
             response['ServiceUUIDs'] = dbus.Array(
                 self.props[interface_name]['ServiceUUIDs'],
                 signature='s')
+        # Values may be lists of ints, e.g. from update(), which would be
+        # sent as arrays of int32 instead of bytes
         if self.props[interface_name]['ServiceData'] is not None:
             response['ServiceData'] = dbus.Dictionary(
-                self.props[interface_name]['ServiceData'],
+                {dbus.String(uuid): dbus.Array(bytes(value), signature='y')
+                 for uuid, value in
+                 self.props[interface_name]['ServiceData'].items()},
                 signature='sv')
         if self.props[interface_name]['ManufacturerData'] is not None:
             response['ManufacturerData'] = dbus.Dictionary(
-                self.props[interface_name]['ManufacturerData'],
+                {dbus.UInt16(company_id): dbus.Array(bytes(value),
+                                                     signature='y')
+                 for company_id, value in
+                 self.props[interface_name]['ManufacturerData'].items()},
                 signature='qv')
         if self.props[interface_name]['SolicitUUIDs'] is not None:
             response['SolicitUUIDs'] = dbus.Array(
@@ -204,6 +432,10 @@ class Advertisement(dbus.service.Object):
                 signature='s')
         response['IncludeTxPower'] = dbus.Boolean(
             self.props[interface_name]['IncludeTxPower'])
+        for property_name, dbus_type in _EXTENDED_PROPERTIES:
+            value = self.props[interface_name][property_name]
+            if value is not None:
+                response[property_name] = dbus_type(value)
 
         return response
 
@@ -240,6 +472,133 @@ class Advertisement(dbus.service.Object):
                 name=self.interface + '.UnknownProperty')
 
         iface_props[property_name] = value
+        self._properties_changed(interface_name, [property_name])
+
+    def set_properties(self, properties):
+        """Change several advertisement properties at once.
+
+        A single ``PropertiesChanged`` signal is emitted so BlueZ updates a
+        registered advertisement once, without it being registered again.
+        Properties set to None are removed from the advertisement.
+
+        :param properties: dictionary of property names and values
+
+        :Example:
+
+        >>> beacon.set_properties({'ServiceUUIDs': None,
+        >>>                        'ServiceData': None,
+        >>>                        'ManufacturerData': {0x004C: ibeacon}})
+        """
+        iface_props = self.props[constants.LE_ADVERTISEMENT_IFACE]
+        for property_name in properties:
+            if property_name not in iface_props:
+                raise dbus.exceptions.DBusException(
+                    'no such property ' + property_name,
+                    name=self.interface + '.UnknownProperty')
+        iface_props.update(properties)
+        self._properties_changed(constants.LE_ADVERTISEMENT_IFACE,
+                                 list(properties))
+
+    def update(self, properties, delay=None):
+        """Update the data of a (registered) advertisement in place.
+
+        Without a delay the change is applied at once. With a delay the
+        first change starts a timer and every change made before it fires
+        is applied together, so frequent sensor updates cost one update
+        per interval. Changes are signalled to BlueZ with
+        ``PropertiesChanged`` or, if :attr:`reregister` is set, by
+        registering the advertisement again.
+
+        :param properties: dictionary of property names and values
+        :param delay: (optional) seconds to collect changes for
+
+        :Example:
+
+        >>> beacon.update({'ServiceData': {'FEAA': reading}}, delay=0.2)
+        """
+        self._pending.update(properties)
+        self._update_stats['requested'] += 1
+        if self._pending_since is None:
+            self._pending_since = time.monotonic()
+        if delay is None:
+            self.flush_updates()
+        elif self._update_timer is None:
+            self._update_timer = self.eventloop.add_timer(
+                int(delay * 1000), self._update_timeout)
+
+    def flush_updates(self):
+        """Apply the changes collected by :meth:`update` now."""
+        if self._update_timer is not None:
+            self.eventloop.remove_timer(self._update_timer)
+            self._update_timer = None
+        if not self._pending:
+            return
+        properties = self._pending
+        self._pending = {}
+        start = time.monotonic()
+        manager = self.ad_manager
+        if self.reregister and manager is not None:
+            manager.unregister_advertisement(self)
+            self.set_properties(properties)
+            manager.register_advertisement(self, {})
+            self._update_stats['reregistered'] += 1
+        else:
+            self.set_properties(properties)
+        end = time.monotonic()
+        latency = end - self._pending_since
+        self._pending_since = None
+        self._update_stats['applied'] += 1
+        self._update_latency += latency
+        self._max_update_latency = max(self._max_update_latency, latency)
+        self._apply_time += end - start
+
+    def _update_timeout(self):
+        self._update_timer = None
+        self.flush_updates()
+        return False
+
+    @property
+    def update_stats(self):
+        """Counters and timings of :meth:`update`.
+
+        ``requested`` updates, ``applied`` batches, ``reregistered`` batches,
+        ``mean_latency``/``max_latency`` in seconds from the first change of
+        a batch until it was applied and ``mean_apply_time`` in seconds
+        spent signalling or registering.
+        """
+        stats = dict(self._update_stats)
+        applied = stats['applied']
+        stats['mean_latency'] = (self._update_latency / applied
+                                 if applied else 0.0)
+        stats['max_latency'] = self._max_update_latency
+        stats['mean_apply_time'] = (self._apply_time / applied
+                                    if applied else 0.0)
+        return stats
+
+    def _properties_changed(self, interface_name, property_names):
+        """Signal the new values of properties to BlueZ."""
+        response = self.GetAll(interface_name)
+        changed = {}
+        invalidated = []
+        for property_name in property_names:
+            if property_name in response:
+                changed[property_name] = response[property_name]
+            else:
+                invalidated.append(property_name)
+        self.PropertiesChanged(interface_name,
+                               dbus.Dictionary(changed, signature='sv'),
+                               dbus.Array(invalidated, signature='s'))
+
+    @dbus.service.signal(constants.DBUS_PROP_IFACE,
+                         signature='sa{sv}as')
+    def PropertiesChanged(self, interface, changed, invalidated):
+        """Emit a Properties Changed notification signal.
+
+        This signal is registered with the D-Bus at
+        ``org.freedesktop.DBus.Properties``.
+        """
+        logger.debug('Advertisement properties changed: %s %s %s',
+                     interface, changed, invalidated)
 
 
 def register_ad_cb():
@@ -263,19 +622,22 @@ class AdvertisingManager:
         self.bus = dbus.SystemBus()
 
         if adapter_addr is None:
-            adapters = adapter.list_adapters()
-            if len(adapters) > 0:
-                adapter_addr = adapters[0]
-
-        self.advert_mngr_path = dbus_tools.get_dbus_path(adapter=adapter_addr)
+            adapter_paths = dbus_tools.get_adapter_paths()
+            if len(adapter_paths) < 1:
+                raise adapter.AdapterError('No Bluetooth adapter found')
+            self.advert_mngr_path = adapter_paths[0]
+        else:
+            self.advert_mngr_path = dbus_tools.get_adapter_path(adapter_addr)
         self.advert_mngr_obj = self.bus.get_object(
             constants.BLUEZ_SERVICE_NAME,
             self.advert_mngr_path)
-        self.advert_mngr_methods = dbus.Interface(
-            self.advert_mngr_obj,
+        self.advert_mngr_methods = instrumentation.wrap_interface(
+            dbus.Interface(self.advert_mngr_obj,
+                           constants.LE_ADVERTISING_MANAGER_IFACE),
             constants.LE_ADVERTISING_MANAGER_IFACE)
-        self.advert_mngr_props = dbus.Interface(self.advert_mngr_obj,
-                                                dbus.PROPERTIES_IFACE)
+        self.advert_mngr_props = instrumentation.wrap_interface(
+            dbus.Interface(self.advert_mngr_obj, dbus.PROPERTIES_IFACE),
+            dbus.PROPERTIES_IFACE)
 
     def register_advertisement(self, advertisement, options=dbus.Array()):
         """
@@ -291,6 +653,7 @@ class AdvertisingManager:
             reply_handler=register_ad_cb,
             error_handler=register_ad_error_cb
         )
+        advertisement.ad_manager = self
 
     def unregister_advertisement(self, advertisement):
         """This unregisters the services that has been
@@ -304,3 +667,193 @@ class AdvertisingManager:
         self.advert_mngr_methods.UnregisterAdvertisement(
             advertisement.path
         )
+        advertisement.ad_manager = None
+
+    @property
+    def supported_instances(self):
+        """Number of advertisements that can still be registered."""
+        return self.advert_mngr_props.Get(
+            constants.LE_ADVERTISING_MANAGER_IFACE, 'SupportedInstances')
+
+    @property
+    def supported_secondary_channels(self):
+        """Secondary channel PHYs the adapter can advertise on.
+
+        Empty if the adapter does not support extended advertising.
+        """
+        try:
+            return self.advert_mngr_props.Get(
+                constants.LE_ADVERTISING_MANAGER_IFACE,
+                'SupportedSecondaryChannels')
+        except dbus.exceptions.DBusException:
+            return []
+
+    @property
+    def supported_capabilities(self):
+        """Limits of the adapter, for example ``MaxAdvLen`` (31 for legacy
+        and up to 251 for extended advertising), ``MinTxPower`` and
+        ``MaxTxPower``. Empty for versions of BlueZ without it."""
+        try:
+            return self.advert_mngr_props.Get(
+                constants.LE_ADVERTISING_MANAGER_IFACE,
+                'SupportedCapabilities')
+        except dbus.exceptions.DBusException:
+            return {}
+
+
+#: Result of :meth:`AdvertisingPlanner.plan`
+AdvertisingPlan = collections.namedtuple(
+    'AdvertisingPlan',
+    'interval duration refresh_period events airtime duty_cycle')
+
+
+class AdvertisingPlanner:
+    """Work out advertising intervals and durations for a set of payloads.
+
+    Each payload should be seen ``repeats`` times every ``refresh_period``
+    seconds. When there are more payloads than the controller can
+    advertise at once they take turns, each being on air for ``Duration``
+    seconds. A ``max_duty_cycle`` (fraction of time the radio transmits)
+    limits the power used by making the interval longer.
+
+    Airtime is estimated from the packet sizes of advertising events on the
+    three primary channels, plus the auxiliary packet of extended
+    advertising, so the figures are for comparing plans rather than exact.
+
+    :Example:
+
+    >>> planner = advertisement.AdvertisingPlanner(
+    >>>     payloads=4, refresh_period=2, payload_size=25, instances=2,
+    >>>     max_duty_cycle=0.002)
+    >>> print(planner.plan())
+    >>> planner.apply(adverts, ad_manager)
+    """
+
+    #: Shortest advertising interval BlueZ accepts in milliseconds
+    MIN_INTERVAL = 20
+    #: Longest advertising interval in milliseconds
+    MAX_INTERVAL = 10485759
+    #: Longest advertising interval of legacy advertising in milliseconds
+    MAX_LEGACY_INTERVAL = 10240
+    #: Largest advertising data of a legacy advertisement in bytes
+    LEGACY_DATA_SIZE = MAX_LEGACY_DATA
+    # Microseconds per byte on each PHY (Coded with S=8 coding)
+    _BYTE_TIME = {'1M': 8, '2M': 4, 'Coded': 64}
+    # Preamble, access address, header, advertiser address and CRC
+    _PACKET_OVERHEAD = 16
+    # ADV_EXT_IND pointing at the auxiliary packet on the secondary channel
+    _EXT_IND_SIZE = 24
+    # Extra fields of the AUX_ADV_IND header
+    _AUX_OVERHEAD = 10
+
+    def __init__(self, payloads, refresh_period, payload_size=31,
+                 instances=1, repeats=3, max_duty_cycle=None,
+                 secondary_channel=None, channels=3):
+        """Default initialiser.
+
+        :param payloads: Number of advertisements to broadcast
+        :param refresh_period: Seconds in which every payload should be
+                               seen ``repeats`` times
+        :param payload_size: (optional) Bytes of advertising data per
+                             payload
+        :param instances: (optional) Advertisements the controller can
+                          broadcast at once
+        :param repeats: (optional) Advertising events per payload in each
+                        refresh period, to allow for missed packets
+        :param max_duty_cycle: (optional) Largest fraction of time spent
+                               transmitting
+        :param secondary_channel: (optional) PHY of extended advertising
+        :param channels: (optional) Primary advertising channels used
+        """
+        if payloads < 1 or instances < 1 or repeats < 1:
+            raise ValueError('payloads, instances and repeats must be '
+                             'at least 1')
+        if refresh_period <= 0:
+            raise ValueError('refresh_period must be positive')
+        if secondary_channel not in (None,) + SECONDARY_CHANNELS:
+            raise ValueError('Secondary channel must be one of {}'.format(
+                ', '.join(SECONDARY_CHANNELS)))
+        self.payloads = payloads
+        self.refresh_period = refresh_period
+        self.payload_size = payload_size
+        self.instances = instances
+        self.repeats = repeats
+        self.max_duty_cycle = max_duty_cycle
+        self.secondary_channel = secondary_channel
+        self.channels = channels
+
+    @property
+    def extended(self):
+        """True if the payloads need extended advertising."""
+        return (self.secondary_channel is not None or
+                self.payload_size > self.LEGACY_DATA_SIZE)
+
+    def event_airtime(self):
+        """Seconds of transmission for one advertising event."""
+        if not self.extended:
+            return (self.channels * 8e-6 *
+                    (self._PACKET_OVERHEAD + self.payload_size))
+        primary = self.channels * 8e-6 * self._EXT_IND_SIZE
+        aux = (self._BYTE_TIME[self.secondary_channel or '1M'] * 1e-6 *
+               (self._PACKET_OVERHEAD + self._AUX_OVERHEAD +
+                self.payload_size))
+        return primary + aux
+
+    def plan(self):
+        """Calculate the advertising interval and duration.
+
+        :return: :class:`AdvertisingPlan` with the ``interval`` in
+                 milliseconds, ``duration`` in seconds (None if all payloads
+                 are broadcast at once), the achieved ``refresh_period`` in
+                 seconds, advertising ``events`` per payload in each
+                 refresh period, ``airtime`` in seconds per event and the
+                 ``duty_cycle`` of the radio
+        """
+        active = min(self.payloads, self.instances)
+        rounds = math.ceil(self.payloads / active)
+        if rounds == 1:
+            duration = None
+            refresh_period = self.refresh_period
+            on_air = self.refresh_period
+        else:
+            # Duration is whole seconds
+            duration = max(1, int(self.refresh_period / rounds))
+            refresh_period = duration * rounds
+            on_air = duration
+        interval = on_air * 1000 / self.repeats
+        airtime = self.event_airtime()
+        if self.max_duty_cycle is not None:
+            interval = max(interval,
+                           active * airtime * 1000 / self.max_duty_cycle)
+        max_interval = (self.MAX_INTERVAL if self.extended
+                        else self.MAX_LEGACY_INTERVAL)
+        interval = int(min(max(interval, self.MIN_INTERVAL), max_interval))
+        events = on_air * 1000 / interval
+        duty_cycle = active * airtime * 1000 / interval
+        return AdvertisingPlan(interval, duration, refresh_period, events,
+                               airtime, duty_cycle)
+
+    def apply(self, advertisements, ad_manager=None):
+        """Set the planned interval and duration on advertisements.
+
+        :param advertisements: list of Advertisement objects
+        :param ad_manager: (optional) AdvertisingManager to register the
+                           advertisements with
+        :return: The :class:`AdvertisingPlan` applied
+        """
+        if len(advertisements) != self.payloads:
+            raise ValueError('Planned for {} payloads but given {} '
+                             'advertisements'.format(self.payloads,
+                                                     len(advertisements)))
+        plan = self.plan()
+        for advert in advertisements:
+            properties = {'MinInterval': plan.interval,
+                          'MaxInterval': plan.interval,
+                          'Duration': plan.duration}
+            if self.secondary_channel is not None:
+                properties['SecondaryChannel'] = self.secondary_channel
+            advert.set_properties(properties)
+            if ad_manager is not None:
+                ad_manager.register_advertisement(advert, {})
+        logger.info('Advertising plan: %s', plan)
+        return plan
@@ -0,0 +1,370 @@
+"""Classes for passive scanning with the BlueZ Advertisement Monitor API.
+
+Byte patterns and RSSI thresholds are registered with BlueZ which does the
+filtering, in the controller where it is supported, and only calls back
+when a matching device is found or lost. This needs BlueZ 5.56 or later
+and may need the experimental flag.
+
+Classes:
+
+- AdvertisementMonitor -- Patterns and thresholds of one monitor
+- MonitorApplication -- Object Manager holding the monitors of a process
+- AdvertisementMonitorManager -- Register monitors with an adapter
+"""
+from __future__ import absolute_import, print_function, unicode_literals
+
+import dbus
+import dbus.exceptions
+import dbus.mainloop.glib
+import dbus.service
+
+import logging
+try:  # Python 2.7+
+    from logging import NullHandler
+except ImportError:
+    class NullHandler(logging.Handler):
+        def emit(self, record):
+            pass
+
+from bluezero import adapter
+from bluezero import async_tools
+from bluezero import constants
+from bluezero import dbus_tools
+from bluezero import instrumentation
+from bluezero import server_tools
+
+dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+logger.addHandler(NullHandler())
+
+#: Monitor type matching advertisements with any of the patterns
+OR_PATTERNS = 'or_patterns'
+
+# Advertising data types commonly used in patterns
+#: Flags
+AD_TYPE_FLAGS = 0x01
+#: Complete list of 16-bit service UUIDs
+AD_TYPE_SERVICE_UUID16 = 0x03
+#: Shortened local name
+AD_TYPE_SHORT_NAME = 0x08
+#: Complete local name
+AD_TYPE_COMPLETE_NAME = 0x09
+#: Service data with a 16-bit UUID
+AD_TYPE_SERVICE_DATA16 = 0x16
+#: Manufacturer specific data
+AD_TYPE_MANUFACTURER_DATA = 0xFF
+
+
+class InvalidArgsException(dbus.exceptions.DBusException):
+    """This is a D-Bus exception class for Invalid Arguments.
+
+    All this class does is set the internal variable ``_dbus_error_name`` to
+    the object path for D-Bus Invalid Argument Exceptions.
+
+    """
+
+    _dbus_error_name = 'org.freedesktop.DBus.Error.InvalidArgs'
+
+
+class AdvertisementMonitor(dbus.service.Object):
+    """Patterns and RSSI thresholds BlueZ filters advertisements with.
+
+    A pattern is a tuple of the position in the advertising data, the AD
+    type and the bytes to match.
+
+    :Example:
+
+    >>> ibeacon = advertisement_monitor.AdvertisementMonitor(
+    >>>     app, [(0, advertisement_monitor.AD_TYPE_MANUFACTURER_DATA,
+    >>>            b'\\x4c\\x00\\x02\\x15')],
+    >>>     device_found_cb=arrived, device_lost_cb=left,
+    >>>     rssi_low=-90, rssi_high=-70)
+    """
+
+    def __init__(self, application, patterns, device_found_cb=None,
+                 device_lost_cb=None, rssi_low=None, rssi_high=None,
+                 rssi_low_timeout=None, rssi_high_timeout=None,
+                 rssi_sampling_period=None):
+        """Default initialiser.
+
+        :param application: MonitorApplication the monitor belongs to
+        :param patterns: list of (position, AD type, bytes) tuples
+        :param device_found_cb: Called with the D-Bus path of a device when
+                                it matches
+        :param device_lost_cb: Called with the D-Bus path of a device when
+                               it is no longer seen
+        :param rssi_low: (optional) RSSI in dBm below which a device is lost
+        :param rssi_high: (optional) RSSI in dBm above which a device is
+                          found
+        :param rssi_low_timeout: (optional) Seconds below ``rssi_low``
+                                 before a device is lost
+        :param rssi_high_timeout: (optional) Seconds above ``rssi_high``
+                                  before a device is found
+        :param rssi_sampling_period: (optional) Period of RSSI reports in
+                                     100 ms units, 0 reports all
+        """
+        self.path = server_tools.allocate_path(application.path + '/monitor')
+        self.bus = application.bus
+        dbus.service.Object.__init__(self, self.bus, self.path)
+        self.device_found_cb = device_found_cb
+        self.device_lost_cb = device_lost_cb
+        self.active = False
+
+        props = {
+            'Type': dbus.String(OR_PATTERNS),
+            'Patterns': dbus.Array(
+                [dbus.Struct((dbus.Byte(position), dbus.Byte(ad_type),
+                              dbus.Array(bytearray(content), signature='y')),
+                             signature='yyay')
+                 for position, ad_type, content in patterns],
+                signature='(yyay)')}
+        for name, value, dbus_type in (
+                ('RSSILowThreshold', rssi_low, dbus.Int16),
+                ('RSSIHighThreshold', rssi_high, dbus.Int16),
+                ('RSSILowTimeout', rssi_low_timeout, dbus.UInt16),
+                ('RSSIHighTimeout', rssi_high_timeout, dbus.UInt16),
+                ('RSSISamplingPeriod', rssi_sampling_period, dbus.UInt16)):
+            if value is not None:
+                props[name] = dbus_type(value)
+        self.props = {
+            constants.ADV_MONITOR_IFACE: dbus.Dictionary(props,
+                                                         signature='sv')
+        }
+        application.add_monitor(self)
+
+    def get_path(self):
+        """Return the DBus object path"""
+        return dbus.ObjectPath(self.path)
+
+    @dbus.service.method(constants.DBUS_PROP_IFACE,
+                         in_signature='s',
+                         out_signature='a{sv}')
+    def GetAll(self, interface_name):
+        """Return the monitor properties.
+
+        This method is registered with the D-Bus at
+        ``org.freedesktop.DBus.Properties``
+        """
+        if interface_name != constants.ADV_MONITOR_IFACE:
+            raise InvalidArgsException()
+        return self.props[interface_name]
+
+    @dbus.service.method(constants.ADV_MONITOR_IFACE,
+                         in_signature='', out_signature='')
+    def Release(self):
+        """Called by BlueZ when the monitor is removed."""
+        self.active = False
+        logger.info('Monitor %s released', self.path)
+
+    @dbus.service.method(constants.ADV_MONITOR_IFACE,
+                         in_signature='', out_signature='')
+    def Activate(self):
+        """Called by BlueZ when the monitor starts filtering."""
+        self.active = True
+        logger.info('Monitor %s activated', self.path)
+
+    @dbus.service.method(constants.ADV_MONITOR_IFACE,
+                         in_signature='o', out_signature='')
+    def DeviceFound(self, device):
+        """Called by BlueZ when a device matches the monitor."""
+        if self.device_found_cb is not None:
+            self.device_found_cb(str(device))
+
+    @dbus.service.method(constants.ADV_MONITOR_IFACE,
+                         in_signature='o', out_signature='')
+    def DeviceLost(self, device):
+        """Called by BlueZ when a matching device is no longer seen."""
+        if self.device_lost_cb is not None:
+            self.device_lost_cb(str(device))
+
+
+class MonitorApplication(dbus.service.Object):
+    """Object Manager of the advertisement monitors of a process.
+
+    The application is registered once. Monitors added or removed later
+    are announced to BlueZ with ``InterfacesAdded``/``InterfacesRemoved``.
+    """
+
+    def __init__(self, path=None):
+        """Default initialiser.
+
+        :param path: (optional) D-Bus object path of the application. A
+                     unique path is used if not given.
+        """
+        self.bus = dbus.SystemBus()
+        if path is None:
+            path = server_tools.allocate_path('/ukBaz/bluezero/monitor_app')
+        self.path = path
+        dbus.service.Object.__init__(self, self.bus, self.path)
+        self.monitors = []
+
+    def get_path(self):
+        """Return the DBus object path"""
+        return dbus.ObjectPath(self.path)
+
+    def add_monitor(self, monitor):
+        """Add a monitor to the application.
+
+        :param monitor: AdvertisementMonitor object
+        """
+        self.monitors.append(monitor)
+        self.InterfacesAdded(monitor.get_path(), monitor.props)
+
+    def remove_monitor(self, monitor):
+        """Remove a monitor from the application.
+
+        :param monitor: AdvertisementMonitor object
+        """
+        self.monitors.remove(monitor)
+        self.InterfacesRemoved(monitor.get_path(),
+                               [constants.ADV_MONITOR_IFACE])
+        monitor.remove_from_connection()
+        server_tools.release_path(monitor.path)
+
+    @dbus.service.method(constants.DBUS_OM_IFACE,
+                         out_signature='a{oa{sa{sv}}}')
+    def GetManagedObjects(self):
+        """Return the monitors of the application and their properties."""
+        return {monitor.get_path(): monitor.props
+                for monitor in self.monitors}
+
+    @dbus.service.signal(constants.DBUS_OM_IFACE,
+                         signature='oa{sa{sv}}')
+    def InterfacesAdded(self, path, interfaces):
+        """Signal a new monitor to BlueZ."""
+        pass
+
+    @dbus.service.signal(constants.DBUS_OM_IFACE,
+                         signature='oas')
+    def InterfacesRemoved(self, path, interfaces):
+        """Signal a removed monitor to BlueZ."""
+        pass
+
+
+class AdvertisementMonitorManager:
+    """Register advertisement monitors with an adapter.
+
+    :Example:
+
+    >>> from bluezero import advertisement_monitor
+    >>> def found(device_path):
+    >>>     print('Found', device_path)
+    >>> manager = advertisement_monitor.AdvertisementMonitorManager()
+    >>> manager.add_monitor(
+    >>>     [(0, advertisement_monitor.AD_TYPE_COMPLETE_NAME, b'BBC')],
+    >>>     device_found_cb=found, rssi_low=-90, rssi_high=-75,
+    >>>     rssi_low_timeout=5, rssi_high_timeout=1)
+    >>> manager.run()
+    """
+
+    def __init__(self, adapter_addr=None):
+        """Default initialiser.
+
+        :param adapter_addr: (optional) Address or name of the adapter.
+                             The first adapter is used if not given.
+        """
+        self.bus = dbus.SystemBus()
+        if adapter_addr is None:
+            adapter_paths = dbus_tools.get_adapter_paths()
+            if len(adapter_paths) < 1:
+                raise adapter.AdapterError('No Bluetooth adapter found')
+            self.manager_path = adapter_paths[0]
+        else:
+            self.manager_path = dbus_tools.get_adapter_path(adapter_addr)
+        self.manager_obj = self.bus.get_object(constants.BLUEZ_SERVICE_NAME,
+                                               self.manager_path)
+        self.manager_methods = instrumentation.wrap_interface(
+            dbus.Interface(self.manager_obj,
+                           constants.ADV_MONITOR_MANAGER_IFACE),
+            constants.ADV_MONITOR_MANAGER_IFACE)
+        self.manager_props = instrumentation.wrap_interface(
+            dbus.Interface(self.manager_obj, dbus.PROPERTIES_IFACE),
+            dbus.PROPERTIES_IFACE)
+        self.application = None
+        self.registered = False
+        self.eventloop = async_tools.EventLoop()
+
+    @property
+    def supported_monitor_types(self):
+        """Monitor types supported by BlueZ (e.g. ``or_patterns``)."""
+        return self.manager_props.Get(constants.ADV_MONITOR_MANAGER_IFACE,
+                                      'SupportedMonitorTypes')
+
+    @property
+    def supported_features(self):
+        """Features supported by the controller (e.g. offloading)."""
+        return self.manager_props.Get(constants.ADV_MONITOR_MANAGER_IFACE,
+                                      'SupportedFeatures')
+
+    def add_monitor(self, patterns, device_found_cb=None,
+                    device_lost_cb=None, **rssi):
+        """Create a monitor and register it with BlueZ.
+
+        The application holding the monitors is registered with the first
+        monitor. See :class:`AdvertisementMonitor` for the parameters.
+
+        :return: AdvertisementMonitor object
+        """
+        if self.application is None:
+            self.application = MonitorApplication()
+        monitor = AdvertisementMonitor(self.application, patterns,
+                                       device_found_cb, device_lost_cb,
+                                       **rssi)
+        if not self.registered:
+            self.register_application(self.application)
+        return monitor
+
+    def remove_monitor(self, monitor):
+        """Stop a monitor.
+
+        :param monitor: AdvertisementMonitor returned by :meth:`add_monitor`
+        """
+        self.application.remove_monitor(monitor)
+
+    def register_application(self, application):
+        """Register an application of monitors with BlueZ.
+
+        :param application: MonitorApplication object
+        """
+        self.manager_methods.RegisterMonitor(
+            application.get_path(),
+            reply_handler=self._register_cb,
+            error_handler=self._register_error_cb)
+        self.registered = True
+
+    def unregister_application(self, application=None):
+        """Unregister an application of monitors.
+
+        :param application: (optional) MonitorApplication object, the one
+                            created by :meth:`add_monitor` if not given
+        """
+        if application is None:
+            application = self.application
+        if application is None:
+            return
+        try:
+            self.manager_methods.UnregisterMonitor(application.get_path())
+        except dbus.exceptions.DBusException as error:
+            logger.warning('Unregistering monitors failed: %s', error)
+        self.registered = False
+
+    def _register_cb(self):
+        logger.info('Advertisement monitors registered')
+
+    def _register_error_cb(self, error):
+        self.registered = False
+        logger.error('Failed to register advertisement monitors: %s', error)
+
+    def run(self):
+        """Run the event loop until :meth:`quit` or Ctrl-C."""
+        try:
+            self.eventloop.run()
+        except KeyboardInterrupt:
+            self.quit()
+
+    def quit(self):
+        """Unregister the monitors and stop the event loop."""
+        self.unregister_application()
+        self.eventloop.quit()
@@ -36,4 +36,52 @@ class EventLoop:
         self.mainloop.is_running()
 
     def add_timer(self, time, callback):
-        GLib.timeout_add(time, callback)
+        """
+        Call callback after time milliseconds.
+
+        The callback is repeated for as long as it returns True.
+        :param time: Interval in milliseconds
+        :param callback: Function to call
+        :return: Source ID that can be given to remove_timer
+        """
+        return GLib.timeout_add(time, callback)
+
+    def remove_timer(self, source_id):
+        """
+        Cancel a timer created with add_timer
+        :param source_id: Source ID returned by add_timer
+        """
+        GLib.source_remove(source_id)
+
+    def add_io_watch(self, fd, callback):
+        """
+        Call callback when a file descriptor is readable or closed.
+
+        The callback is called as ``callback(fd, condition)`` and is
+        repeated for as long as it returns True.
+        :param fd: File descriptor or object with a ``fileno()`` method
+        :param callback: Function to call
+        :return: Source ID that can be given to remove_io_watch
+        """
+        return GLib.io_add_watch(fd, GLib.PRIORITY_DEFAULT,
+                                 GLib.IO_IN | GLib.IO_HUP | GLib.IO_ERR,
+                                 callback)
+
+    def remove_io_watch(self, source_id):
+        """
+        Cancel a watch created with add_io_watch
+        :param source_id: Source ID returned by add_io_watch
+        """
+        GLib.source_remove(source_id)
+
+    def add_idle(self, callback, *args):
+        """
+        Call callback from the event loop when it is idle.
+
+        This is safe to use from other threads. The callback is repeated for
+        as long as it returns True.
+        :param callback: Function to call
+        :param args: Arguments given to the callback
+        :return: Source ID
+        """
+        return GLib.idle_add(callback, *args)
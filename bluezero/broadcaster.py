@@ -2,8 +2,83 @@
 The level 10 file for creating beacons
 This requires BlueZ to have the experimental flag set
 """
+import struct
+import uuid
+
+import dbus
+import dbus.exceptions
+
+import logging
+try:  # Python 2.7+
+    from logging import NullHandler
+except ImportError:
+    class NullHandler(logging.Handler):
+        def emit(self, record):
+            pass
+
 from bluezero import adapter
 from bluezero import advertisement
+from bluezero import async_tools
+from bluezero import tools
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+logger.addHandler(NullHandler())
+
+#: Company identifier used by iBeacons
+IBEACON_COMPANY_ID = tools.IBEACON_COMPANY_ID
+
+# Advertisement properties that make up the content of a rotated frame
+FRAME_PROPERTIES = ('ServiceUUIDs', 'ServiceData', 'ManufacturerData',
+                    'SolicitUUIDs')
+
+
+def pack_manufacturer_data(fmt, *values, extended=False):
+    """
+    Pack values into manufacturer data with a :mod:`struct` format.
+
+    A warning is logged if the manufacturer data will not fit in an
+    advertisement on its own.
+    :param fmt: struct format, e.g. ``'<hH'`` for a signed and unsigned
+                16-bit value
+    :param values: values to pack
+    :param extended: True to check against the extended advertising limit
+    :return: bytes of manufacturer data (without the company identifier)
+
+    :Example:
+
+    >>> data = broadcaster.pack_manufacturer_data('<hB', 2150, 87)
+    """
+    data = struct.pack(fmt, *values)
+    limit = (advertisement.MAX_EXTENDED_DATA if extended
+             else advertisement.MAX_LEGACY_DATA)
+    size = advertisement.advertising_data_size(
+        {'ManufacturerData': {0: data}})
+    if size > limit:
+        logger.warning('Manufacturer data needs %d bytes but only %d fit',
+                       size, limit)
+    return data
+
+
+def ibeacon(beacon_uuid, major, minor, tx_power=-59):
+    """
+    Manufacturer data of an iBeacon.
+    :param beacon_uuid: Proximity UUID as a string or ``uuid.UUID``
+    :param major: Major number (0 - 65535)
+    :param minor: Minor number (0 - 65535)
+    :param tx_power: Measured power at 1 m in dBm
+    :return: bytes to advertise with ``IBEACON_COMPANY_ID``
+
+    :Example:
+
+    >>> beacon = broadcaster.Beacon()
+    >>> beacon.add_manufacturer_data(
+    >>>     broadcaster.IBEACON_COMPANY_ID,
+    >>>     broadcaster.ibeacon('e2c56db5-dffb-48d2-b060-d0f5a71096e0', 1, 2))
+    """
+    return pack_manufacturer_data(tools.IBEACON.format, tools.IBEACON_TYPE,
+                                  uuid.UUID(str(beacon_uuid)).bytes,
+                                  major, minor, tx_power)
 
 
 class Beacon:
@@ -18,13 +93,11 @@ class Beacon:
         If an adapter object is not given then the first adapter found is used
         :param adapter_addr: Optional Python adapter object.
         """
-        self.dongle = None
-        if adapter_addr is None:
-            self.dongle = adapter.Adapter(adapter.list_adapters()[0])
-        else:
-            self.dongle = adapter.Adapter(adapter_addr)
+        self.dongle = adapter.Adapter(adapter_addr)
 
-        self.broadcaster = advertisement.Advertisement(1, 'broadcast')
+        self.broadcaster = advertisement.Advertisement(None, 'broadcast')
+        self._ad_manager = None
+        self._manufacturer_data = {}
 
     def add_service_data(self, service, data):
         """
@@ -38,11 +111,16 @@ class Beacon:
     def add_manufacturer_data(self, manufacturer, data):
         """
         Add manufacturer information to be used in beacon message
+        Data of several companies can be added. Adding data for a company
+        again replaces it.
         :param manufacturer: Use numbers from Bluetooth SIG
         https://www.bluetooth.com/specifications/assigned-numbers/16-bit-UUIDs-for-Members
-        :param data: Data to be sent (Limit of ??)
+        :param data: Data to be sent as bytes or a list of octets. With the
+                     other advertising data it must fit in 31 bytes (251
+                     for extended advertising) or a warning is logged.
         """
-        pass
+        self._manufacturer_data[manufacturer] = bytes(data)
+        self.broadcaster.manufacturer_data = dict(self._manufacturer_data)
 
     def include_tx_power(self, show_power=None):
         """
@@ -57,19 +135,210 @@ class Beacon:
         else:
             self.broadcaster.include_tx_power = show_power
 
-    def start_beacon(self):
+    def start(self):
         """
-        Start beacon advertising
+        Register the beacon advertisement and return at once.
+
+        The advertisement is broadcast while an event loop runs in the
+        process (for example that of a scanner or GATT server).
         """
+        if self._ad_manager is not None:
+            return
         if not self.dongle.powered:
             self.dongle.powered = True
-        ad_manager = advertisement.AdvertisingManager(self.dongle.address)
-        ad_manager.register_advertisement(self.broadcaster, {})
+        self._ad_manager = advertisement.AdvertisingManager(
+            self.dongle.path)
+        self._ad_manager.register_advertisement(self.broadcaster, {})
 
+    def stop(self):
+        """
+        Unregister the beacon advertisement.
+
+        Calling it when the beacon is not started does nothing.
+        """
+        if self._ad_manager is None:
+            return
+        ad_manager = self._ad_manager
+        self._ad_manager = None
+        try:
+            ad_manager.unregister_advertisement(self.broadcaster)
+        except dbus.exceptions.DBusException as error:
+            logger.warning('Unregistering %s failed: %s',
+                           self.broadcaster.path, error)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start_beacon(self):
+        """
+        Start beacon advertising and run the event loop until Ctrl-C.
+
+        Use :meth:`start` and :meth:`stop`, or the beacon as a context
+        manager, to advertise without blocking.
+
+        :Example:
+
+        >>> with broadcaster.Beacon() as beacon:
+        >>>     beacon.add_service_data('FEAA', data)
+        >>>     eventloop.run()
+        """
+        self.start()
         try:
             self.broadcaster.start()
         except KeyboardInterrupt:
             self.broadcaster.stop()
-            ad_manager.unregister_advertisement(self.broadcaster)
         finally:
-            pass
+            self.stop()
+
+
+class RotatingBeacon:
+    """
+    Broadcast several beacon frames in turn.
+
+    Each frame is shown for its own dwell time. Frames are shared out
+    between one or more advertising instances which are registered once.
+    Switching frame changes the properties of the registered advertisement
+    and signals ``PropertiesChanged`` which BlueZ uses to update the
+    advertising data. For BlueZ versions that do not follow property
+    changes use ``reregister=True`` to register the advertisement again on
+    each switch.
+
+    :Example:
+
+    >>> from bluezero import broadcaster
+    >>> beacon = broadcaster.RotatingBeacon()
+    >>> beacon.add_service_frame('FEAA', eddystone_url, dwell=0.5)
+    >>> beacon.add_manufacturer_frame(0x004C, ibeacon, dwell=1.5)
+    >>> beacon.start()
+    """
+    def __init__(self, adapter_addr=None, instances=1, reregister=False):
+        """Default initialiser.
+
+        :param adapter_addr: Optional address of the adapter to use.
+        :param instances: Number of advertisements broadcast at once.
+        :param reregister: Register again on each switch instead of
+                           relying on ``PropertiesChanged``.
+        """
+        self.dongle = adapter.Adapter(adapter_addr)
+        self.adverts = [advertisement.Advertisement(None, 'broadcast')
+                        for _ in range(instances)]
+        self.reregister = reregister
+        self.frames = []
+        self.switches = 0
+        self.eventloop = async_tools.EventLoop()
+        self._ad_manager = None
+        self._positions = [0] * instances
+        self._timers = {}
+
+    def add_frame(self, properties, dwell=1.0):
+        """
+        Add a frame of advertisement properties to the rotation.
+
+        Properties in ``FRAME_PROPERTIES`` that are not given are removed
+        from the advertisement while the frame is shown.
+        :param properties: Advertisement properties (e.g. ``ServiceData``)
+        :param dwell: Seconds the frame is broadcast for
+        :return: index of the frame
+        """
+        frame = dict.fromkeys(FRAME_PROPERTIES)
+        frame.update(properties)
+        self.frames.append((frame, dwell))
+        return len(self.frames) - 1
+
+    def add_service_frame(self, service, data, dwell=1.0):
+        """
+        Add a frame of service data (e.g. an Eddystone frame).
+        :param service: Valid service UUID
+        :param data: Service data to be sent
+        :param dwell: Seconds the frame is broadcast for
+        :return: index of the frame
+        """
+        return self.add_frame(
+            {'ServiceUUIDs': [service],
+             'ServiceData': {service: dbus.Array(data, signature='y')}},
+            dwell)
+
+    def add_manufacturer_frame(self, manufacturer, data, dwell=1.0):
+        """
+        Add a frame of manufacturer data (e.g. an iBeacon frame).
+        :param manufacturer: Company identifier from the Bluetooth SIG
+        :param data: Manufacturer data to be sent
+        :param dwell: Seconds the frame is broadcast for
+        :return: index of the frame
+        """
+        return self.add_frame(
+            {'ManufacturerData': {
+                manufacturer: dbus.Array(data, signature='y')}},
+            dwell)
+
+    def _instance_frames(self, instance):
+        """Frames broadcast by an advertising instance."""
+        return self.frames[instance::len(self.adverts)]
+
+    def start(self, blocking=True):
+        """
+        Register the advertisements and start rotating the frames.
+        :param blocking: Run the event loop until stopped.
+        """
+        if not self.dongle.powered:
+            self.dongle.powered = True
+        self._ad_manager = advertisement.AdvertisingManager(
+            self.dongle.path)
+        for instance, advert in enumerate(self.adverts):
+            if not self._instance_frames(instance):
+                continue
+            self._positions[instance] = 0
+            self._show(instance, registered=False)
+            self._ad_manager.register_advertisement(advert, {})
+        if blocking:
+            try:
+                self.eventloop.run()
+            except KeyboardInterrupt:
+                self.stop()
+
+    def stop(self):
+        """
+        Stop rotating the frames and unregister the advertisements.
+        """
+        for source_id in self._timers.values():
+            self.eventloop.remove_timer(source_id)
+        self._timers.clear()
+        if self._ad_manager is not None:
+            for instance, advert in enumerate(self.adverts):
+                if not self._instance_frames(instance):
+                    continue
+                try:
+                    self._ad_manager.unregister_advertisement(advert)
+                except dbus.exceptions.DBusException as error:
+                    logger.warning('Unregistering %s failed: %s',
+                                   advert.path, error)
+            self._ad_manager = None
+        self.eventloop.quit()
+
+    def _show(self, instance, registered=True):
+        """Broadcast the current frame of an instance and time the next."""
+        frames = self._instance_frames(instance)
+        frame, dwell = frames[self._positions[instance]]
+        advert = self.adverts[instance]
+        if registered and self.reregister:
+            self._ad_manager.unregister_advertisement(advert)
+            advert.set_properties(frame)
+            self._ad_manager.register_advertisement(advert, {})
+        else:
+            advert.set_properties(frame)
+        if len(frames) > 1:
+            self._timers[instance] = self.eventloop.add_timer(
+                int(dwell * 1000), lambda: self._next_frame(instance))
+
+    def _next_frame(self, instance):
+        """Timer callback switching an instance to its next frame."""
+        frames = self._instance_frames(instance)
+        self._positions[instance] = \
+            (self._positions[instance] + 1) % len(frames)
+        self.switches += 1
+        self._show(instance)
+        return False
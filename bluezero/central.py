@@ -22,7 +22,22 @@ logger.addHandler(NullHandler())
 class Central:
     """Create a BLE instance taking the Central role."""
 
-    def __init__(self, device_addr, adapter_addr=None):
+    def __init__(self, device_addr, adapter_addr=None, adapter_pool=None):
+        """
+        Create a Central for the given remote device.
+
+        :param device_addr: Address of the remote device
+        :param adapter_addr: (optional) Address of the adapter to use
+        :param adapter_pool: (optional) ``adapter.AdapterPool`` to choose
+                             the adapter from when ``adapter_addr`` is None.
+                             A link is reserved by :meth:`connect` and
+                             released by :meth:`disconnect` or when the
+                             connection fails.
+        """
+        self._pool = None
+        if adapter_addr is None and adapter_pool is not None:
+            adapter_addr = adapter_pool.choose(device_addr)
+            self._pool = adapter_pool
         if adapter_addr is None:
             self.dongle = adapter.Adapter()
             logger.debug('Adapter is: {}'.format(self.dongle.address))
@@ -75,17 +90,26 @@ class Central:
 
         :param profile: (optional) profile to use for the connection.
         """
-        if profile is None:
-            self.rmt_device.connect()
-        else:
-            self.rmt_device.connect(profile)
-        while not self.rmt_device.services_resolved:
-            sleep(0.5)
-        self.load_gatt()
+        if self._pool is not None:
+            self._pool.acquire(self.rmt_device.address, self.dongle.address)
+        try:
+            if profile is None:
+                self.rmt_device.connect()
+            else:
+                self.rmt_device.connect(profile)
+            while not self.rmt_device.services_resolved:
+                sleep(0.5)
+            self.load_gatt()
+        except Exception:
+            if self._pool is not None:
+                self._pool.release(self.rmt_device.address)
+            raise
 
     def disconnect(self):
         """Disconnect from the remote device."""
         self.rmt_device.disconnect()
+        if self._pool is not None:
+            self._pool.release(self.rmt_device.address)
 
     def run(self):
         self.dongle.run()
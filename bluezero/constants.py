@@ -17,10 +17,14 @@ constants around the python-bluezero library.
 DBUS_OM_IFACE = 'org.freedesktop.DBus.ObjectManager'
 #: DBus Properties interface
 DBUS_PROP_IFACE = 'org.freedesktop.DBus.Properties'
+#: DBus Introspectable interface
+DBUS_INTROSPECT_IFACE = 'org.freedesktop.DBus.Introspectable'
 
 # General Bluez D-Bus Object Paths
 #: BlueZ DBus Service Name
 BLUEZ_SERVICE_NAME = 'org.bluez'
+#: BlueZ DBus object path that adapters are children of
+BLUEZ_ROOT_PATH = '/org/bluez'
 #: BlueZ DBus adapter interface
 ADAPTER_INTERFACE = 'org.bluez.Adapter1'
 #: BlueZ DBus device Interface
@@ -43,3 +47,9 @@ GATT_DESC_IFACE = 'org.bluez.GattDescriptor1'
 LE_ADVERTISING_MANAGER_IFACE = 'org.bluez.LEAdvertisingManager1'
 #: BlueZ DBus Advertisement Interface
 LE_ADVERTISEMENT_IFACE = 'org.bluez.LEAdvertisement1'
+
+# Bluez Advertisement Monitor D-Bus object paths
+#: BlueZ DBus Advertisement Monitor Manager Interface
+ADV_MONITOR_MANAGER_IFACE = 'org.bluez.AdvertisementMonitorManager1'
+#: BlueZ DBus Advertisement Monitor Interface
+ADV_MONITOR_IFACE = 'org.bluez.AdvertisementMonitor1'
@@ -3,6 +3,7 @@
 # Standard libraries
 import re
 import subprocess
+from xml.etree import ElementTree
 import logging
 try:  # Python 2.7+
     from logging import NullHandler
@@ -15,8 +16,9 @@ except ImportError:
 import dbus
 import dbus.mainloop.glib
 
-# python-bluezero constants import
+# python-bluezero imports
 from bluezero import constants
+from bluezero import instrumentation
 
 dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
 
@@ -25,6 +27,11 @@ logger.setLevel(logging.WARNING)
 logger.addHandler(NullHandler())
 
 
+class AdapterError(Exception):
+    """No Bluetooth adapter was found (also ``adapter.AdapterError``)."""
+    pass
+
+
 def bluez_version():
     """
     get the version of the BlueZ daemon being used on the system
@@ -93,18 +100,61 @@ def get_dbus_iface(iface, dbus_obj):
     :param dbus_obj:
     :return:
     """
-    return dbus.Interface(dbus_obj, iface)
+    return instrumentation.wrap_interface(dbus.Interface(dbus_obj, iface),
+                                          iface)
 
 
 def get_managed_objects():
     """Return the objects currently managed by the DBus Object Manager."""
     bus = dbus.SystemBus()
-    manager = dbus.Interface(bus.get_object(
-        constants.BLUEZ_SERVICE_NAME, '/'),
-        constants.DBUS_OM_IFACE)
+    manager = get_dbus_iface(constants.DBUS_OM_IFACE,
+                             bus.get_object(constants.BLUEZ_SERVICE_NAME, '/'))
     return manager.GetManagedObjects()
 
 
+def get_adapter_paths():
+    """
+    Return the DBus paths of the Bluetooth adapters on the system.
+
+    Only the children of ``/org/bluez`` are introspected so the cost does not
+    grow with the number of devices BlueZ has cached.
+    :return: List of adapter paths sorted by adapter index
+    """
+    bus = dbus.SystemBus()
+    introspect = get_dbus_iface(
+        constants.DBUS_INTROSPECT_IFACE,
+        bus.get_object(constants.BLUEZ_SERVICE_NAME,
+                       constants.BLUEZ_ROOT_PATH))
+    root = ElementTree.fromstring(str(introspect.Introspect()))
+    indexes = []
+    for node in root.findall('node'):
+        match = re.match(r'hci(\d+)$', node.get('name', ''))
+        if match is not None:
+            indexes.append(int(match.group(1)))
+    return ['{}/hci{}'.format(constants.BLUEZ_ROOT_PATH, index)
+            for index in sorted(indexes)]
+
+
+def get_adapter_path(adapter):
+    """
+    Return the DBus path of an adapter without dumping the object tree.
+
+    :param adapter: Adapter address, name (e.g. ``'hci0'``) or DBus path
+    :return: DBus path of the adapter
+    :raises AdapterError: if no adapter has the address
+    """
+    if adapter.startswith('/'):
+        return adapter
+    if re.match(r'hci\d+$', adapter):
+        return '{}/{}'.format(constants.BLUEZ_ROOT_PATH, adapter)
+    for path in get_adapter_paths():
+        props = get_dbus_iface(dbus.PROPERTIES_IFACE, get_dbus_obj(path))
+        address = props.Get(constants.ADAPTER_INTERFACE, 'Address')
+        if address.lower() == adapter.lower():
+            return path
+    raise AdapterError('No adapter found with address {}'.format(adapter))
+
+
 def _get_dbus_path2(objects, parent_path, iface_in, prop, value):
     """
     Find DBus path for given DBus interface with property of a given value.
@@ -142,9 +192,8 @@ def get_dbus_path(adapter=None,
     :return: DBus path
     """
     bus = dbus.SystemBus()
-    manager = dbus.Interface(
-        bus.get_object(constants.BLUEZ_SERVICE_NAME, '/'),
-        constants.DBUS_OM_IFACE)
+    manager = get_dbus_iface(constants.DBUS_OM_IFACE,
+                             bus.get_object(constants.BLUEZ_SERVICE_NAME, '/'))
     mngd_objs = manager.GetManagedObjects()
 
     _dbus_obj_path = None
@@ -197,9 +246,8 @@ def get_profile_path(adapter,
     :return:
     """
     bus = dbus.SystemBus()
-    manager = dbus.Interface(
-        bus.get_object(constants.BLUEZ_SERVICE_NAME, '/'),
-        constants.DBUS_OM_IFACE)
+    manager = get_dbus_iface(constants.DBUS_OM_IFACE,
+                             bus.get_object(constants.BLUEZ_SERVICE_NAME, '/'))
     mngd_objs = manager.GetManagedObjects()
 
     _dbus_obj_path = None
@@ -23,6 +23,7 @@ except ImportError:
 
 from bluezero import constants
 from bluezero import dbus_tools
+from bluezero import instrumentation
 
 
 logger = logging.getLogger(__name__)
@@ -56,11 +57,14 @@ class Device:
         self.remote_device_obj = self.bus.get_object(
             constants.BLUEZ_SERVICE_NAME,
             self.remote_device_path)
-        self.remote_device_methods = dbus.Interface(
-            self.remote_device_obj,
+        self.remote_device_methods = instrumentation.wrap_interface(
+            dbus.Interface(self.remote_device_obj,
+                           constants.DEVICE_INTERFACE),
             constants.DEVICE_INTERFACE)
-        self.remote_device_props = dbus.Interface(self.remote_device_obj,
-                                                  dbus.PROPERTIES_IFACE)
+        self.remote_device_props = instrumentation.wrap_interface(
+            dbus.Interface(self.remote_device_obj,
+                           dbus.PROPERTIES_IFACE),
+            dbus.PROPERTIES_IFACE)
 
     @property
     def address(self):
@@ -7,10 +7,37 @@ https://github.com/google/eddystone
 
 This is the broadcaster role which currently requires BlueZ to
 have the experimental flag enabled
+
+The frame classes only build the service data of a frame. They keep it
+in a ``bytearray`` where only the fields that change are packed on each
+update, so telemetry can be refreshed often without rebuilding the frame.
 """
+import struct
+
 from bluezero import tools
 from bluezero import broadcaster
 
+# Service UUID of Eddystone frames
+SERVICE_UUID = tools.EDDYSTONE_UUID
+
+# Frame types
+UID_FRAME = 0x00
+URL_FRAME = 0x10
+TLM_FRAME = 0x20
+EID_FRAME = 0x30
+
+_UID = tools.EDDYSTONE_UID
+_TLM = tools.EDDYSTONE_TLM
+_TLM_BATTERY = struct.Struct('>H')
+_TLM_TEMPERATURE = struct.Struct('>h')
+_TLM_COUNTS = struct.Struct('>II')
+# Frame type, ranging data and ephemeral identifier
+_EID = struct.Struct('>Bb8s')
+# Frame type, Tx power, URL scheme and up to 17 bytes of encoded URL
+URL_FRAME_MAX_SIZE = 20
+# Temperature value meaning "not supported"
+TLM_NO_TEMPERATURE = tools.EDDYSTONE_NO_TEMPERATURE
+
 
 class EddystoneURL:
     """
@@ -23,17 +50,181 @@ class EddystoneURL:
     >>> from bluezero import eddystone
     >>> eddystone.EddystoneURL('https://github.com/ukBaz')
 
+    To broadcast alongside other work in the same event loop:
+
+    >>> with eddystone.EddystoneURL('https://github.com/ukBaz',
+    >>>                             blocking=False):
+    >>>     eventloop.run()
+
     """
-    def __init__(self, url, tx_power=0x08):
+    def __init__(self, url, tx_power=0x08, blocking=True):
         """
 
         :param url: String containing URL e.g. ('http://camjam.me')
         :param tx_power: Value of Tx Power of advertisement (Not implemented)
+        :param blocking: Run the event loop until Ctrl-C. If False the
+                         beacon is registered and the object returned, use
+                         :meth:`stop` or a ``with`` block to unregister it.
+
+        """
+        frame = URLFrame(url, tx_power)
+        self.beacon = broadcaster.Beacon()
+        self.beacon.add_service_data(SERVICE_UUID, bytes(frame.data))
+        if blocking:
+            self.beacon.start_beacon()
+        else:
+            self.beacon.start()
+
+    def start(self):
+        """Register the beacon again after :meth:`stop`."""
+        self.beacon.start()
+
+    def stop(self):
+        """Unregister the beacon."""
+        self.beacon.stop()
+
+    def __enter__(self):
+        self.beacon.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.beacon.stop()
+
+
+class Frame:
+    """
+    Service data of an Eddystone frame.
+
+    ``data`` is the ``bytearray`` that is updated in place.
+    """
+    def __init__(self, data):
+        self.data = data
+
+    @property
+    def service_data(self):
+        """
+        Service data in the form used by ``Advertisement.service_data``.
+
+        The frame is copied to ``bytes`` so it is sent as an array of
+        bytes and later changes to ``data`` need a new update.
+        """
+        return {SERVICE_UUID: bytes(self.data)}
+
+    def __len__(self):
+        return len(self.data)
 
+
+class UIDFrame(Frame):
+    """
+    Eddystone-UID frame with a 10 byte namespace and 6 byte instance.
+
+    :Example:
+
+    >>> frame = eddystone.UIDFrame(bytes.fromhex('8b0ca750e7a74e14bd99'),
+    >>>                            bytes.fromhex('000000000001'), -20)
+    >>> frame.service_data
+    """
+    def __init__(self, namespace, instance, tx_power=0):
+        """
+        :param namespace: 10 bytes identifying the beacon owner
+        :param instance: 6 bytes identifying the beacon
+        :param tx_power: Calibrated Tx power at 0 m in dBm
+        """
+        if len(namespace) != 10 or len(instance) != 6:
+            raise ValueError('UID needs a 10 byte namespace and '
+                             '6 byte instance')
+        Frame.__init__(self, bytearray(_UID.pack(UID_FRAME, tx_power,
+                                                 bytes(namespace),
+                                                 bytes(instance))))
+
+
+class URLFrame(Frame):
+    """
+    Eddystone-URL frame.
+    """
+    def __init__(self, url, tx_power=0x08):
+        """
+        :param url: String containing URL e.g. ('http://camjam.me')
+        :param tx_power: Calibrated Tx power at 0 m in dBm
+        """
+        data = tools.url_to_advert(url, URL_FRAME, tx_power & 0xFF)
+        if len(data) > URL_FRAME_MAX_SIZE:
+            raise ValueError('URL too long')
+        Frame.__init__(self, bytearray(data))
+
+
+class TLMFrame(Frame):
+    """
+    Unencrypted Eddystone-TLM (telemetry) frame.
+
+    Only the fields given to :meth:`update` are packed into the frame.
+
+    :Example:
+
+    >>> tlm = eddystone.TLMFrame()
+    >>> tlm.update(battery=3000, temperature=21.5, adv_count=1200,
+    >>>            uptime=360.5)
+    >>> beacon.update({'ServiceData': tlm.service_data})
+    """
+    def __init__(self, battery=0, temperature=None, adv_count=0, uptime=0):
+        """
+        :param battery: Battery voltage in mV, 0 if not supported
+        :param temperature: Beacon temperature in Celsius or None if not
+                            supported
+        :param adv_count: Number of advertisements sent since power-up
+        :param uptime: Seconds since power-up
+        """
+        Frame.__init__(self, bytearray(_TLM.size))
+        self.data[0] = TLM_FRAME
+        self.update(battery, temperature, adv_count, uptime)
+        if temperature is None:
+            _TLM_TEMPERATURE.pack_into(self.data, 4, TLM_NO_TEMPERATURE)
+
+    def update(self, battery=None, temperature=None, adv_count=None,
+               uptime=None):
+        """
+        Patch new telemetry values into the frame.
+
+        Values that are None are left unchanged.
+        :param battery: Battery voltage in mV
+        :param temperature: Beacon temperature in Celsius
+        :param adv_count: Number of advertisements sent since power-up
+        :param uptime: Seconds since power-up
+        """
+        if battery is not None:
+            _TLM_BATTERY.pack_into(self.data, 2, battery)
+        if temperature is not None:
+            _TLM_TEMPERATURE.pack_into(self.data, 4,
+                                       int(round(temperature * 256)))
+        if adv_count is not None or uptime is not None:
+            counts = _TLM_COUNTS.unpack_from(self.data, 6)
+            _TLM_COUNTS.pack_into(
+                self.data, 6,
+                counts[0] if adv_count is None else adv_count,
+                counts[1] if uptime is None else int(uptime * 10))
+
+
+class EIDFrame(Frame):
+    """
+    Eddystone-EID frame with an 8 byte ephemeral identifier.
+
+    The identifier is computed from the beacon identity key by the caller
+    and given to :meth:`update` each time it rotates.
+    """
+    def __init__(self, eid, tx_power=0):
+        """
+        :param eid: 8 byte ephemeral identifier
+        :param tx_power: Calibrated Tx power at 0 m in dBm
+        """
+        Frame.__init__(self, bytearray(_EID.size))
+        _EID.pack_into(self.data, 0, EID_FRAME, tx_power, b'')
+        self.update(eid)
+
+    def update(self, eid):
+        """
+        Patch a new ephemeral identifier into the frame.
+        :param eid: 8 byte ephemeral identifier
         """
-        service_data = tools.url_to_advert(url, 0x10, tx_power)
-        if len(service_data) > 17:
-            raise Exception('URL too long')
-        url_beacon = broadcaster.Beacon()
-        url_beacon.add_service_data('FEAA', service_data)
-        url_beacon.start_beacon()
+        if len(eid) != 8:
+            raise ValueError('EID must be 8 bytes')
+        self.data[2:] = eid
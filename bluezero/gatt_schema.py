@@ -0,0 +1,315 @@
+"""Build a GATT server from a declarative schema.
+
+The services, characteristics and descriptors of a server are described
+in a dictionary, JSON file or YAML file (YAML needs ``PyYAML``)::
+
+    services:
+      - uuid: '180F'
+        characteristics:
+          - name: battery_level
+            uuid: '2A19'
+            flags: [read, notify]
+            value: 100
+            presentation: {format: uint8, unit: 0x27AD}
+            description: Battery level
+
+The schema is checked and normalised once by :func:`load` and then
+compiled into ``localGATT`` objects by :class:`Database`.
+
+Classes:
+
+- Database -- ``localGATT`` objects compiled from a schema
+
+Functions:
+
+- load -- Read and normalise a schema
+- presentation_format -- Value of a Characteristic Presentation Format
+- encode_value -- Initial value of a characteristic or descriptor
+"""
+import json
+import os
+import struct
+
+import logging
+try:  # Python 2.7+
+    from logging import NullHandler
+except ImportError:
+    class NullHandler(logging.Handler):
+        def emit(self, record):
+            pass
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+from bluezero import localGATT
+from bluezero import tools
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+logger.addHandler(NullHandler())
+
+# Descriptor UUIDs created from the short forms in a schema
+USER_DESCRIPTION_UUID = '2901'
+PRESENTATION_FORMAT_UUID = '2904'
+
+# Format types of the Characteristic Presentation Format descriptor
+FORMAT_TYPES = {
+    'boolean': 0x01, 'uint2': 0x02, 'uint4': 0x03, 'uint8': 0x04,
+    'uint12': 0x05, 'uint16': 0x06, 'uint24': 0x07, 'uint32': 0x08,
+    'uint48': 0x09, 'uint64': 0x0A, 'uint128': 0x0B, 'sint8': 0x0C,
+    'sint12': 0x0D, 'sint16': 0x0E, 'sint24': 0x0F, 'sint32': 0x10,
+    'sint48': 0x11, 'sint64': 0x12, 'sint128': 0x13, 'float32': 0x14,
+    'float64': 0x15, 'SFLOAT': 0x16, 'FLOAT': 0x17, 'duint16': 0x18,
+    'utf8s': 0x19, 'utf16s': 0x1A, 'struct': 0x1B,
+}
+
+# Encoding of numeric initial values for a presentation format
+_VALUE_STRUCTS = {
+    'boolean': '<?', 'uint8': '<B', 'uint16': '<H', 'uint32': '<I',
+    'uint64': '<Q', 'sint8': '<b', 'sint16': '<h', 'sint32': '<i',
+    'sint64': '<q', 'float32': '<f', 'float64': '<d',
+}
+# Size in bytes and signedness of integer formats struct has no code for
+_INT_WIDTHS = {
+    'uint24': (3, False), 'uint48': (6, False),
+    'sint24': (3, True), 'sint48': (6, True),
+}
+
+# Format, exponent, unit, name space and description
+_PRESENTATION_STRUCT = struct.Struct('<BbHBH')
+# Bluetooth SIG Assigned Numbers name space
+SIG_NAMESPACE = 0x01
+# Unit "unitless"
+UNITLESS = 0x2700
+
+
+def presentation_format(format, exponent=0, unit=UNITLESS,
+                        namespace=SIG_NAMESPACE, description=0):
+    """
+    Value of a Characteristic Presentation Format descriptor.
+
+    :param format: format type name (e.g. ``'sint16'``) or number
+    :param exponent: base 10 exponent of the characteristic value
+    :param unit: unit UUID as a number (e.g. ``0x272F`` for Celsius)
+    :param namespace: name space of the description
+    :param description: description of the characteristic
+    :return: list of octets
+
+    :Example:
+
+    >>> gatt_schema.presentation_format('sint16', exponent=-2, unit=0x272F)
+    [14, 254, 47, 39, 1, 0, 0]
+    """
+    if not isinstance(format, int):
+        try:
+            format = FORMAT_TYPES[format]
+        except KeyError:
+            raise ValueError('Unknown presentation format {}'.format(format))
+    return list(_PRESENTATION_STRUCT.pack(format, exponent, _number(unit),
+                                          namespace, description))
+
+
+def encode_value(value, format=None):
+    """
+    Initial value of a characteristic or descriptor.
+
+    :param value: list of octets, string (UTF-8 encoded), number, or
+                  ``None`` for an empty value
+    :param format: (optional) format type name used to encode numbers
+    :return: list of octets
+    :raises ValueError: if the value does not fit the format, or is a
+                        negative number or float without a format
+    """
+    if value is None:
+        return []
+    try:
+        if format in _VALUE_STRUCTS and isinstance(value,
+                                                   (bool, int, float)):
+            return list(struct.pack(_VALUE_STRUCTS[format], value))
+        if format in _INT_WIDTHS and isinstance(value, int):
+            size, signed = _INT_WIDTHS[format]
+            return list(value.to_bytes(size, byteorder='little',
+                                       signed=signed))
+        return list(tools.value_to_bytes(value))
+    except (OverflowError, TypeError, struct.error) as err:
+        raise ValueError('Cannot encode {!r}: {}'.format(value, err))
+
+
+def _number(value):
+    """Numbers may be given as hex strings in a schema."""
+    if isinstance(value, str):
+        return int(value, 16)
+    return value
+
+
+def _is_path(source):
+    """Whether a string names a schema file rather than holding one."""
+    if '\n' in source:
+        return False
+    return (os.path.isfile(source) or
+            source.endswith(('.json', '.yaml', '.yml')))
+
+
+def _read(source):
+    """Read the schema dictionary from a file or string."""
+    if isinstance(source, (dict, list)):
+        return source
+    if hasattr(source, 'read'):
+        name = getattr(source, 'name', '')
+        text = source.read()
+    elif _is_path(source):
+        name = source
+        with open(source) as schema_file:
+            text = schema_file.read()
+    else:
+        name = ''
+        text = source
+    if name.endswith(('.yaml', '.yml')) or not text.lstrip().startswith(
+            ('{', '[')):
+        if yaml is None:
+            raise ValueError('PyYAML is needed for YAML schemas')
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+
+def load(source):
+    """
+    Read and normalise a GATT schema.
+
+    Every service, characteristic and descriptor gets its object number
+    and all values are encoded, so the schema can be compiled quickly any
+    number of times. Characteristic names, which default to the UUID, must
+    be unique in the whole schema as :class:`Database` looks them up by
+    name.
+
+    :param source: dictionary, list of services, path of a JSON or YAML
+                   file, open file or JSON/YAML text
+    :return: list of service dictionaries
+
+    :Example:
+
+    >>> schema = gatt_schema.load('battery.yaml')
+    >>> database = gatt_schema.Database(schema)
+    """
+    data = _read(source)
+    if isinstance(data, dict):
+        data = data.get('services', [])
+    services = []
+    names = {}
+    for srv_id, srv in enumerate(data, 1):
+        if 'uuid' not in srv:
+            raise ValueError('Service {} has no uuid'.format(srv_id))
+        characteristics = []
+        for chr_id, chrc in enumerate(srv.get('characteristics', []), 1):
+            characteristic = _characteristic(srv_id, chr_id, chrc)
+            if characteristic['name'] in names:
+                raise ValueError(
+                    'Characteristic {} of service {} has the same name as '
+                    'one of service {}: {}'.format(
+                        chr_id, srv_id, names[characteristic['name']],
+                        characteristic['name']))
+            names[characteristic['name']] = srv_id
+            characteristics.append(characteristic)
+        services.append({
+            'id': srv_id,
+            'uuid': srv['uuid'],
+            'primary': bool(srv.get('primary', True)),
+            'characteristics': characteristics})
+    return services
+
+
+def _characteristic(srv_id, chr_id, chrc):
+    """Normalise a characteristic and its descriptors."""
+    if 'uuid' not in chrc:
+        raise ValueError('Characteristic {} of service {} has no uuid'.format(
+            chr_id, srv_id))
+    name = chrc.get('name', chrc['uuid'])
+    presentation = chrc.get('presentation')
+    value_format = None
+    descriptors = list(chrc.get('descriptors', []))
+    if 'description' in chrc:
+        descriptors.append({'uuid': USER_DESCRIPTION_UUID,
+                            'value': chrc['description'],
+                            'flags': ['read']})
+    if presentation is not None:
+        value_format = presentation.get('format')
+        descriptors.append({'uuid': PRESENTATION_FORMAT_UUID,
+                            'value': presentation_format(**presentation),
+                            'flags': ['read']})
+    try:
+        value = encode_value(chrc.get('value'), value_format)
+    except ValueError as err:
+        raise ValueError('Characteristic {} of service {}: {}'.format(
+            name, srv_id, err))
+    return {
+        'id': chr_id,
+        'name': name,
+        'uuid': chrc['uuid'],
+        'value': value,
+        'notifying': bool(chrc.get('notifying', False)),
+        'flags': list(chrc.get('flags', ['read'])),
+        'descriptors': [{'id': dsc_id,
+                         'uuid': dsc['uuid'],
+                         'value': encode_value(dsc.get('value')),
+                         'flags': list(dsc.get('flags', ['read']))}
+                        for dsc_id, dsc in enumerate(descriptors, 1)]}
+
+
+class Database:
+    """
+    ``localGATT`` objects compiled from a GATT schema.
+
+    All objects are created under one application and are available by
+    characteristic name so callbacks can be added and values updated.
+
+    :Example:
+
+    >>> database = gatt_schema.Database('battery.yaml')
+    >>> database['battery_level'].Set(constants.GATT_CHRC_IFACE,
+    >>>                               'Value', [97])
+    >>> database.application.start()
+    """
+    def __init__(self, schema, application=None):
+        """Default initialiser.
+
+        :param schema: schema normalised by :func:`load` or any source
+                       :func:`load` accepts
+        :param application: (optional) ``localGATT.Application`` to add the
+                            objects to. A new one is created if not given.
+        """
+        if not isinstance(schema, list) or not all(
+                'id' in srv for srv in schema):
+            schema = load(schema)
+        if application is None:
+            application = localGATT.Application()
+        self.application = application
+        self.services = []
+        self.characteristics = {}
+        self.descriptors = []
+
+        for srv in schema:
+            service = localGATT.Service(srv['id'], srv['uuid'],
+                                        srv['primary'], application)
+            application.add_managed_object(service)
+            self.services.append(service)
+            for chrc in srv['characteristics']:
+                characteristic = localGATT.Characteristic(
+                    chrc['id'], chrc['uuid'], service, chrc['value'],
+                    chrc['notifying'], chrc['flags'])
+                application.add_managed_object(characteristic)
+                self.characteristics[chrc['name']] = characteristic
+                for dsc in chrc['descriptors']:
+                    descriptor = localGATT.Descriptor(
+                        dsc['id'], dsc['uuid'], characteristic,
+                        dsc['value'], dsc['flags'])
+                    application.add_managed_object(descriptor)
+                    self.descriptors.append(descriptor)
+        logger.info('Compiled %d services, %d characteristics and '
+                    '%d descriptors', len(self.services),
+                    len(self.characteristics), len(self.descriptors))
+
+    def __getitem__(self, name):
+        """Characteristic with the given name or UUID."""
+        return self.characteristics[name]
@@ -0,0 +1,372 @@
+"""Instrumentation hooks for the D-Bus traffic generated by Bluezero.
+
+Every outgoing D-Bus method call, property ``Get``/``Set`` and incoming
+signal made through the Bluezero helpers can be timed, counted per
+interface/member and have its payload size estimated. Instrumentation is
+off by default and costs nothing until it is enabled.
+
+Instrumentation must be enabled *before* Bluezero objects are created as the
+D-Bus interfaces are wrapped when they are first looked up.
+
+:Example:
+
+>>> from bluezero import instrumentation
+>>> from bluezero import adapter
+>>> instrumentation.enable()
+>>> dongle = adapter.Adapter()
+>>> dongle.powered
+>>> instrumentation.snapshot()
+>>> print(instrumentation.to_prometheus())
+
+A different back end can be plugged in by sub-classing :class:`Recorder`
+and passing an instance to :func:`enable`.
+"""
+import threading
+import time
+
+import logging
+try:  # Python 2.7+
+    from logging import NullHandler
+except ImportError:
+    class NullHandler(logging.Handler):
+        def emit(self, record):
+            pass
+
+from bluezero import constants
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+logger.addHandler(NullHandler())
+
+#: Outgoing D-Bus method call
+METHOD = 'method'
+#: Property read (``Get`` or ``GetAll``)
+PROPERTY_GET = 'get'
+#: Property write (``Set``)
+PROPERTY_SET = 'set'
+#: Incoming D-Bus signal
+SIGNAL = 'signal'
+
+# Interface methods that are not D-Bus round trips
+_PASSTHROUGH = ('connect_to_signal', 'get_dbus_method')
+
+_recorder = None
+
+
+class Recorder:
+    """Base class for instrumentation back ends.
+
+    Sub-classes must implement :meth:`record`. It is called once for every
+    completed D-Bus operation, possibly from a thread other than the one
+    running the main loop.
+    """
+
+    def record(self, kind, interface, member, duration,
+               bytes_out=0, bytes_in=0, error=False):
+        """Record one D-Bus operation.
+
+        :param kind: One of ``METHOD``, ``PROPERTY_GET``, ``PROPERTY_SET``
+                     or ``SIGNAL``
+        :param interface: D-Bus interface name
+        :param member: Method, property or signal name
+        :param duration: Time taken in seconds
+        :param bytes_out: Estimated size of the arguments sent
+        :param bytes_in: Estimated size of the reply or signal received
+        :param error: True if the operation raised an error
+        """
+        raise NotImplementedError
+
+    def snapshot(self):
+        """Return the recorded values as a dictionary."""
+        return {}
+
+    def to_prometheus(self, prefix='bluezero_dbus'):
+        """Return the recorded values in Prometheus text format."""
+        return ''
+
+
+class MetricsRecorder(Recorder):
+    """Default back end aggregating counters in memory."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, kind, interface, member, duration,
+               bytes_out=0, bytes_in=0, error=False):
+        key = (kind, interface, member)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = {'count': 0,
+                         'errors': 0,
+                         'total_time': 0.0,
+                         'max_time': 0.0,
+                         'bytes_out': 0,
+                         'bytes_in': 0}
+                self._stats[key] = stats
+            stats['count'] += 1
+            stats['total_time'] += duration
+            if duration > stats['max_time']:
+                stats['max_time'] = duration
+            stats['bytes_out'] += bytes_out
+            stats['bytes_in'] += bytes_in
+            if error:
+                stats['errors'] += 1
+
+    def reset(self):
+        """Clear all the recorded values."""
+        with self._lock:
+            self._stats = {}
+
+    def snapshot(self):
+        """Return a copy of the counters.
+
+        :return: Dictionary keyed by kind, then interface, then member
+        """
+        result = {}
+        with self._lock:
+            for (kind, interface, member), stats in self._stats.items():
+                members = result.setdefault(kind, {}).setdefault(interface,
+                                                                 {})
+                members[member] = dict(stats)
+        return result
+
+    def to_prometheus(self, prefix='bluezero_dbus'):
+        """Return the counters in the Prometheus text exposition format.
+
+        :param prefix: Prefix for the metric names
+        :return: String
+        """
+        metrics = (
+            ('calls_total', 'counter', 'Number of D-Bus operations',
+             'count', None),
+            ('errors_total', 'counter', 'Number of failed D-Bus operations',
+             'errors', None),
+            ('duration_seconds_sum', 'counter',
+             'Total time spent in D-Bus operations', 'total_time', None),
+            ('duration_seconds_max', 'gauge',
+             'Longest D-Bus operation', 'max_time', None),
+            ('payload_bytes_total', 'counter',
+             'Estimated D-Bus payload size', 'bytes_out', 'out'),
+            ('payload_bytes_total', None, None, 'bytes_in', 'in'),
+        )
+        with self._lock:
+            items = sorted(self._stats.items())
+        lines = []
+        for name, metric_type, help_text, field, direction in metrics:
+            metric = '{}_{}'.format(prefix, name)
+            if metric_type is not None:
+                lines.append('# HELP {} {}'.format(metric, help_text))
+                lines.append('# TYPE {} {}'.format(metric, metric_type))
+            for (kind, interface, member), stats in items:
+                labels = 'kind="{}",interface="{}",member="{}"'.format(
+                    kind, interface, member)
+                if direction is not None:
+                    labels += ',direction="{}"'.format(direction)
+                lines.append('{}{{{}}} {}'.format(metric, labels,
+                                                  stats[field]))
+        return '\n'.join(lines) + '\n'
+
+
+def enable(recorder=None):
+    """Enable instrumentation.
+
+    :param recorder: Optional :class:`Recorder`. A :class:`MetricsRecorder`
+                     is created if not given.
+    :return: The recorder in use
+    """
+    global _recorder
+    if recorder is None:
+        recorder = MetricsRecorder()
+    _recorder = recorder
+    return recorder
+
+
+def disable():
+    """Stop recording D-Bus operations."""
+    global _recorder
+    _recorder = None
+
+
+def get_recorder():
+    """Return the recorder in use or None if instrumentation is disabled."""
+    return _recorder
+
+
+def snapshot():
+    """Return the counters of the current recorder as a dictionary."""
+    if _recorder is None:
+        return {}
+    return _recorder.snapshot()
+
+
+def to_prometheus(prefix='bluezero_dbus'):
+    """Return the counters of the current recorder as Prometheus text."""
+    if _recorder is None:
+        return ''
+    return _recorder.to_prometheus(prefix)
+
+
+def payload_size(value):
+    """
+    Estimate the number of bytes a value takes when marshalled on D-Bus.
+
+    This is an approximation that ignores alignment padding.
+    :param value: Python or dbus-python value
+    :return: Integer number of bytes
+    """
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray)):
+        return len(value) + 4
+    if isinstance(value, str):
+        return len(value.encode('utf-8')) + 5
+    if isinstance(value, float):
+        return 8
+    if isinstance(value, int):
+        return 4
+    if isinstance(value, dict):
+        return 4 + sum(payload_size(key) + payload_size(item)
+                       for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return 4 + sum(payload_size(item) for item in value)
+    return 0
+
+
+def _classify(interface, member, args):
+    """Work out what kind of operation a call on an interface is."""
+    if interface == constants.DBUS_PROP_IFACE and len(args) > 0:
+        if member == 'Get' and len(args) > 1:
+            return PROPERTY_GET, args[0], args[1]
+        if member == 'GetAll':
+            return PROPERTY_GET, args[0], '*'
+        if member == 'Set' and len(args) > 1:
+            return PROPERTY_SET, args[0], args[1]
+    return METHOD, interface, member
+
+
+class _InstrumentedMethod:
+    """Callable that times a D-Bus method of an interface proxy."""
+
+    def __init__(self, method, interface, member):
+        self._method = method
+        self._interface = interface
+        self._member = member
+
+    def __call__(self, *args, **kwargs):
+        recorder = _recorder
+        if recorder is None:
+            return self._method(*args, **kwargs)
+
+        kind, interface, member = _classify(self._interface,
+                                            self._member,
+                                            args)
+        bytes_out = payload_size(args)
+        reply_handler = kwargs.get('reply_handler')
+        error_handler = kwargs.get('error_handler')
+        start = time.perf_counter()
+
+        if reply_handler is not None:
+            def _reply(*reply):
+                recorder.record(kind, interface, member,
+                                time.perf_counter() - start,
+                                bytes_out, payload_size(reply))
+                return reply_handler(*reply)
+
+            def _error(error):
+                recorder.record(kind, interface, member,
+                                time.perf_counter() - start,
+                                bytes_out, error=True)
+                if error_handler is not None:
+                    return error_handler(error)
+
+            kwargs['reply_handler'] = _reply
+            kwargs['error_handler'] = _error
+            return self._method(*args, **kwargs)
+
+        try:
+            result = self._method(*args, **kwargs)
+        except Exception:
+            recorder.record(kind, interface, member,
+                            time.perf_counter() - start,
+                            bytes_out, error=True)
+            raise
+        recorder.record(kind, interface, member,
+                        time.perf_counter() - start,
+                        bytes_out, payload_size(result))
+        return result
+
+
+class InstrumentedInterface:
+    """Wrapper around a ``dbus.Interface`` that records every call made."""
+
+    def __init__(self, iface, interface_name):
+        """
+        :param iface: ``dbus.Interface`` to wrap
+        :param interface_name: The D-Bus interface name of ``iface``
+        """
+        self._iface = iface
+        self._interface_name = interface_name
+
+    def __getattr__(self, member):
+        attr = getattr(self._iface, member)
+        if member.startswith('_') or not callable(attr):
+            return attr
+        if member == 'connect_to_signal':
+            return self._connect_to_signal
+        if member in _PASSTHROUGH:
+            return attr
+        return _InstrumentedMethod(attr, self._interface_name, member)
+
+    def _connect_to_signal(self, signal_name, handler_function,
+                           *args, **kwargs):
+        return self._iface.connect_to_signal(
+            signal_name,
+            wrap_signal_handler(handler_function,
+                                kwargs.get('dbus_interface',
+                                           self._interface_name),
+                                signal_name),
+            *args, **kwargs)
+
+
+def wrap_interface(iface, interface_name):
+    """
+    Wrap a ``dbus.Interface`` if instrumentation is enabled
+    :param iface: ``dbus.Interface`` object
+    :param interface_name: D-Bus interface name of ``iface``
+    :return: The wrapped interface or ``iface`` unchanged
+    """
+    if _recorder is None:
+        return iface
+    return InstrumentedInterface(iface, interface_name)
+
+
+def wrap_signal_handler(callback, interface, member):
+    """
+    Wrap a signal receiver if instrumentation is enabled
+    :param callback: Function receiving the signal
+    :param interface: D-Bus interface emitting the signal
+    :param member: Signal name
+    :return: The wrapped callback or ``callback`` unchanged
+    """
+    if _recorder is None:
+        return callback
+
+    def _handler(*args, **kwargs):
+        recorder = _recorder
+        if recorder is None:
+            return callback(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            result = callback(*args, **kwargs)
+        except Exception:
+            recorder.record(SIGNAL, interface, member,
+                            time.perf_counter() - start,
+                            bytes_in=payload_size(args), error=True)
+            raise
+        recorder.record(SIGNAL, interface, member,
+                        time.perf_counter() - start,
+                        bytes_in=payload_size(args))
+        return result
+    return _handler
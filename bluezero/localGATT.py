@@ -3,6 +3,7 @@
 Current classes include:
 - Service -- Bluetooth Service
 - Characteristic -- Bluetooth Characteristic
+- AsyncCharacteristic -- Bluetooth Characteristic with a slow read handler
 - Descriptor -- Bluetooth Descriptor
 """
 from __future__ import absolute_import, print_function, unicode_literals
@@ -24,6 +25,7 @@ except ImportError:
 # python-bluezero imports
 from bluezero import constants
 from bluezero import async_tools
+from bluezero import server_tools
 
 # Initialise the mainloop
 dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
@@ -32,6 +34,26 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
 logger.addHandler(NullHandler())
 
+# D-Bus types of the properties of GATT objects
+_PROPERTY_TYPES = {
+    'UUID': dbus.String,
+    'Primary': dbus.Boolean,
+    'Service': dbus.ObjectPath,
+    'Characteristic': dbus.ObjectPath,
+    'Notifying': dbus.Boolean,
+    'NotifyAcquired': dbus.Boolean,
+    'WriteAcquired': dbus.Boolean,
+    'Value': lambda value: dbus.Array(value, signature='y'),
+    'Flags': lambda value: dbus.Array(value, signature='s'),
+}
+
+
+def _dbus_value(property_name, value):
+    """Convert a property value to its D-Bus type."""
+    if value is None or property_name not in _PROPERTY_TYPES:
+        return value
+    return _PROPERTY_TYPES[property_name](value)
+
 
 ########################################
 # Exception classes
@@ -64,23 +86,33 @@ class Application(dbus.service.Object):
     >>> srv_mng.register_application(app.get_path(), {})
     >>> app.start()
 
+    Further applications in the same process are given their own path
+    (e.g. ``/ukBaz/bluezero1``). Pass the application to their services so
+    that the services are created under it.
+
     """
-    def __init__(self, device_id=None):
+    def __init__(self, device_id=None, path=None):
         """Default initialiser.
 
         1. Initialises the program loop using ``GObject``.
         2. Registers the Application on the D-Bus.
         3. Initialises the list of services offered by the application.
 
+        :param path: (optional) D-Bus object path of the application. A
+                     unique path starting ``/ukBaz/bluezero`` is used if
+                     not given.
         """
         # Initialise the D-Bus path and register it
         self.bus = dbus.SystemBus()
-        self.path = '/ukBaz/bluezero'
+        if path is None:
+            path = server_tools.allocate_path('/ukBaz/bluezero')
+        self.path = path
         self.bus_name = dbus.service.BusName('ukBaz.bluezero', self.bus)
         dbus.service.Object.__init__(self, self.bus_name, self.path)
 
         # Objects to be associated with this service
         self.managed_objs = []
+        self._managed_objects = None
         self.eventloop = async_tools.EventLoop()
 
     @dbus.service.method(constants.DBUS_OM_IFACE,
@@ -90,13 +122,21 @@ class Application(dbus.service.Object):
 
         Return type is a dictionary whose keys are each registered object and
         values the properties of the given object.
+
+        The response is cached until objects are added or removed. It refers
+        to the property dictionaries of the objects so property values that
+        are changed with ``Set`` are always current.
         """
+        if self._managed_objects is not None:
+            return self._managed_objects
         response = {}
 
         for object in self.managed_objs:
+            ifaces = response.setdefault(object.get_path(), {})
             for iface in object.props.keys():
-                response[object.get_path()] = {iface: object.GetAll(iface)}
+                ifaces[iface] = object.GetAll(iface)
 
+        self._managed_objects = response
         return response
 
     def add_managed_object(self, object):
@@ -105,6 +145,15 @@ class Application(dbus.service.Object):
         :param object: Python object of dbus path to be managed
         """
         self.managed_objs.append(object)
+        self._managed_objects = None
+
+    def remove_managed_object(self, object):
+        """Remove an object from the Application.
+
+        :param object: Python object of dbus path to be removed
+        """
+        self.managed_objs.remove(object)
+        self._managed_objects = None
 
     def get_path(self):
         """Return the DBus object path"""
@@ -130,7 +179,7 @@ class Service(dbus.service.Object):
 
     PATH_BASE = '/ukBaz/bluezero/service'
 
-    def __init__(self, service_id, uuid, primary):
+    def __init__(self, service_id, uuid, primary, application=None):
         """Default initialiser.
 
         1. Registers the service on the D-Bus.
@@ -139,16 +188,24 @@ class Service(dbus.service.Object):
         :param service_id:
         :param uuid: service BLE UUID
         :param primary: whether or not the service is a primary service
+        :param application: (optional) Application to create the service
+                            under. Required when more than one application
+                            is used in a process.
         """
         # Setup D-Bus object paths and register service
-        self.path = self.PATH_BASE + str('{0:04d}'.format(service_id))
+        if application is None:
+            path_base = self.PATH_BASE
+        else:
+            path_base = application.path + '/service'
+        self.path = path_base + str('{0:04d}'.format(service_id))
         self.bus = dbus.SystemBus()
         self.interface = constants.GATT_SERVICE_IFACE
         dbus.service.Object.__init__(self, self.bus, self.path)
         self.props = {
-            constants.GATT_SERVICE_IFACE: {
-                'UUID': uuid,
-                'Primary': primary}
+            constants.GATT_SERVICE_IFACE: dbus.Dictionary({
+                'UUID': _dbus_value('UUID', uuid),
+                'Primary': _dbus_value('Primary', primary)},
+                signature='sv')
         }
 
     def get_path(self):
@@ -188,7 +245,7 @@ class Service(dbus.service.Object):
             raise InvalidArgsException()
 
         try:
-            return self.GetAll(interface_name)[property_name]
+            return self.props[interface_name][property_name]
         except KeyError:
             raise dbus.exceptions.DBusException(
                 'no such property ' + property_name,
@@ -211,6 +268,7 @@ class Service(dbus.service.Object):
                 'no such property ' + property_name,
                 name=self.interface + '.UnknownProperty')
 
+        value = _dbus_value(property_name, value)
         iface_props[property_name] = value
 
         self.PropertiesChanged(interface_name,
@@ -268,18 +326,17 @@ class Characteristic(dbus.service.Object):
         self.bus = dbus.SystemBus()
         dbus.service.Object.__init__(self, self.bus, self.path)
         self.props = {
-            constants.GATT_CHRC_IFACE: {
-                'UUID': uuid,
+            constants.GATT_CHRC_IFACE: dbus.Dictionary({
+                'UUID': _dbus_value('UUID', uuid),
                 'Service': service_obj.get_path(),
-                'Value': value,
-                'Notifying': notifying,
-                'Flags': flags}
+                'Value': _dbus_value('Value', value),
+                'Notifying': _dbus_value('Notifying', notifying),
+                'Flags': _dbus_value('Flags', flags)},
+                signature='sv')
         }
-
-        for prop in self.props[constants.GATT_CHRC_IFACE].keys():
-            self.Set(constants.GATT_CHRC_IFACE,
-                     prop,
-                     self.props[constants.GATT_CHRC_IFACE][prop])
+        self._scheduler = None
+        self.clients = server_tools.ClientTracker(
+            changed_cb=self._acquired_changed)
 
     def get_path(self):
         """Return the DBus object path"""
@@ -288,6 +345,61 @@ class Characteristic(dbus.service.Object):
     def add_call_back(self, callback):
         self.PropertiesChanged = callback
 
+    def enable_acquire(self, notify=True, write=False):
+        """Let BlueZ use sockets for notifications and writes.
+
+        BlueZ calls ``AcquireNotify`` instead of ``StartNotify`` and
+        ``AcquireWrite`` for write without response. New values are then
+        written straight to the socket instead of being sent as D-Bus
+        signals. This must be called before the application is registered.
+
+        :param notify: Offer ``AcquireNotify``
+        :param write: Offer ``AcquireWrite``
+        """
+        if notify:
+            self.props[constants.GATT_CHRC_IFACE]['NotifyAcquired'] = \
+                dbus.Boolean(False)
+        if write:
+            self.props[constants.GATT_CHRC_IFACE]['WriteAcquired'] = \
+                dbus.Boolean(False)
+
+    def set_notify_rate(self, max_rate, batch=False,
+                        mtu=server_tools.DEFAULT_MTU):
+        """Limit how often a new ``Value`` is signalled.
+
+        Values set faster than ``max_rate`` are coalesced (or batched) by a
+        :class:`bluezero.server_tools.NotificationScheduler`.
+
+        :param max_rate: Maximum notifications per second. None to remove
+                         the limit.
+        :param batch: Send all the samples of an interval in one
+                      notification instead of only the latest
+        :param mtu: ATT MTU of the link, used to size batches
+        """
+        if self._scheduler is not None:
+            self._scheduler.flush()
+            self._scheduler = None
+        if max_rate is not None or batch:
+            self._scheduler = server_tools.NotificationScheduler(
+                self._notify, max_rate=max_rate, batch=batch, mtu=mtu)
+
+    @property
+    def notify_stats(self):
+        """Counters of the notification scheduler or None if not in use."""
+        if self._scheduler is None:
+            return None
+        return self._scheduler.stats
+
+    def _notify(self, value):
+        if self.clients.notify(value):
+            return
+        self.PropertiesChanged(constants.GATT_CHRC_IFACE,
+                               dbus.Dictionary(
+                                   {'Value': dbus.Array(value,
+                                                        signature='y')},
+                                   signature='sv'),
+                               dbus.Array([], signature='s'))
+
     @dbus.service.method(constants.DBUS_PROP_IFACE,
                          in_signature='s',
                          out_signature='a{sv}')
@@ -328,7 +440,7 @@ class Characteristic(dbus.service.Object):
             raise InvalidArgsException()
 
         try:
-            return self.GetAll(interface_name)[property_name]
+            return self.props[interface_name][property_name]
         except KeyError:
             raise dbus.exceptions.DBusException(
                 'no such property ' + property_name,
@@ -344,8 +456,16 @@ class Characteristic(dbus.service.Object):
                 'no such property ' + property_name,
                 name=constants.GATT_CHRC_IFACE + '.UnknownProperty')
 
+        value = _dbus_value(property_name, value)
         self.props[constants.GATT_CHRC_IFACE][property_name] = value
 
+        if property_name == 'Value':
+            if self._scheduler is not None:
+                self._scheduler.submit(value)
+                return
+            if self.clients.notify(value):
+                return
+
         return self.PropertiesChanged(interface_name,
                                       dbus.Dictionary({property_name: value},
                                                       signature='sv'),
@@ -368,7 +488,8 @@ class Characteristic(dbus.service.Object):
         DBus method for getting the characteristic value
         :return: value
         """
-        return self.GetAll(constants.GATT_CHRC_IFACE)['Value']
+        self.clients.seen(options)
+        return self.props[constants.GATT_CHRC_IFACE]['Value']
 
     @dbus.service.method(constants.GATT_CHRC_IFACE,
                          in_signature='aya{sv}', out_signature='')
@@ -377,8 +498,53 @@ class Characteristic(dbus.service.Object):
         DBus method for setting the characteristic value
         :return: value
         """
+        self.clients.seen(options)
         self.Set(constants.GATT_CHRC_IFACE, 'Value', value)
 
+    @dbus.service.method(constants.GATT_CHRC_IFACE,
+                         in_signature='a{sv}', out_signature='hq')
+    def AcquireWrite(self, options):
+        """
+        DBus method giving BlueZ a socket for writes without response
+        :return: file descriptor and MTU
+        """
+        if 'WriteAcquired' not in self.props[constants.GATT_CHRC_IFACE]:
+            raise dbus.exceptions.DBusException(
+                'AcquireWrite not enabled',
+                name='org.bluez.Error.NotSupported')
+        sock, mtu = self.clients.acquire_write(options, self._acquired_write)
+        fd = dbus.types.UnixFd(sock)
+        sock.close()
+        return fd, dbus.UInt16(mtu)
+
+    @dbus.service.method(constants.GATT_CHRC_IFACE,
+                         in_signature='a{sv}', out_signature='hq')
+    def AcquireNotify(self, options):
+        """
+        DBus method giving BlueZ a socket to read notifications from
+        :return: file descriptor and MTU
+        """
+        if 'NotifyAcquired' not in self.props[constants.GATT_CHRC_IFACE]:
+            raise dbus.exceptions.DBusException(
+                'AcquireNotify not enabled',
+                name='org.bluez.Error.NotSupported')
+        sock, mtu = self.clients.acquire_notify(options)
+        fd = dbus.types.UnixFd(sock)
+        sock.close()
+        return fd, dbus.UInt16(mtu)
+
+    def _acquired_changed(self):
+        """Update ``NotifyAcquired``/``WriteAcquired`` from the sockets."""
+        props = self.props[constants.GATT_CHRC_IFACE]
+        for name, state in (('NotifyAcquired', self.clients.notify_acquired),
+                            ('WriteAcquired', self.clients.write_acquired)):
+            if name in props and bool(props[name]) != state:
+                self.Set(constants.GATT_CHRC_IFACE, name, state)
+
+    def _acquired_write(self, value, device):
+        self.Set(constants.GATT_CHRC_IFACE, 'Value',
+                 dbus.Array(value, signature='y'))
+
     @dbus.service.method(constants.GATT_CHRC_IFACE,
                          in_signature='', out_signature='')
     def StartNotify(self):
@@ -386,7 +552,7 @@ class Characteristic(dbus.service.Object):
         DBus method for enabling notifications of the characteristic value.
         :return: value
         """
-        if not self.props[constants.GATT_CHRC_IFACE]['Notifying'] is True:
+        if self.props[constants.GATT_CHRC_IFACE]['Notifying']:
             logger.info('Notifying already, nothing to do')
             return
 
@@ -401,15 +567,81 @@ class Characteristic(dbus.service.Object):
         DBus method for disabling notifications of the characteristic value.
         :return: value
         """
-        if self.props[constants.GATT_CHRC_IFACE]['Notifying'] is False:
+        if not self.props[constants.GATT_CHRC_IFACE]['Notifying']:
             logger.info('Not Notifying, nothing to do')
             return
 
+        if self._scheduler is not None:
+            self._scheduler.cancel()
         self.Set(constants.GATT_CHRC_IFACE,
                  'Notifying',
                  dbus.Boolean(False, variant_level=1))
 
 
+class AsyncCharacteristic(Characteristic):
+    """Bluez Characteristic Class with a non-blocking read handler.
+
+    The read handler is called for each ``ReadValue`` and the reply is sent
+    when it completes. It can return the new value, a
+    ``concurrent.futures.Future`` or be a coroutine function, and can be
+    run in an executor, so reads needing I/O do not block the event loop.
+
+    :Example:
+
+    >>> import concurrent.futures
+    >>> def read_sensor():
+    >>>     return dbus.Array(get_reading(), signature='y')
+    >>> your_characteristic = localGATT.AsyncCharacteristic(
+    >>>     characteristic_id, UUID, service_obj, value, notifying, flags,
+    >>>     read_handler=read_sensor,
+    >>>     executor=concurrent.futures.ThreadPoolExecutor(max_workers=2))
+    """
+    def __init__(self, characteristic_id,
+                 uuid,
+                 service_obj,
+                 value,
+                 notifying,
+                 flags,
+                 read_handler=None,
+                 executor=None):
+        """Default initialiser.
+
+        :param read_handler: Function returning the new value or None to
+                             keep the current value
+        :param executor: (optional) ``concurrent.futures.Executor`` to run
+                         the read handler in
+
+        See :class:`Characteristic` for the other parameters.
+        """
+        Characteristic.__init__(self, characteristic_id, uuid, service_obj,
+                                value, notifying, flags)
+        self.read_handler = read_handler
+        self.runner = server_tools.HandlerRunner(executor)
+
+    @dbus.service.method(constants.GATT_CHRC_IFACE,
+                         in_signature='a{sv}', out_signature='ay',
+                         async_callbacks=('reply_handler', 'error_handler'))
+    def ReadValue(self, options, reply_handler, error_handler):
+        """
+        DBus method for getting the characteristic value
+        :return: value
+        """
+        self.clients.seen(options)
+        offset = int(options.get('offset', 0))
+
+        def _reply(value):
+            if value is not None:
+                self.props[constants.GATT_CHRC_IFACE]['Value'] = \
+                    _dbus_value('Value', value)
+            reply_handler(
+                self.props[constants.GATT_CHRC_IFACE]['Value'][offset:])
+
+        if self.read_handler is None or offset > 0:
+            _reply(None)
+        else:
+            self.runner.call(self.read_handler, _reply, error_handler)
+
+
 class Descriptor(dbus.service.Object):
     """Bluez Descriptor Class.
 
@@ -447,16 +679,13 @@ class Descriptor(dbus.service.Object):
         self.bus = dbus.SystemBus()
         dbus.service.Object.__init__(self, self.bus, self.path)
         self.props = {
-            constants.GATT_DESC_IFACE: {
-                'UUID': uuid,
+            constants.GATT_DESC_IFACE: dbus.Dictionary({
+                'UUID': _dbus_value('UUID', uuid),
                 'Characteristic': characteristic_obj.get_path(),
-                'Value': value,
-                'Flags': flags}
+                'Value': _dbus_value('Value', value),
+                'Flags': _dbus_value('Flags', flags)},
+                signature='sv')
         }
-        for prop in self.props[constants.GATT_DESC_IFACE].keys():
-            self.Set(constants.GATT_DESC_IFACE,
-                     prop,
-                     self.props[constants.GATT_DESC_IFACE][prop])
 
     def get_path(self):
         """Return the DBus object path"""
@@ -502,7 +731,7 @@ class Descriptor(dbus.service.Object):
             raise InvalidArgsException()
 
         try:
-            return self.GetAll(interface_name)[property_name]
+            return self.props[interface_name][property_name]
         except KeyError:
             raise dbus.exceptions.DBusException(
                 'no such property ' + property_name,
@@ -518,6 +747,7 @@ class Descriptor(dbus.service.Object):
                 'no such property ' + property_name,
                 name=constants.GATT_DESC_IFACE + '.UnknownProperty')
 
+        value = _dbus_value(property_name, value)
         self.props[interface_name][property_name] = value
 
         return self.PropertiesChanged(interface_name,
@@ -542,7 +772,7 @@ class Descriptor(dbus.service.Object):
         DBus method for getting the characteristic value
         :return: value
         """
-        return self.GetAll(constants.GATT_DESC_IFACE)['Value']
+        return self.props[constants.GATT_DESC_IFACE]['Value']
 
     @dbus.service.method(constants.GATT_DESC_IFACE,
                          in_signature='aya{sv}', out_signature='')
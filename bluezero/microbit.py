@@ -57,15 +57,18 @@ class Microbit:
     """
     Class to simplify interacting with a micro:bit over Bluetooth Low Energy
     """
-    def __init__(self, device_addr, adapter_addr=None):
+    def __init__(self, device_addr, adapter_addr=None, adapter_pool=None):
         """
         Initialization of an instance of a remote micro:bit
         :param device_addr: Discovered microbit device with this address
         :param adapter_addr: Optional unless you have more than one adapter
                              on your machine
+        :param adapter_pool: Optional ``adapter.AdapterPool`` used to pick
+                             the adapter when adapter_addr is not given
         """
         self.ubit = central.Central(adapter_addr=adapter_addr,
-                                    device_addr=device_addr)
+                                    device_addr=device_addr,
+                                    adapter_pool=adapter_pool)
 
         self.user_pin_callback = None
         # Micro:bit Characteristics
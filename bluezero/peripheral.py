@@ -21,6 +21,8 @@ import dbus.service
 from bluezero import tools
 from bluezero import adapter
 from bluezero import constants
+from bluezero import instrumentation
+from bluezero import server_tools
 
 # array import
 import array
@@ -44,6 +46,9 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
 logger.addHandler(NullHandler())
 
+# Longest attribute value allowed by the ATT protocol
+MAX_VALUE_LENGTH = 512
+
 
 ########################################
 # Exception classes
@@ -92,6 +97,17 @@ class InvalidValueLengthException(dbus.exceptions.DBusException):
     _dbus_error_name = 'org.bluez.Error.InvalidValueLength'
 
 
+class InvalidOffsetException(dbus.exceptions.DBusException):
+    """This is a D-Bus exception class for Bluez Invalid Offset Exceptions.
+
+    All this class does is set the internal variable ``_dbus_error_name`` to
+    the object path for Bluez Invalid Offset Exceptions.
+
+    """
+
+    _dbus_error_name = 'org.bluez.Error.InvalidOffset'
+
+
 class FailedException(dbus.exceptions.DBusException):
     """This is a D-Bus exception class for Bluez Failed Exceptions.
 
@@ -117,15 +133,25 @@ class Application(dbus.service.Object):
     >>> app = peripheral.Application()
     >>> app.add_service(Service)
     >>> app.start()
+
+    Several applications, each on its own adapter if required, can be
+    served from one process by registering them and running one loop:
+
+    >>> app_a = peripheral.Application('hci0')
+    >>> app_b = peripheral.Application('hci1')
+    >>> app_a.register()
+    >>> app_b.register()
+    >>> app_a.mainloop.run()
     """
 
     def __init__(self, device_id=None):
         """Default initialiser.
 
         1. Initialises the program loop using ``GObject``.
-        2. Registers the Application on the D-Bus.
+        2. Registers the Application on the D-Bus at a unique path.
         3. Initialises the list of services offered by the application.
 
+        :param device_id: (optional) Address or name of the adapter to use
         """
         # Initialise the loop that the application runs in
         GObject.threads_init()
@@ -135,14 +161,18 @@ class Application(dbus.service.Object):
 
         # Initialise the D-Bus path and register it
         self.bus = dbus.SystemBus()
-        self.path = '/ukBaz/bluezero/application{}'.format(id(self))
+        self.path = server_tools.allocate_path('/ukBaz/bluezero/application')
         self.bus_name = dbus.service.BusName('ukBaz.bluezero', self.bus)
         dbus.service.Object.__init__(self, self.bus_name, self.path)
 
         # Initialise services within the application
         self.services = []
+        self._managed_objects = None
 
         self.dongle = adapter.Adapter(device_id)
+        self.ad_manager = None
+        self.service_manager = None
+        self.service_ad = None
 
     def get_path(self):
         """Return the D-Bus object path."""
@@ -154,6 +184,26 @@ class Application(dbus.service.Object):
         :param service: the service to be added (type: peripheral.Service)
         """
         self.services.append(service)
+        service.application = self
+        self.invalidate()
+
+    def remove_service(self, service):
+        """Remove a service from the Application.
+
+        :param service: the service to be removed (type: peripheral.Service)
+        """
+        self.services.remove(service)
+        service.application = None
+        self.invalidate()
+
+    def invalidate(self):
+        """Discard the cached ``GetManagedObjects`` response.
+
+        This is done automatically when services, characteristics or
+        descriptors are added or removed. Call it if their properties are
+        changed after the application has been registered.
+        """
+        self._managed_objects = None
 
     def get_primary_service(self):
         """Get the *primary* service registered with the Application."""
@@ -172,19 +222,27 @@ class Application(dbus.service.Object):
 
         Return type is a dictionary whose keys are each registered object and
         values the properties of the given object.
+
+        The response is built once and cached until the objects of the
+        application change.
         """
+        if self._managed_objects is not None:
+            return self._managed_objects
         response = {}
-        print('GetManagedObjects')
 
         for service in self.services:
-            response[service.get_path()] = service.get_properties()
+            response.setdefault(service.get_path(), {}).update(
+                service.get_properties())
             chrcs = service.get_characteristics()
             for chrc in chrcs:
-                response[chrc.get_path()] = chrc.get_properties()
+                response.setdefault(chrc.get_path(), {}).update(
+                    chrc.get_properties())
                 descs = chrc.get_descriptors()
                 for desc in descs:
-                    response[desc.get_path()] = desc.get_properties()
+                    response.setdefault(desc.get_path(), {}).update(
+                        desc.get_properties())
 
+        self._managed_objects = response
         return response
 
     def add_device_name(self, device_name):
@@ -195,69 +253,97 @@ class Application(dbus.service.Object):
         """
         self.dongle.alias = device_name
 
-    def start(self):
-        """Start the application.
+    def register(self):
+        """Register the application and its advertisement with BlueZ.
 
-        This function performs the following steps to start the BLE peripheral
-        application:
+        This function performs the following steps and returns without
+        running the program loop:
 
-        1. Registers the Bluetooth adapter and turns it on.
-        2. Gets the Bluez D-Bus advertising manager interface.
-        3. Gets the Bluez D-Bus gatt manager interface.
-        4. Creates an advertisement with the primary application service.
-        5. Registers the advertisement with the Bluez advertising manager.
-        6. Registers the application with the Bluez gatt manager.
-        7. Runs the program loop
+        1. Turns on the Bluetooth adapter of the application.
+        2. Gets the Bluez D-Bus advertising and gatt manager interfaces of
+           the adapter.
+        3. Creates an advertisement with the primary application service.
+        4. Registers the advertisement with the Bluez advertising manager.
+        5. Registers the application with the Bluez gatt manager.
 
         The application must first have had a service added to it.
-
-        :Example:
-
-        >>> app = peripheral.Application()
-        >>> app.add_service(your_service)
-        >>> app.start()
-
-        It is good practice to put the ``app.start()`` in a
-        ``try-except-finally`` block to enable keyboard interrupts.
         """
         # Register the Bluetooth adapter
         self.dongle.powered = True
 
-        # Setup the advertising manager
-        print('setup ad_manager')
-        self.ad_manager = tools.get_advert_manager_interface()
-
-        # Setup the service manager
-        print('setup service_manager')
-        self.service_manager = tools.get_gatt_manager_interface()
+        # Setup the advertising and service managers of the adapter
+        manager_obj = self.bus.get_object(constants.BLUEZ_SERVICE_NAME,
+                                          self.dongle.path)
+        self.ad_manager = instrumentation.wrap_interface(
+            dbus.Interface(manager_obj,
+                           constants.LE_ADVERTISING_MANAGER_IFACE),
+            constants.LE_ADVERTISING_MANAGER_IFACE)
+        self.service_manager = instrumentation.wrap_interface(
+            dbus.Interface(manager_obj, constants.GATT_MANAGER_IFACE),
+            constants.GATT_MANAGER_IFACE)
 
         # Setup the advertisement
-        self.service_ad = Advertisement(self, 'peripheral')
-        for service in self.services:
-            if service.primary:
-                print('Advertising service ', service.uuid)
-                self.service_ad.add_service_uuid(service.uuid)
-                self.service_ad.ad_type = service.type
-                if service.service_data is not None:
-                    print('Adding service data: ',
-                          service.uuid,
-                          service.service_data)
-                    self.service_ad.add_service_data(service.uuid,
-                                                     service.service_data)
+        if self.service_ad is None:
+            self.service_ad = Advertisement(self, 'peripheral')
+            for service in self.services:
+                if service.primary:
+                    logger.info('Advertising service {}'.format(
+                        service.uuid))
+                    self.service_ad.add_service_uuid(service.uuid)
+                    self.service_ad.ad_type = service.type
+                    if service.service_data is not None:
+                        self.service_ad.add_service_data(
+                            service.uuid, service.service_data)
 
         # Register the advertisement
-        print('Register Adver', self.service_ad.get_path())
         self.ad_manager.RegisterAdvertisement(
             self.service_ad.get_path(), {},
             reply_handler=register_ad_cb,
             error_handler=register_ad_error_cb)
 
         # Register the application
-        print('Register Application ', self.get_path())
         self.service_manager.RegisterApplication(
             self.get_path(), {},
             reply_handler=register_service_cb,
             error_handler=register_service_error_cb)
+
+    def unregister(self):
+        """Unregister the application and its advertisement from BlueZ.
+
+        The program loop is left running for any other applications.
+        """
+        if self.service_manager is None:
+            return
+        try:
+            self.ad_manager.UnregisterAdvertisement(
+                self.service_ad.get_path())
+        except dbus.exceptions.DBusException as error:
+            logger.warning('Failed to unregister advertisement: {}'.format(
+                error))
+        try:
+            self.service_manager.UnregisterApplication(self.get_path())
+        except dbus.exceptions.DBusException as error:
+            logger.warning('Failed to unregister application: {}'.format(
+                error))
+        self.ad_manager = None
+        self.service_manager = None
+
+    def start(self):
+        """Start the application.
+
+        Registers the application with :meth:`register` and then runs the
+        program loop until :meth:`stop` is called.
+
+        :Example:
+
+        >>> app = peripheral.Application()
+        >>> app.add_service(your_service)
+        >>> app.start()
+
+        It is good practice to put the ``app.start()`` in a
+        ``try-except-finally`` block to enable keyboard interrupts.
+        """
+        self.register()
         try:
             # Run the mainloop
             self.mainloop.run()
@@ -273,8 +359,7 @@ class Application(dbus.service.Object):
         3. Stop the program loop.
 
         """
-        # self.ad_manager.UnregisterAdvertisement(self.service_ad.get_path())
-        self.service_manager.UnregisterApplication(self.get_path())
+        self.unregister()
         self.mainloop.quit()
 
 ##########################################
@@ -293,7 +378,7 @@ class Service(dbus.service.Object):
 
     """
 
-    PATH_BASE = '/ukBaz/bluezero/service1'
+    PATH_BASE = '/ukBaz/bluezero/service'
 
     def __init__(self, uuid, primary, type='peripheral'):
         """Default initialiser.
@@ -307,7 +392,7 @@ class Service(dbus.service.Object):
         """
         # Setup D-Bus object paths and register service
         self.index = id(self)
-        self.path = self.PATH_BASE + str(self.index)
+        self.path = server_tools.allocate_path(self.PATH_BASE)
         self.bus = dbus.SystemBus()
         dbus.service.Object.__init__(self, self.bus, self.path)
 
@@ -316,6 +401,7 @@ class Service(dbus.service.Object):
         self.primary = primary
         self.type = type
         self.service_data = None
+        self.application = None
 
         # Initialise characteristics within the service
         self.characteristics = []
@@ -360,6 +446,21 @@ class Service(dbus.service.Object):
 
         """
         self.characteristics.append(characteristic)
+        self.invalidate()
+
+    def remove_characteristic(self, characteristic):
+        """Remove a characteristic from the service.
+
+        :param characteristic: the characteristic to be removed.
+                               (type: peripheral.Characteristic)
+        """
+        self.characteristics.remove(characteristic)
+        self.invalidate()
+
+    def invalidate(self):
+        """Discard the cached objects of the application of the service."""
+        if self.application is not None:
+            self.application.invalidate()
 
     def add_service_data(self, service_data):
         """
@@ -439,6 +540,15 @@ class Characteristic(dbus.service.Object):
     """Bluez Characteristic Class.
 
     This class represents a BLE Characteristic.
+
+    The value is stored as a ``bytearray`` of up to 512 octets. The
+    ``int_value`` property gives access to it as an unsigned little endian
+    integer.
+
+    The remote devices using the characteristic and their MTU are recorded
+    in ``clients`` (a :class:`bluezero.server_tools.ClientTracker`). Call
+    :meth:`enable_acquire` to let BlueZ use sockets for notifications and
+    writes instead of D-Bus messages.
     """
 
     def __init__(self, uuid, flags, service, value=None):
@@ -450,11 +560,12 @@ class Characteristic(dbus.service.Object):
         :param uuid: characteristic BLE UUID.
         :param flags: characteristic flags.
         :param service: service that the characteristic is associated with.
-        :param value: (optional) characteristic value.
+        :param value: (optional) characteristic value. Bytes, a list of
+                      octets or an unsigned integer.
         """
         # Register the characteristic on the service path
         self.index = id(self)
-        self.path = service.path + '/char' + str(self.index)
+        self.path = server_tools.allocate_path(service.path + '/char')
         self.bus = service.bus
         dbus.service.Object.__init__(self, self.bus, self.path)
 
@@ -464,9 +575,21 @@ class Characteristic(dbus.service.Object):
         self.flags = flags
         self.notifying = False
         self.descriptors = []
-        self.value = value
+        if value is None:
+            self.value = bytearray()
+        else:
+            self.value = bytearray(tools.value_to_bytes(value))
         self.notify_cb = None
         self.write_cb = None
+        self.read_cb = None
+        # Read and write callbacks of a characteristic run in request order
+        self._handlers = server_tools.HandlerRunner(ordered=True)
+        self._scheduler = None
+        self.clients = server_tools.ClientTracker(
+            changed_cb=self._acquired_changed)
+        self.acquire_notify = False
+        self.acquire_write = False
+        self._acquired = {}
 
     def get_properties(self):
         """Return a dictionary of the characteristic properties.
@@ -478,18 +601,40 @@ class Characteristic(dbus.service.Object):
         - Flags: any characteristic flags
         - Descriptors: D-Bus array of the descriptor object paths
           associated with the characteristic.
+        - NotifyAcquired, WriteAcquired: only present if enabled with
+          :meth:`enable_acquire`.
 
         """
-        return {
-            constants.GATT_CHRC_IFACE: {
-                'Service': self.service.get_path(),
-                'UUID': self.uuid,
-                'Flags': self.flags,
-                'Descriptors': dbus.Array(
-                    self.get_descriptor_paths(),
-                    signature='o')
-            }
+        properties = {
+            'Service': self.service.get_path(),
+            'UUID': self.uuid,
+            'Flags': self.flags,
+            'Descriptors': dbus.Array(
+                self.get_descriptor_paths(),
+                signature='o')
         }
+        if self.acquire_notify:
+            properties['NotifyAcquired'] = dbus.Boolean(
+                self.clients.notify_acquired)
+        if self.acquire_write:
+            properties['WriteAcquired'] = dbus.Boolean(
+                self.clients.write_acquired)
+        return {constants.GATT_CHRC_IFACE: properties}
+
+    def enable_acquire(self, notify=True, write=False):
+        """Let BlueZ use sockets for notifications and writes.
+
+        BlueZ calls ``AcquireNotify`` instead of ``StartNotify`` and
+        ``AcquireWrite`` for write without response. Notifications are then
+        written straight to the socket instead of being sent as D-Bus
+        signals. This must be called before the application is registered.
+
+        :param notify: Offer ``AcquireNotify``
+        :param write: Offer ``AcquireWrite``
+        """
+        self.acquire_notify = notify
+        self.acquire_write = write
+        self.service.invalidate()
 
     def get_path(self):
         """Return the D-Bus object path."""
@@ -506,6 +651,16 @@ class Characteristic(dbus.service.Object):
 
         """
         self.descriptors.append(descriptor)
+        self.service.invalidate()
+
+    def remove_descriptor(self, descriptor):
+        """Remove a descriptor from the characteristic.
+
+        :param descriptor: the descriptor to be removed.
+                           (type: peripheral.Descriptor)
+        """
+        self.descriptors.remove(descriptor)
+        self.service.invalidate()
 
     def get_descriptor_paths(self):
         """Return the D-Bus object paths of all characteristic descriptors."""
@@ -537,48 +692,184 @@ class Characteristic(dbus.service.Object):
 
         return self.get_properties()
 
+    @property
+    def int_value(self):
+        """The characteristic value as an unsigned little endian integer.
+
+        Setting it sends a notification in the same way as
+        :meth:`send_notify_event`.
+        """
+        return int.from_bytes(self.value, byteorder='little', signed=False)
+
+    @int_value.setter
+    def int_value(self, new_value):
+        self.send_notify_event(new_value)
+
     @dbus.service.method(constants.GATT_CHRC_IFACE,
                          in_signature='a{sv}',
-                         out_signature='ay')
-    def ReadValue(self, options):
+                         out_signature='ay',
+                         async_callbacks=('reply_handler', 'error_handler'))
+    def ReadValue(self, options, reply_handler, error_handler):
         """Return the characteristic value.
 
         This method is registered with the D-Bus at
         ``org.bluez.GattCharacteristic1``.
+
+        If a read callback has been added with :meth:`add_read_event` it is
+        called first and the reply is sent when it completes, without
+        blocking the event loop. Sub-classes overriding this method must
+        accept the ``reply_handler`` and ``error_handler`` arguments.
+
+        The ``offset`` option given by BlueZ for long reads is honoured.
+        The read callback is only called for the first part of a long read.
+        Reads are answered in order with writes, so a read never returns the
+        value from before an earlier write.
+        """
+        self.clients.seen(options)
+        offset = int(options.get('offset', 0))
+
+        def _reply(value):
+            if value is not None:
+                self.value = bytearray(tools.value_to_bytes(value))
+            if offset > len(self.value):
+                error_handler(InvalidOffsetException())
+            else:
+                reply_handler(bytes(memoryview(self.value)[offset:]))
+
+        read_cb = self.read_cb if offset == 0 else None
+        self._handlers.call(read_cb, _reply, error_handler)
+
+    def add_read_event(self, object_id, executor=None):
+        """Add a read callback.
+
+        The read callback is executed when ReadValue() is executed. It
+        returns the new value (bytes, a list of octets or an unsigned
+        integer) or None to keep the current value. It can also return a
+        ``concurrent.futures.Future`` or be a coroutine function so that
+        slow reads do not block the event loop.
+
+        :param object_id: The object ID of the read callback.
+        :param executor: (optional) ``concurrent.futures.Executor`` to run
+                         the read and write callbacks in.
         """
-        # print('Reading Characteristic', self.value)
-        if self.value is None:
-            self.value = 0
-        return [dbus.Byte(self.value)]
+        self.read_cb = object_id
+        if executor is not None:
+            self._handlers.executor = executor
 
-    @dbus.service.method(constants.GATT_CHRC_IFACE, in_signature='aya{sv}')
-    def WriteValue(self, value, options):
+    @dbus.service.method(constants.GATT_CHRC_IFACE,
+                         in_signature='aya{sv}',
+                         byte_arrays=True,
+                         async_callbacks=('reply_handler', 'error_handler'))
+    def WriteValue(self, value, options, reply_handler, error_handler):
         """Set the characteristic value.
 
         This method is registered with the D-Bus at
         ``org.bluez.GattCharacteristic1``.
 
         The characteristic value is set, and if any additional write callback
-        is registered this is executed.
+        is registered this is executed. BlueZ gets the reply when the write
+        callback completes. Sub-classes overriding this method must accept
+        the ``reply_handler`` and ``error_handler`` arguments.
 
         :param value: the value that the characteristic is set to.
+        :param options: BlueZ options. An ``offset`` replaces the value from
+                        that position onwards (long writes).
         """
-        # print('Writing Characteristic', value)
-        # if not self.writable:
-        #     raise NotPermittedException()
-        self.value = int.from_bytes(value, byteorder='little', signed=False)
-        if self.write_cb is not None:
-            # print('Write callback')
-            self.write_cb()
+        self.clients.seen(options)
+        offset = int(options.get('offset', 0))
+        self._handlers.call(self.write_cb, lambda result: reply_handler(),
+                            error_handler,
+                            prepare=lambda: self._set_value(value, offset))
+
+    def _set_value(self, value, offset=0):
+        """Update the value from the event loop before a write callback."""
+        if offset > len(self.value):
+            raise InvalidOffsetException()
+        if offset + len(value) > MAX_VALUE_LENGTH:
+            raise InvalidValueLengthException()
+        if offset:
+            self.value[offset:] = value
+        else:
+            self.value = bytearray(value)
+
+    @dbus.service.method(constants.GATT_CHRC_IFACE,
+                         in_signature='a{sv}',
+                         out_signature='hq')
+    def AcquireWrite(self, options):
+        """Give BlueZ a socket to pass writes without response on.
 
-    def add_write_event(self, object_id):
+        This method is registered with the D-Bus at
+        ``org.bluez.GattCharacteristic1``.
+        """
+        if not self.acquire_write:
+            raise NotSupportedException()
+        sock, mtu = self.clients.acquire_write(options, self._acquired_write)
+        fd = dbus.types.UnixFd(sock)
+        sock.close()
+        return fd, dbus.UInt16(mtu)
+
+    @dbus.service.method(constants.GATT_CHRC_IFACE,
+                         in_signature='a{sv}',
+                         out_signature='hq')
+    def AcquireNotify(self, options):
+        """Give BlueZ a socket to receive notifications on.
+
+        This method is registered with the D-Bus at
+        ``org.bluez.GattCharacteristic1``.
+        """
+        if not self.acquire_notify:
+            raise NotSupportedException()
+        sock, mtu = self.clients.acquire_notify(options)
+        fd = dbus.types.UnixFd(sock)
+        sock.close()
+        return fd, dbus.UInt16(mtu)
+
+    def _acquired_changed(self):
+        """Signal a change of ``NotifyAcquired`` or ``WriteAcquired``."""
+        acquired = {}
+        if self.acquire_notify:
+            acquired['NotifyAcquired'] = self.clients.notify_acquired
+        if self.acquire_write:
+            acquired['WriteAcquired'] = self.clients.write_acquired
+        changed = {name: dbus.Boolean(state)
+                   for name, state in acquired.items()
+                   if state != self._acquired.get(name, False)}
+        self._acquired = acquired
+        if not changed:
+            return
+        self.service.invalidate()
+        self.PropertiesChanged(constants.GATT_CHRC_IFACE, changed, [])
+
+    def _acquired_write(self, value, device):
+        self._handlers.call(self.write_cb, lambda result: None,
+                            self._write_error,
+                            prepare=lambda: self._set_value(value))
+
+    def _write_error(self, error):
+        logger.error('Write callback of %s failed: %s', self.path, error)
+
+    def add_write_event(self, object_id, executor=None):
         """Add a write callback.
 
         The write callback is executed when WriteValue(val) is executed.
+        Given an executor, slow write callbacks run in its threads and do
+        not block the event loop. Callbacks of one characteristic still run
+        one at a time in the order the requests arrived, so the executor
+        (e.g. a ``concurrent.futures.ThreadPoolExecutor``) can be shared by
+        all characteristics of a server.
 
         :param object_id: The object ID of the write callback.
+        :param executor: (optional) ``concurrent.futures.Executor`` to run
+                         the read and write callbacks in.
+
+        :Example:
+
+        >>> pool = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        >>> your_characteristic.add_write_event(store_reading, pool)
         """
         self.write_cb = object_id
+        if executor is not None:
+            self._handlers.executor = executor
 
     @dbus.service.method(constants.GATT_CHRC_IFACE)
     def StartNotify(self):
@@ -606,6 +897,8 @@ class Characteristic(dbus.service.Object):
             return
 
         self.notifying = False
+        if self._scheduler is not None:
+            self._scheduler.cancel()
         self.notify_cb()
 
     def notify_cb(self):
@@ -636,19 +929,60 @@ class Characteristic(dbus.service.Object):
         """Send a notification event.
 
         :param value: the value that the characteristic is to be set to.
+                      Bytes, a list of octets or an unsigned integer.
 
         This function sets the characteristic value, and if the characteristic
         is set to notify emits a PropertiesChanged() signal with the new value.
+        The value is limited by the ATT MTU of the connection (e.g. up to 244
+        octets with an MTU of 247).
         """
-        # print('send', self, value)
-        self.value = value
-        if not self.notifying:
+        value = tools.value_to_bytes(value)
+        if len(value) > MAX_VALUE_LENGTH:
+            raise ValueError('Characteristic value longer than {} '
+                             'octets'.format(MAX_VALUE_LENGTH))
+        self.value = bytearray(value)
+        if not self.notifying and not self.clients.notify_acquired:
             print('Not notifying')
             return
-        # print('Update prop')
+        if self._scheduler is not None:
+            self._scheduler.submit(value)
+        else:
+            self._notify(value)
+
+    def set_notify_rate(self, max_rate, batch=False,
+                        mtu=server_tools.DEFAULT_MTU):
+        """Limit how often notifications are sent.
+
+        Values given to :meth:`send_notify_event` faster than ``max_rate``
+        are coalesced (or batched) by a
+        :class:`bluezero.server_tools.NotificationScheduler`.
+
+        :param max_rate: Maximum notifications per second. None to remove
+                         the limit.
+        :param batch: Send all the samples of an interval in one
+                      notification instead of only the latest
+        :param mtu: ATT MTU of the link, used to size batches
+        """
+        if self._scheduler is not None:
+            self._scheduler.flush()
+            self._scheduler = None
+        if max_rate is not None or batch:
+            self._scheduler = server_tools.NotificationScheduler(
+                self._notify, max_rate=max_rate, batch=batch, mtu=mtu)
+
+    @property
+    def notify_stats(self):
+        """Counters of the notification scheduler or None if not in use."""
+        if self._scheduler is None:
+            return None
+        return self._scheduler.stats
+
+    def _notify(self, value):
+        if self.clients.notify(value):
+            return
         self.PropertiesChanged(
             constants.GATT_CHRC_IFACE,
-            {'Value': [dbus.Byte(self.value)]}, [])
+            {'Value': value}, [])
 
 ####################
 # Descriptor Classes
@@ -677,7 +1011,7 @@ class Descriptor(dbus.service.Object):
         """
         # Register the descriptor on the characteristic path
         self.index = id(self)
-        self.path = characteristic.path + '/desc' + str(self.index)
+        self.path = server_tools.allocate_path(characteristic.path + '/desc')
         self.bus = characteristic.bus
         dbus.service.Object.__init__(self, self.bus, self.path)
 
@@ -833,7 +1167,7 @@ class Advertisement(dbus.service.Object):
         """
         # print('**Service', service)
         self.index = id(self)
-        self.path = self.PATH_BASE + str(self.index)
+        self.path = server_tools.allocate_path(self.PATH_BASE)
         dbus.service.Object.__init__(self, service.bus, self.path)
 
         self.ad_type = advertising_type
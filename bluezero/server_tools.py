@@ -0,0 +1,607 @@
+"""Utility classes for the GATT servers in peripheral and localGATT.
+
+Classes:
+
+- NotificationScheduler -- Rate limit, coalesce and batch notifications
+- ClientTracker -- Per-client state and acquired notify/write sockets
+- HandlerRunner -- Run slow handlers without blocking the event loop
+
+Functions:
+
+- allocate_path -- Reserve a unique D-Bus object path
+"""
+import asyncio
+import collections
+import concurrent.futures
+import socket
+import threading
+import time
+
+import logging
+try:  # Python 2.7+
+    from logging import NullHandler
+except ImportError:
+    class NullHandler(logging.Handler):
+        def emit(self, record):
+            pass
+
+from bluezero import async_tools
+from bluezero import tools
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.WARNING)
+logger.addHandler(NullHandler())
+
+# Default ATT MTU of a Bluetooth LE link
+DEFAULT_MTU = 23
+# Bytes of an ATT Handle Value Notification used by opcode and handle
+NOTIFY_HEADER_LENGTH = 3
+
+# D-Bus object paths allocated to the servers of this process
+_object_paths = set()
+_object_paths_lock = threading.Lock()
+
+# Executor used to run coroutines returned by handlers
+_default_executor = None
+
+
+def allocate_path(base):
+    """
+    Reserve a D-Bus object path that no other Bluezero object uses.
+
+    This allows several applications and advertisements to be served from
+    one process.
+    :param base: Preferred object path. If it is already taken the lowest
+                 free number is appended to it.
+    :return: The reserved object path
+    """
+    with _object_paths_lock:
+        path = base
+        index = 1
+        while path in _object_paths:
+            path = '{}{}'.format(base, index)
+            index += 1
+        _object_paths.add(path)
+    return path
+
+
+def release_path(path):
+    """
+    Return an object path reserved with :func:`allocate_path`.
+    :param path: Object path no longer in use
+    """
+    with _object_paths_lock:
+        _object_paths.discard(path)
+
+
+class NotificationScheduler:
+    """Send characteristic notifications no faster than a maximum rate.
+
+    Values submitted faster than the rate are not queued. Without batching
+    only the latest value is kept (older values are counted as coalesced).
+    With batching the pending samples are concatenated into one packet of
+    up to ``mtu - 3`` octets, dropping the oldest samples if it is full.
+    This keeps the latency between a value being submitted and being sent
+    bounded by the notification interval.
+
+    :Example:
+
+    >>> from bluezero import server_tools
+    >>> def emit(value):
+    >>>     print('notify', value)
+    >>> scheduler = server_tools.NotificationScheduler(emit, max_rate=20)
+    >>> scheduler.submit(b'\\x01\\x02')
+    >>> scheduler.stats
+
+    """
+
+    def __init__(self, send, max_rate=None, batch=False, mtu=DEFAULT_MTU,
+                 eventloop=None):
+        """Default initialiser.
+
+        :param send: Called as ``send(value)`` with a ``bytes`` value to
+                     emit the notification
+        :param max_rate: Maximum notifications per second. None for no limit.
+        :param batch: Concatenate samples submitted within one interval
+                      instead of keeping only the latest
+        :param mtu: ATT MTU of the link, used to size batches
+        :param eventloop: (optional) ``async_tools.EventLoop`` for the timer
+        """
+        self.send = send
+        self.max_rate = max_rate
+        self.batch = batch
+        self.mtu = mtu
+        if eventloop is None:
+            eventloop = async_tools.EventLoop()
+        self.eventloop = eventloop
+        self._pending = []
+        self._pending_size = 0
+        self._timer = None
+        self._last_sent = None
+        self.reset_stats()
+
+    @property
+    def interval(self):
+        """Minimum time in seconds between two notifications."""
+        if not self.max_rate:
+            return 0
+        return 1.0 / self.max_rate
+
+    @property
+    def payload_size(self):
+        """Largest notification value that fits in one packet."""
+        return self.mtu - NOTIFY_HEADER_LENGTH
+
+    @property
+    def pending(self):
+        """Number of samples waiting to be sent."""
+        return len(self._pending)
+
+    @property
+    def stats(self):
+        """Return a dictionary of the scheduler counters.
+
+        - submitted: samples given to :meth:`submit`
+        - sent: notifications emitted
+        - samples_sent: samples carried by the notifications
+        - coalesced: samples replaced by a newer value before being sent
+        - dropped: samples removed from a full batch
+        - mean_latency: average seconds from submit to send
+        - max_latency: longest seconds from submit to send
+        """
+        stats = dict(self._stats)
+        latency = stats.pop('total_latency')
+        if stats['samples_sent']:
+            stats['mean_latency'] = latency / stats['samples_sent']
+        else:
+            stats['mean_latency'] = 0.0
+        return stats
+
+    def reset_stats(self):
+        """Set all the counters to zero."""
+        self._stats = {'submitted': 0,
+                       'sent': 0,
+                       'samples_sent': 0,
+                       'coalesced': 0,
+                       'dropped': 0,
+                       'total_latency': 0.0,
+                       'max_latency': 0.0}
+
+    def submit(self, value):
+        """Submit a new value to be notified.
+
+        :param value: Bytes, a list of octets or an unsigned integer
+        """
+        value = tools.value_to_bytes(value)
+        now = time.monotonic()
+        self._stats['submitted'] += 1
+
+        if self.batch:
+            if len(value) > self.payload_size:
+                raise ValueError('Sample of {} octets does not fit in an MTU '
+                                 'of {}'.format(len(value), self.mtu))
+            while self._pending_size + len(value) > self.payload_size:
+                old_value, old_time = self._pending.pop(0)
+                self._pending_size -= len(old_value)
+                self._stats['dropped'] += 1
+        elif self._pending:
+            self._stats['coalesced'] += len(self._pending)
+            self._pending = []
+            self._pending_size = 0
+        self._pending.append((value, now))
+        self._pending_size += len(value)
+
+        if self._timer is not None:
+            return
+        wait = 0
+        if self._last_sent is not None:
+            wait = self.interval - (now - self._last_sent)
+        if wait <= 0:
+            self.flush()
+        else:
+            self._timer = self.eventloop.add_timer(int(wait * 1000) + 1,
+                                                   self._timed_out)
+
+    def flush(self):
+        """Send the pending samples now, ignoring the rate limit."""
+        if self._timer is not None:
+            self.eventloop.remove_timer(self._timer)
+            self._timer = None
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = []
+        self._pending_size = 0
+
+        now = time.monotonic()
+        self._last_sent = now
+        self.send(b''.join(value for value, submitted in pending))
+
+        self._stats['sent'] += 1
+        self._stats['samples_sent'] += len(pending)
+        for value, submitted in pending:
+            latency = now - submitted
+            self._stats['total_latency'] += latency
+            if latency > self._stats['max_latency']:
+                self._stats['max_latency'] = latency
+
+    def cancel(self):
+        """Discard the pending samples and stop the timer."""
+        if self._timer is not None:
+            self.eventloop.remove_timer(self._timer)
+            self._timer = None
+        self._stats['dropped'] += len(self._pending)
+        self._pending = []
+        self._pending_size = 0
+
+    def _timed_out(self):
+        self._timer = None
+        self.flush()
+        return False
+
+
+class ClientTracker:
+    """Per-client state of a GATT server characteristic.
+
+    BlueZ gives the object path of the remote device and the negotiated ATT
+    MTU in the options of ``ReadValue``, ``WriteValue``, ``AcquireWrite``
+    and ``AcquireNotify``. This class records them for each client and
+    manages the sockets handed to BlueZ by ``AcquireNotify`` and
+    ``AcquireWrite``. Notifications written to an acquired socket are sent
+    by BlueZ without a D-Bus signal for each update.
+
+    :Example:
+
+    >>> from bluezero import server_tools
+    >>> clients = server_tools.ClientTracker()
+    >>> bluez_sock, mtu = clients.acquire_notify({'mtu': 247})
+    >>> clients.notify(b'\\x01\\x02\\x03')
+
+    """
+
+    def __init__(self, eventloop=None, changed_cb=None):
+        """Default initialiser.
+
+        :param eventloop: (optional) ``async_tools.EventLoop`` used to watch
+                          the acquired sockets
+        :param changed_cb: (optional) Called with no arguments when a socket
+                           is acquired or released, so ``NotifyAcquired``
+                           and ``WriteAcquired`` can be signalled
+        """
+        if eventloop is None:
+            eventloop = async_tools.EventLoop()
+        self.eventloop = eventloop
+        self.changed_cb = changed_cb
+        self._clients = {}
+        self._notify_socks = {}
+        self._write_socks = {}
+
+    @property
+    def clients(self):
+        """Return the object paths of the devices that have been seen."""
+        return sorted(self._clients)
+
+    @property
+    def notify_acquired(self):
+        """True if a notification socket is held by BlueZ."""
+        return len(self._notify_socks) > 0
+
+    @property
+    def write_acquired(self):
+        """True if a write socket is held by BlueZ."""
+        return len(self._write_socks) > 0
+
+    def seen(self, options):
+        """Record the client given in the options of a BlueZ call.
+
+        :param options: Options dictionary passed by BlueZ
+        :return: Object path of the device or None if not given
+        """
+        device = options.get('device')
+        if device is None:
+            return None
+        device = str(device)
+        client = self._clients.setdefault(device, {'mtu': DEFAULT_MTU})
+        if 'mtu' in options:
+            client['mtu'] = int(options['mtu'])
+        client['last_seen'] = time.monotonic()
+        return device
+
+    def mtu(self, device=None):
+        """Return the ATT MTU of a client.
+
+        :param device: Object path of the device. If None the smallest MTU
+                       of all known clients is returned.
+        """
+        if device is not None and device in self._clients:
+            return self._clients[device]['mtu']
+        if not self._clients:
+            return DEFAULT_MTU
+        return min(client['mtu'] for client in self._clients.values())
+
+    def remove(self, device):
+        """Forget a client and close its sockets.
+
+        :param device: Object path of the device
+        """
+        self._clients.pop(device, None)
+        self._close(self._notify_socks, device)
+        self._close(self._write_socks, device)
+
+    def acquire_notify(self, options):
+        """Create the socket for a BlueZ ``AcquireNotify`` call.
+
+        :param options: Options dictionary passed by BlueZ
+        :return: Tuple of the socket to give to BlueZ and the MTU. The
+                 caller should close the socket once it has been sent.
+        """
+        device = self.seen(options)
+        mtu = int(options.get('mtu', self.mtu(device)))
+        ours, theirs = socket.socketpair(socket.AF_UNIX,
+                                         socket.SOCK_SEQPACKET)
+        ours.setblocking(False)
+        self._close(self._notify_socks, device, changed=False)
+        watch = self.eventloop.add_io_watch(
+            ours.fileno(),
+            lambda fd, condition: self._notify_event(device))
+        self._notify_socks[device] = (ours, watch, mtu)
+        self._changed()
+        return theirs, mtu
+
+    def acquire_write(self, options, write_cb):
+        """Create the socket for a BlueZ ``AcquireWrite`` call.
+
+        :param options: Options dictionary passed by BlueZ
+        :param write_cb: Called as ``write_cb(value, device)`` with the
+                         bytes of each write received on the socket
+        :return: Tuple of the socket to give to BlueZ and the MTU. The
+                 caller should close the socket once it has been sent.
+        """
+        device = self.seen(options)
+        mtu = int(options.get('mtu', self.mtu(device)))
+        ours, theirs = socket.socketpair(socket.AF_UNIX,
+                                         socket.SOCK_SEQPACKET)
+        ours.setblocking(False)
+        self._close(self._write_socks, device, changed=False)
+        watch = self.eventloop.add_io_watch(
+            ours.fileno(),
+            lambda fd, condition: self._write_event(device, write_cb))
+        self._write_socks[device] = (ours, watch, mtu)
+        self._changed()
+        return theirs, mtu
+
+    def notify(self, value):
+        """Write a notification to every acquired notification socket.
+
+        :param value: Bytes, a list of octets or an unsigned integer
+        :return: True if the value was written to at least one socket
+        """
+        if not self._notify_socks:
+            return False
+        value = tools.value_to_bytes(value)
+        sent = False
+        for device, (sock, watch, mtu) in list(self._notify_socks.items()):
+            payload = mtu - NOTIFY_HEADER_LENGTH
+            if len(value) > payload:
+                logger.warning('Notification of {} octets truncated to {} '
+                               'for {}'.format(len(value), payload, device))
+            try:
+                sock.send(value[:payload])
+                sent = True
+            except BlockingIOError:
+                logger.debug('Notification socket of {} full'.format(device))
+            except OSError:
+                self._close(self._notify_socks, device)
+        return sent
+
+    def release(self):
+        """Close all the acquired sockets."""
+        for device in list(self._notify_socks):
+            self._close(self._notify_socks, device)
+        for device in list(self._write_socks):
+            self._close(self._write_socks, device)
+
+    def _changed(self):
+        if self.changed_cb is not None:
+            self.changed_cb()
+
+    def _close(self, socks, device, changed=True):
+        entry = socks.pop(device, None)
+        if entry is None:
+            return
+        sock, watch, mtu = entry
+        self.eventloop.remove_io_watch(watch)
+        sock.close()
+        if changed:
+            self._changed()
+
+    def _notify_event(self, device):
+        # BlueZ does not write to a notification socket, it only closes it
+        entry = self._notify_socks.get(device)
+        if entry is None:
+            return False
+        try:
+            if entry[0].recv(1):
+                return True
+        except BlockingIOError:
+            return True
+        except OSError:
+            pass
+        self._notify_socks.pop(device)
+        entry[0].close()
+        logger.debug('Notifications released by {}'.format(device))
+        self._changed()
+        return False
+
+    def _write_event(self, device, write_cb):
+        entry = self._write_socks.get(device)
+        if entry is None:
+            return False
+        try:
+            value = entry[0].recv(entry[2])
+        except BlockingIOError:
+            return True
+        except OSError:
+            value = b''
+        if value:
+            write_cb(value, device)
+            return True
+        self._write_socks.pop(device)
+        entry[0].close()
+        logger.debug('Write socket released by {}'.format(device))
+        self._changed()
+        return False
+
+
+def default_executor():
+    """
+    Return the executor shared by handlers that return a coroutine.
+    :return: ``concurrent.futures.ThreadPoolExecutor``
+    """
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=4)
+    return _default_executor
+
+
+def _run_handler(handler, *args):
+    """Call a handler, running it to completion if it is a coroutine."""
+    result = handler(*args)
+    if asyncio.iscoroutine(result):
+        loop = asyncio.new_event_loop()
+        try:
+            result = loop.run_until_complete(result)
+        finally:
+            loop.close()
+    return result
+
+
+class HandlerRunner:
+    """Call GATT server handlers and reply to D-Bus when they complete.
+
+    A handler may return its result directly, return a
+    ``concurrent.futures.Future`` or be a coroutine function. If an
+    executor is given the handler is run in it. The reply is always made
+    from the event loop so it can be used with the ``async_callbacks`` of
+    dbus-python methods.
+
+    An ordered runner only starts a handler once the previous one has
+    replied, so the handlers of one characteristic run in the order the
+    requests arrived while those of others share the executor threads.
+
+    Work that must happen on the event loop thread, such as updating the
+    value of a characteristic, is given as ``prepare``. It runs just before
+    the handler is started, so it too keeps the order of the requests.
+
+    :Example:
+
+    >>> import concurrent.futures
+    >>> from bluezero import server_tools
+    >>> runner = server_tools.HandlerRunner(
+    >>>     concurrent.futures.ThreadPoolExecutor(max_workers=2))
+    >>> runner.call(read_sensor, reply_handler, error_handler)
+
+    """
+
+    def __init__(self, executor=None, eventloop=None, ordered=False):
+        """Default initialiser.
+
+        :param executor: (optional) ``concurrent.futures.Executor`` to run
+                         handlers in. Handlers run in the event loop if None.
+        :param eventloop: (optional) ``async_tools.EventLoop`` to reply from
+        :param ordered: (optional) Run one handler at a time, in call order
+        """
+        self.executor = executor
+        if eventloop is None:
+            eventloop = async_tools.EventLoop()
+        self.eventloop = eventloop
+        self.ordered = ordered
+        self._queue = collections.deque()
+        self._running = False
+        self._starting = False
+
+    @property
+    def pending(self):
+        """Number of calls waiting for an earlier handler to complete"""
+        return len(self._queue)
+
+    def call(self, handler, reply_handler, error_handler, *args,
+             prepare=None):
+        """Call a handler and pass its result to ``reply_handler``.
+
+        :param handler: Function called with ``args``. If None the result
+                        is None.
+        :param reply_handler: Called with the result of the handler
+        :param error_handler: Called with the exception if the handler fails
+        :param args: Arguments for the handler
+        :param prepare: (optional) Function called with no arguments in the
+                        event loop before the handler. If it raises, the
+                        handler is not called.
+        """
+        if not self.ordered:
+            self._start(handler, reply_handler, error_handler, prepare,
+                        *args)
+            return
+        self._queue.append((handler, reply_handler, error_handler, prepare,
+                            args))
+        if not self._running:
+            self._next()
+
+    def _next(self):
+        """Start the oldest queued handler of an ordered runner."""
+        while self._queue and not self._running:
+            handler, reply_handler, error_handler, prepare, args = \
+                self._queue.popleft()
+            self._running = True
+            self._starting = True
+            try:
+                self._start(handler, self._ordered_reply(reply_handler),
+                            self._ordered_reply(error_handler), prepare,
+                            *args)
+            finally:
+                self._starting = False
+
+    def _ordered_reply(self, reply_handler):
+        def _reply(result):
+            self._running = False
+            try:
+                reply_handler(result)
+            finally:
+                # Handlers completing inside _next are followed by its loop
+                if not self._starting:
+                    self._next()
+        return _reply
+
+    def _start(self, handler, reply_handler, error_handler, prepare, *args):
+        try:
+            if prepare is not None:
+                prepare()
+            if handler is None:
+                result = None
+            elif self.executor is not None:
+                result = self.executor.submit(_run_handler, handler, *args)
+            else:
+                result = handler(*args)
+                if asyncio.iscoroutine(result):
+                    result = default_executor().submit(_run_handler,
+                                                       lambda: result)
+        except Exception as error:
+            error_handler(error)
+            return
+
+        if isinstance(result, concurrent.futures.Future):
+            result.add_done_callback(
+                lambda future: self.eventloop.add_idle(
+                    self._complete, future, reply_handler, error_handler))
+        else:
+            reply_handler(result)
+
+    def _complete(self, future, reply_handler, error_handler):
+        try:
+            result = future.result()
+        except Exception as error:
+            error_handler(error)
+        else:
+            reply_handler(result)
+        return False
@@ -1,4 +1,6 @@
 """Utility functions for python-bluezero."""
+import re
+import struct
 
 
 def int_to_uint16(value_in):
@@ -46,6 +48,24 @@ def int_to_uint32(value_in):
                                                  signed=False)]
 
 
+def value_to_bytes(value):
+    """
+    Convert a characteristic value to bytes
+    :param value: bytes-like object, list of octets, string (UTF-8 encoded)
+                  or unsigned integer (shortest little endian encoding)
+    :return: bytes
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value)
+    if isinstance(value, str):
+        return value.encode('utf-8')
+    if isinstance(value, int):
+        return value.to_bytes(max(1, (value.bit_length() + 7) // 8),
+                              byteorder='little',
+                              signed=False)
+    return bytes(value)
+
+
 def bitwise_or_2lists(list1, list2):
     list_len = len(list1)
     return_list = [None] * list_len
@@ -70,62 +90,80 @@ def bitwise_xor_2lists(list1, list2):
     return return_list
 
 
+# Company identifier and advertising data type and length of iBeacons
+IBEACON_COMPANY_ID = 0x004C
+IBEACON_TYPE = b'\x02\x15'
+# iBeacon type, proximity UUID, major, minor and measured power
+IBEACON = struct.Struct('>2s16sHHb')
+
+# Service UUID of Eddystone frames
+EDDYSTONE_UUID = 'FEAA'
+# Eddystone-UID frame type, ranging data, namespace, instance and RFU
+EDDYSTONE_UID = struct.Struct('>Bb10s6s2x')
+# Eddystone-TLM frame type, version, battery voltage, temperature, advert
+# and uptime count
+EDDYSTONE_TLM = struct.Struct('>BBHhII')
+# Eddystone-TLM temperature meaning "not supported"
+EDDYSTONE_NO_TEMPERATURE = -0x8000
+
+# Eddystone-URL scheme prefixes and expansions, indexed by their codes
+URL_PREFIXES = ('http://www.', 'https://www.', 'http://', 'https://')
+URL_EXPANSIONS = ('.com/', '.org/', '.edu/', '.net/', '.info/', '.biz/',
+                  '.gov/', '.com', '.org', '.edu', '.net', '.info', '.biz',
+                  '.gov')
+
+
+def _longest_first(table):
+    """Regular expression matching the longest entry of a table."""
+    return re.compile(b'|'.join(
+        re.escape(entry.encode('ascii'))
+        for entry in sorted(table, key=len, reverse=True)))
+
+
+_URL_PREFIX_RE = _longest_first(URL_PREFIXES)
+_URL_EXPANSION_RE = _longest_first(URL_EXPANSIONS)
+_URL_PREFIX_CODES = {entry.encode('ascii'): code
+                     for code, entry in enumerate(URL_PREFIXES)}
+_URL_EXPANSION_CODES = {entry.encode('ascii'): bytes([code])
+                        for code, entry in enumerate(URL_EXPANSIONS)}
+
+
+def encode_url(url):
+    """
+    Encode a URL as in an Eddystone-URL frame
+    https://github.com/google/eddystone/blob/master/eddystone-url/README.md
+
+    The scheme is replaced by its prefix code and every expansion (e.g.
+    ``.com/``) anywhere in the URL by its code, preferring the longest.
+    :param url: URL starting with http://, https://, http://www. or
+                https://www.
+    :return: bytes of the URL scheme prefix and encoded URL
+    """
+    url = url.encode('ascii')
+    prefix = _URL_PREFIX_RE.match(url)
+    if prefix is None:
+        raise ValueError('URL must start with one of {}'.format(
+            ', '.join(URL_PREFIXES)))
+    body = _URL_EXPANSION_RE.sub(
+        lambda expansion: _URL_EXPANSION_CODES[expansion.group()],
+        url[prefix.end():])
+    return bytes([_URL_PREFIX_CODES[prefix.group()]]) + body
+
+
+def encode_urls(urls):
+    """
+    Encode many URLs as in Eddystone-URL frames
+    :param urls: iterable of URLs
+    :return: list of bytes, see :func:`encode_url`
+    """
+    return [encode_url(url) for url in urls]
+
+
 def url_to_advert(url, frame_type, tx_power):
     """
     Encode as specified
     https://github.com/google/eddystone/blob/master/eddystone-url/README.md
     :param url:
-    :return:
+    :return: list of frame type, Tx power and the encoded URL
     """
-    prefix_sel = None
-    prefix_start = None
-    prefix_end = None
-    suffix_sel = None
-    suffix_start = None
-    suffix_end = None
-
-    prefix = ('http://www.', 'https://www.', 'http://', 'https://')
-
-    suffix = ('.com/', '.org/', '.edu/', '.net/', '.info/', '.biz/', '.gov/',
-              '.com', '.org', '.edu', '.net', '.info', '.biz', '.gov'
-              )
-    encode_search = True
-
-    for x in prefix:
-        if x in url and encode_search is True:
-            # print('match prefix ' + url)
-            prefix_sel = prefix.index(x)
-            prefix_start = url.index(prefix[prefix_sel])
-            prefix_end = len(prefix[prefix_sel]) + prefix_start
-            encode_search = False
-
-    encode_search = True
-    for y in suffix:
-        if y in url and encode_search is True:
-            # print('match suffix ' + y)
-            suffix_sel = suffix.index(y)
-            suffix_start = url.index(suffix[suffix_sel])
-            suffix_end = len(suffix[suffix_sel]) + suffix_start
-            encode_search = False
-
-    service_data = [frame_type]
-    service_data.extend([tx_power])
-    if suffix_start is None:
-        suffix_start = len(url)
-        service_data.extend([prefix_sel])
-        for x in range(prefix_end, suffix_start):
-            service_data.extend([ord(url[x])])
-    elif suffix_end == len(url):
-        service_data.extend([prefix_sel])
-        for x in range(prefix_end, suffix_start):
-            service_data.extend([ord(url[x])])
-        service_data.extend([suffix_sel])
-    else:
-        service_data.extend([prefix_sel])
-        for x in range(prefix_end, suffix_start):
-            service_data.extend([ord(url[x])])
-        service_data.extend([suffix_sel])
-        for x in range(suffix_end, len(url)):
-            service_data.extend([ord(url[x])])
-
-    return service_data
+    return [frame_type, tx_power] + list(encode_url(url))
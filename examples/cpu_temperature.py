@@ -1,4 +1,5 @@
 # Standard modules
+import concurrent.futures
 import os
 import dbus
 try:
@@ -38,28 +39,33 @@ def cpu_temp_sint16(value):
     return answer
 
 
-class TemperatureChrc(localGATT.Characteristic):
+def read_temperature():
+    # Runs in a worker thread as vcgencmd can take a while
+    return dbus.Array(cpu_temp_sint16([get_cpu_temperature()]))
+
+
+class TemperatureChrc(localGATT.AsyncCharacteristic):
     def __init__(self, service):
-        localGATT.Characteristic.__init__(self,
-                                          1,
-                                          CPU_TMP_CHRC,
-                                          service,
-                                          [get_cpu_temperature()],
-                                          False,
-                                          ['read', 'notify'])
+        localGATT.AsyncCharacteristic.__init__(
+            self,
+            1,
+            CPU_TMP_CHRC,
+            service,
+            read_temperature(),
+            False,
+            ['read', 'notify'],
+            read_handler=read_temperature,
+            executor=concurrent.futures.ThreadPoolExecutor(max_workers=1))
 
     def temperature_cb(self):
-        reading = [get_cpu_temperature()]
+        self.runner.call(read_temperature, self._send_temperature, print)
+        return self.props[constants.GATT_CHRC_IFACE]['Notifying']
+
+    def _send_temperature(self, reading):
         print('Getting new temperature',
               reading,
               self.props[constants.GATT_CHRC_IFACE]['Notifying'])
-        self.props[constants.GATT_CHRC_IFACE]['Value'] = reading
-
-        self.PropertiesChanged(constants.GATT_CHRC_IFACE,
-                               {'Value': dbus.Array(cpu_temp_sint16(reading))},
-                               [])
-        print('Array value: ', cpu_temp_sint16(reading))
-        return self.props[constants.GATT_CHRC_IFACE]['Notifying']
+        self.Set(constants.GATT_CHRC_IFACE, 'Value', reading)
 
     def _update_temp_value(self):
         if not self.props[constants.GATT_CHRC_IFACE]['Notifying']:
@@ -68,17 +74,12 @@ class TemperatureChrc(localGATT.Characteristic):
         print('Starting timer event')
         GObject.timeout_add(500, self.temperature_cb)
 
-    def ReadValue(self, options):
-        return dbus.Array(
-            cpu_temp_sint16(self.props[constants.GATT_CHRC_IFACE]['Value'])
-        )
-
     def StartNotify(self):
         if self.props[constants.GATT_CHRC_IFACE]['Notifying']:
             print('Already notifying, nothing to do')
             return
         print('Notifying on')
-        self.props[constants.GATT_CHRC_IFACE]['Notifying'] = True
+        self.Set(constants.GATT_CHRC_IFACE, 'Notifying', True)
         self._update_temp_value()
 
     def StopNotify(self):
@@ -87,7 +88,7 @@ class TemperatureChrc(localGATT.Characteristic):
             return
 
         print('Notifying off')
-        self.props[constants.GATT_CHRC_IFACE]['Notifying'] = False
+        self.Set(constants.GATT_CHRC_IFACE, 'Notifying', False)
         self._update_temp_value()
 
 
@@ -118,10 +119,10 @@ class ble:
         self.app.add_managed_object(self.charc)
         self.app.add_managed_object(self.cpu_format)
 
-        self.srv_mng = GATT.GattManager(adapter.list_adapters()[0])
+        self.dongle = adapter.Adapter()
+        self.srv_mng = GATT.GattManager(self.dongle.path)
         self.srv_mng.register_application(self.app, {})
 
-        self.dongle = adapter.Adapter(adapter.list_adapters()[0])
         advert = advertisement.Advertisement(1, 'peripheral')
 
         advert.service_UUIDs = [CPU_TMP_SRVC]
@@ -129,7 +130,7 @@ class ble:
         # advert.service_data = {EDDYSTONE: eddystone_data}
         if not self.dongle.powered:
             self.dongle.powered = True
-        ad_manager = advertisement.AdvertisingManager(self.dongle.address)
+        ad_manager = advertisement.AdvertisingManager(self.dongle.path)
         ad_manager.register_advertisement(advert, {})
 
     def add_call_back(self, callback):
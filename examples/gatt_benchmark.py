@@ -0,0 +1,256 @@
+"""Measure how fast a bluezero GATT server handles reads, writes and
+notifications.
+
+The server runs in a child process on a private D-Bus daemon and this
+script plays the part of BlueZ, calling ``ReadValue``/``WriteValue`` and
+listening for ``PropertiesChanged`` directly. No Bluetooth adapter is used
+so the numbers are the cost of bluezero and D-Bus alone.
+
+Usage::
+
+    python3 gatt_benchmark.py --server localGATT --sizes 20,244 --count 2000
+
+Use ``--address`` to run against an already running bus (for example one
+started by ``python-dbusmock``).
+"""
+# Standard modules
+import argparse
+import json
+import math
+import os
+import struct
+import subprocess
+import sys
+import time
+
+import dbus
+import dbus.mainloop.glib
+try:
+    from gi.repository import GLib
+except ImportError:
+    import glib as GLib
+
+# Bluezero modules
+from bluezero import constants
+
+# constants
+BENCH_SRVC = '12341000-1234-1234-1234-123456789abc'
+BENCH_CHRC = '12341001-1234-1234-1234-123456789abc'
+# Send time of a notification, monotonic clock seconds
+STAMP = struct.Struct('<d')
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+
+
+def cpu_seconds(pid='self'):
+    """User and system CPU time of a process from /proc."""
+    with open('/proc/{}/stat'.format(pid)) as stat_file:
+        fields = stat_file.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def percentile(samples, percent):
+    """Nearest-rank percentile of the samples."""
+    ordered = sorted(samples)
+    index = max(0, int(math.ceil(percent / 100 * len(ordered))) - 1)
+    return ordered[index]
+
+
+def serve(kind):
+    """Run the GATT server and emit notifications when asked on stdin."""
+    from bluezero import async_tools
+
+    eventloop = async_tools.EventLoop()
+    flags = ['read', 'write', 'notify']
+    if kind == 'localGATT':
+        from bluezero import localGATT
+        app = localGATT.Application()
+        srv = localGATT.Service(1, BENCH_SRVC, True, app)
+        chrc = localGATT.Characteristic(1, BENCH_CHRC, srv, [0], False,
+                                        flags)
+        app.add_managed_object(srv)
+        app.add_managed_object(chrc)
+
+        def notify(value):
+            chrc.Set(constants.GATT_CHRC_IFACE, 'Value', value)
+    else:
+        from bluezero import peripheral
+        srv = peripheral.Service(BENCH_SRVC, True)
+        chrc = peripheral.Characteristic(BENCH_CHRC, flags, srv, [0])
+        srv.add_characteristic(chrc)
+        chrc.add_notify_event(lambda: None)
+        notify = chrc.send_notify_event
+
+    def send(size, count):
+        # Emit in small batches so the loop keeps serving D-Bus calls
+        for _ in range(min(count, 50)):
+            notify(STAMP.pack(time.monotonic()) + bytes(size - STAMP.size))
+        if count > 50:
+            eventloop.add_idle(send, size, count - 50)
+        return False
+
+    buffer = b''
+
+    def command(fd, condition):
+        nonlocal buffer
+        data = os.read(fd, 4096)
+        if not data:
+            eventloop.quit()
+            return False
+        buffer += data
+        while b'\n' in buffer:
+            line, buffer = buffer.split(b'\n', 1)
+            words = line.split()
+            if words[0] == b'notify':
+                eventloop.add_idle(send, int(words[1]), int(words[2]))
+            elif words[0] == b'quit':
+                eventloop.quit()
+        return True
+
+    eventloop.add_io_watch(sys.stdin.fileno(), command)
+    print(json.dumps({'name': chrc.bus.get_unique_name(),
+                      'path': chrc.path}), flush=True)
+    eventloop.run()
+
+
+class Client:
+    """Stand-in for BlueZ calling the characteristic of the server."""
+
+    def __init__(self, kind, address):
+        env = dict(os.environ, DBUS_SYSTEM_BUS_ADDRESS=address)
+        self.server = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--serve', kind],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env)
+        info = json.loads(self.server.stdout.readline().decode())
+        self.bus = dbus.bus.BusConnection(address)
+        self.chrc = dbus.Interface(
+            self.bus.get_object(info['name'], info['path']),
+            constants.GATT_CHRC_IFACE)
+        self.bus.add_signal_receiver(self._properties_changed,
+                                     'PropertiesChanged',
+                                     constants.DBUS_PROP_IFACE,
+                                     info['name'],
+                                     info['path'],
+                                     byte_arrays=True)
+        self.mainloop = GLib.MainLoop()
+        self.latencies = []
+        self.expected = 0
+        self.counting = False
+        self.last_received = None
+
+    def close(self):
+        self.server.stdin.write(b'quit\n')
+        self.server.stdin.close()
+        self.server.wait()
+
+    def _properties_changed(self, interface, changed, invalidated):
+        if not self.counting or 'Value' not in changed:
+            return
+        self.last_received = time.monotonic()
+        sent, = STAMP.unpack_from(changed['Value'])
+        self.latencies.append(self.last_received - sent)
+        if len(self.latencies) >= self.expected:
+            self.mainloop.quit()
+
+    def _measure(self, operation, count):
+        """Time count calls of operation and the CPU used on both sides."""
+        latencies = []
+        cpu_start = cpu_seconds(), cpu_seconds(self.server.pid)
+        start = time.monotonic()
+        for _ in range(count):
+            sent = time.monotonic()
+            operation()
+            latencies.append(time.monotonic() - sent)
+        elapsed = time.monotonic() - start
+        return latencies, elapsed, cpu_start
+
+    def read(self, size, count):
+        self.chrc.WriteValue(dbus.ByteArray(bytes(size)), {})
+        return self._measure(
+            lambda: self.chrc.ReadValue({}, byte_arrays=True), count)
+
+    def write(self, size, count):
+        payload = dbus.ByteArray(bytes(size))
+        return self._measure(lambda: self.chrc.WriteValue(payload, {}),
+                             count)
+
+    def notify(self, size, count):
+        self.chrc.StartNotify()
+        # Skip the signals of earlier writes still waiting to be dispatched
+        context = GLib.MainContext.default()
+        while context.pending():
+            context.iteration(False)
+        self.latencies = []
+        self.expected = count
+        self.counting = True
+        self.last_received = None
+        cpu_start = cpu_seconds(), cpu_seconds(self.server.pid)
+        start = time.monotonic()
+        self.server.stdin.write('notify {} {}\n'.format(size, count).encode())
+        self.server.stdin.flush()
+        timeout = GLib.timeout_add_seconds(60, self.mainloop.quit)
+        self.mainloop.run()
+        GLib.source_remove(timeout)
+        self.counting = False
+        self.chrc.StopNotify()
+        end = self.last_received or time.monotonic()
+        return self.latencies, end - start, cpu_start
+
+
+def benchmark(kind, sizes, count, address=None):
+    """Run every operation for every payload size and print a report."""
+    daemon = None
+    if address is None:
+        daemon = subprocess.Popen(
+            ['dbus-daemon', '--session', '--nofork', '--print-address=1'],
+            stdout=subprocess.PIPE)
+        address = daemon.stdout.readline().decode().strip()
+    dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
+    client = Client(kind, address)
+    print('{:<7}{:>6}{:>10}{:>9}{:>9}{:>9}{:>13}{:>13}'.format(
+        'op', 'bytes', 'ops/s', 'p50 ms', 'p90 ms', 'p99 ms',
+        'client us/op', 'server us/op'))
+    try:
+        for size in sizes:
+            for operation in (client.read, client.write, client.notify):
+                latencies, elapsed, cpu_start = operation(size, count)
+                client_cpu = cpu_seconds() - cpu_start[0]
+                server_cpu = cpu_seconds(client.server.pid) - cpu_start[1]
+                done = len(latencies)
+                if not done:
+                    print('{:<7}{:>6}  no replies'.format(
+                        operation.__name__, size))
+                    continue
+                print('{:<7}{:>6}{:>10.0f}{:>9.3f}{:>9.3f}{:>9.3f}'
+                      '{:>13.1f}{:>13.1f}'.format(
+                          operation.__name__, size, done / elapsed,
+                          percentile(latencies, 50) * 1000,
+                          percentile(latencies, 90) * 1000,
+                          percentile(latencies, 99) * 1000,
+                          client_cpu / done * 1e6,
+                          server_cpu / done * 1e6))
+    finally:
+        client.close()
+        if daemon is not None:
+            daemon.terminate()
+            daemon.wait()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--server', default='localGATT',
+                        choices=['localGATT', 'peripheral'],
+                        help='GATT server classes to measure')
+    parser.add_argument('--sizes', default='20,100,244,512',
+                        help='comma separated payload sizes in bytes')
+    parser.add_argument('--count', type=int, default=1000,
+                        help='operations per measurement')
+    parser.add_argument('--address',
+                        help='D-Bus address to use instead of a private bus')
+    parser.add_argument('--serve', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
+        serve(args.serve)
+    else:
+        sizes = [max(STAMP.size, int(size)) for size in args.sizes.split(',')]
+        benchmark(args.server, sizes, args.count, args.address)
@@ -13,6 +13,18 @@ coverage run --append -m unittest -v tests.test_device
 test1006=$?
 coverage run --append -m unittest -v tests.test_gatt
 test1007=$?
+coverage run --append -m unittest -v tests.test_instrumentation
+test1008=$?
+coverage run --append -m unittest -v tests.test_server_tools
+test1009=$?
+coverage run --append -m unittest -v tests.test_gatt_schema
+test1010=$?
+coverage run --append -m unittest -v tests.test_advert_parser
+test1011=$?
+coverage run --append -m unittest -v tests.test_advertisement_monitor
+test1012=$?
+coverage run --append -m unittest -v tests.test_localGATT
+test1013=$?
 coverage run --append -m unittest -v tests.test_broadcaster
 test101=$?
 coverage run --append -m unittest -v tests.test_central
@@ -33,7 +45,7 @@ lint_examples=$?
 # lint_tests=$?
 
 coverage report
-group100=$((test1001 + test1002 + test1003 + test1004 + test1005 + test1006 + test1007))
+group100=$((test1001 + test1002 + test1003 + test1004 + test1005 + test1006 + test1007 + test1008 + test1009 + test1010 + test1011 + test1012 + test1013))
 group10=$((test101 + test102))
 group1=$((test11 + test12 + test13))
 group_examples=$((test_example1))
@@ -0,0 +1,135 @@
+"""
+Stand-ins for the parts of dbus-python used by the bluezero D-Bus objects.
+
+Replacing ``dbus.service.Object`` and the method/signal decorators with
+MagicMocks turns the classes that inherit from them into mocks too. These
+fakes keep the classes real so their methods can be called, and keep the
+signature of container types so the D-Bus types sent on the wire can be
+checked.
+"""
+import sys
+import types
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import bluezero
+import tests.obj_data
+
+
+class DBusException(Exception):
+    _dbus_error_name = None
+
+    def __init__(self, *args, name=None, **kwargs):
+        Exception.__init__(self, *args)
+        if name is not None:
+            self._dbus_error_name = name
+
+    def get_dbus_name(self):
+        return self._dbus_error_name
+
+
+class Object:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def remove_from_connection(self, *args, **kwargs):
+        pass
+
+
+def _decorator(*args, **kwargs):
+    return lambda function: function
+
+
+class Array(list):
+    def __init__(self, value=(), signature=None, variant_level=0):
+        list.__init__(self, value)
+        self.signature = signature
+
+
+class Dictionary(dict):
+    def __init__(self, value=(), signature=None, variant_level=0):
+        dict.__init__(self, value)
+        self.signature = signature
+
+
+class Struct(tuple):
+    def __new__(cls, value, signature=None, variant_level=0):
+        struct = tuple.__new__(cls, value)
+        struct.signature = signature
+        return struct
+
+
+class ByteArray(bytes):
+    pass
+
+
+def _integer(name):
+    def __new__(cls, value, variant_level=0):
+        return int.__new__(cls, value)
+    return type(name, (int,), {'__new__': __new__})
+
+
+def _string(name):
+    def __new__(cls, value, variant_level=0):
+        return str.__new__(cls, value)
+    return type(name, (str,), {'__new__': __new__})
+
+
+Byte = _integer('Byte')
+Boolean = _integer('Boolean')
+Int16 = _integer('Int16')
+UInt16 = _integer('UInt16')
+Int32 = _integer('Int32')
+UInt32 = _integer('UInt32')
+String = _string('String')
+ObjectPath = _string('ObjectPath')
+
+
+def dbus_modules():
+    """Return the ``sys.modules`` entries replacing dbus and GLib."""
+    dbus_mock = MagicMock()
+    dbus_mock.PROPERTIES_IFACE = 'org.freedesktop.DBus.Properties'
+    dbus_mock.exceptions.DBusException = DBusException
+    dbus_mock.service.Object = Object
+    dbus_mock.service.method = _decorator
+    dbus_mock.service.signal = _decorator
+    for dbus_type in (Array, Dictionary, Struct, ByteArray, Byte, Boolean,
+                      Int16, UInt16, Int32, UInt32, String, ObjectPath):
+        setattr(dbus_mock, dbus_type.__name__, dbus_type)
+    dbus_mock.Interface.return_value.GetManagedObjects.return_value = \
+        tests.obj_data.full_ubits
+    dbus_mock.Interface.return_value.Introspect.return_value = \
+        tests.obj_data.bluez_introspect
+    return {
+        'dbus': dbus_mock,
+        'dbus.exceptions': dbus_mock.exceptions,
+        'dbus.service': dbus_mock.service,
+        'dbus.mainloop.glib': MagicMock(),
+        'gi.repository': MagicMock(),
+    }
+
+
+def load(test_case, module_name):
+    """
+    Import a fresh copy of a bluezero module using the fakes.
+
+    The modules and attributes of the ``bluezero`` package are restored when
+    the test finishes.
+    :param test_case: ``unittest.TestCase`` to register the clean up with
+    :param module_name: Name of the module in the bluezero package
+    :return: The module
+    """
+    module_patcher = patch.dict('sys.modules', dbus_modules())
+    package_patcher = patch.dict(bluezero.__dict__)
+    module_patcher.start()
+    package_patcher.start()
+    test_case.addCleanup(module_patcher.stop)
+    test_case.addCleanup(package_patcher.stop)
+    for name in list(sys.modules):
+        if name.startswith('bluezero.'):
+            del sys.modules[name]
+    for name, value in list(vars(bluezero).items()):
+        if isinstance(value, types.ModuleType):
+            delattr(bluezero, name)
+    __import__('bluezero.' + module_name)
+    return sys.modules['bluezero.' + module_name]
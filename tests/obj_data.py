@@ -1264,4 +1264,17 @@ full_ubits = {
             'Notifying': False,
             'UUID': 'e95dda90-251d-470a-a062-fa1922dfa9a8',
             'Flags': ['read', 'notify']},
-        'org.freedesktop.DBus.Introspectable': {}}}
\ No newline at end of file
+        'org.freedesktop.DBus.Introspectable': {}}}
+
+bluez_introspect = """<!DOCTYPE node PUBLIC "-//freedesktop//DTD D-BUS Object Introspection 1.0//EN"
+"http://www.freedesktop.org/standards/dbus/1.0/introspect.dtd">
+<node><interface name="org.freedesktop.DBus.Introspectable"><method name="Introspect"><arg name="xml" type="s" direction="out"/>
+</method></interface><interface name="org.bluez.AgentManager1"><method name="RegisterAgent"><arg name="agent" type="o" direction="in"/>
+<arg name="capability" type="s" direction="in"/>
+</method><method name="UnregisterAgent"><arg name="agent" type="o" direction="in"/>
+</method><method name="RequestDefaultAgent"><arg name="agent" type="o" direction="in"/>
+</method></interface><interface name="org.bluez.ProfileManager1"><method name="RegisterProfile"><arg name="profile" type="o" direction="in"/>
+<arg name="UUID" type="s" direction="in"/>
+<arg name="options" type="a{sv}" direction="in"/>
+</method><method name="UnregisterProfile"><arg name="profile" type="o" direction="in"/>
+</method></interface><node name="hci0"/></node>"""
@@ -81,6 +81,8 @@ class TestBluezeroAdapter(unittest.TestCase):
         dbus_mock_iface = self.dbus_mock.Interface.return_value
         dbus_mock_iface.GetManagedObjects.return_value = \
             tests.obj_data.full_ubits
+        dbus_mock_iface.Introspect.return_value = \
+            tests.obj_data.bluez_introspect
         dbus_mock_iface.Get = mock_get
         dbus_mock_iface.Set = mock_set
         dbus_mock_iface.GetAll = mock_get_all
@@ -121,6 +123,14 @@ class TestBluezeroAdapter(unittest.TestCase):
         dongle = self.module_under_test.Adapter()
         self.assertEqual(dongle.address, '00:00:00:00:5A:AD')
 
+    def test_adapter_by_name(self):
+        """
+        Test an ``Adapter`` can be created from its ``hciN`` name.
+        """
+        dongle = self.module_under_test.Adapter('hci0')
+        self.assertEqual(dongle.path, self.path)
+        self.assertEqual(dongle.address, '00:00:00:00:5A:AD')
+
     def test_get_all(self):
         """
         Test the ``get_all()`` method for retrieving all the DBus properties.
@@ -256,6 +266,141 @@ class TestBluezeroAdapter(unittest.TestCase):
         # test
         self.assertEqual(dongle.discovering, False)
 
+    def test_discovery_session(self):
+        """
+        Test a ``DiscoverySession`` starts and stops discovery.
+        """
+        dongle = self.module_under_test.Adapter(self.path)
+        stopped = []
+        session = self.module_under_test.DiscoverySession(
+            dongle, timeout=5, timeout_cb=stopped.append)
+        dongle.adapter_methods.reset_mock()
+        session.start()
+        self.assertTrue(session.running)
+        self.assertEqual(
+            1, dongle.adapter_methods.StartDiscovery.call_count)
+        session._timed_out()
+        self.assertFalse(session.running)
+        self.assertEqual(
+            1, dongle.adapter_methods.StopDiscovery.call_count)
+        self.assertListEqual([session], stopped)
+
+    def test_discovery_sessions_shared(self):
+        """
+        Test discovery only stops once the last session on an adapter stops.
+        """
+        dongle = self.module_under_test.Adapter(self.path)
+        dongle.adapter_methods.reset_mock()
+        with self.module_under_test.DiscoverySession(dongle):
+            with self.module_under_test.DiscoverySession(dongle):
+                pass
+            self.assertEqual(
+                0, dongle.adapter_methods.StopDiscovery.call_count)
+        self.assertEqual(
+            1, dongle.adapter_methods.StartDiscovery.call_count)
+        self.assertEqual(
+            1, dongle.adapter_methods.StopDiscovery.call_count)
+
+    def test_discovery_device_found(self):
+        """
+        Test only devices on the session adapter are reported.
+        """
+        dongle = self.module_under_test.Adapter('00:00:00:00:5A:AD')
+        found = []
+        session = self.module_under_test.DiscoverySession(
+            dongle, device_found_cb=lambda addr, props: found.append(addr))
+        session._interfaces_added(
+            '/org/bluez/hci0/dev_EB_F6_95_27_84_A0',
+            {constants.DEVICE_INTERFACE: {'RSSI': -60}})
+        session._interfaces_added(
+            '/org/bluez/hci1/dev_F7_17_E4_09_C0_C6',
+            {constants.DEVICE_INTERFACE: {'RSSI': -60}})
+        self.assertListEqual(['EB:F6:95:27:84:A0'], found)
+
+    def test_discovery_cached_device(self):
+        """
+        Test devices already known to BlueZ are reported once per session.
+        """
+        dongle = self.module_under_test.Adapter('00:00:00:00:5A:AD')
+        found = []
+        session = self.module_under_test.DiscoverySession(
+            dongle, device_found_cb=lambda addr, props: found.append(addr))
+        session.start()
+        self.assertEqual(2, len(session._signals))
+        cached = '/org/bluez/hci0/dev_EB_F6_95_27_84_A0'
+        session._properties_changed(constants.DEVICE_INTERFACE,
+                                    {'Connected': True}, [], path=cached)
+        self.assertListEqual([], found)
+        session._properties_changed(constants.DEVICE_INTERFACE,
+                                    {'RSSI': -70}, [], path=cached)
+        session._properties_changed(constants.DEVICE_INTERFACE,
+                                    {'RSSI': -65}, [], path=cached)
+        session._interfaces_added(
+            cached, {constants.DEVICE_INTERFACE: {'RSSI': -60}})
+        session._properties_changed(
+            constants.DEVICE_INTERFACE, {'RSSI': -70}, [],
+            path='/org/bluez/hci1/dev_F7_17_E4_09_C0_C6')
+        self.assertListEqual(['EB:F6:95:27:84:A0'], found)
+        session.stop()
+        self.assertListEqual([], session._signals)
+        session.start()
+        session._properties_changed(constants.DEVICE_INTERFACE,
+                                    {'ManufacturerData': {}}, [],
+                                    path=cached)
+        self.assertEqual(2, len(found))
+        session.stop()
+
+    def test_remove_device(self):
+        """
+        Test a device can be removed by address.
+        """
+        dongle = self.module_under_test.Adapter(self.path)
+        dongle.remove_device('EB:F6:95:27:84:A0')
+        dongle.adapter_methods.RemoveDevice.assert_called_with(
+            '/org/bluez/hci0/dev_EB_F6_95_27_84_A0')
+
+    def test_prune_devices(self):
+        """
+        Test stale devices are removed and connected or paired ones kept.
+        """
+        dongle = self.module_under_test.Adapter(self.path)
+        with patch.object(self.module_under_test.dbus_tools,
+                          'get_managed_objects',
+                          return_value=cached_devices):
+            removed = dongle.prune_devices(min_rssi=-80)
+            self.assertListEqual(['E4:43:33:7E:54:1C', 'FD:6B:11:CD:4A:9B'],
+                                 sorted(removed))
+            self.assertEqual(2, dongle.adapter_methods.RemoveDevice.call_count)
+            self.assertListEqual([], dongle.prune_devices(max_age=60))
+
+    def test_prune_devices_age(self):
+        """
+        Test devices are pruned once they have not been seen for a while.
+        """
+        dongle = self.module_under_test.Adapter(self.path)
+        with patch.object(self.module_under_test.dbus_tools,
+                          'get_managed_objects',
+                          return_value=cached_devices):
+            dongle.prune_devices()
+            dongle._tracking_start -= 120
+            dongle._device_changed(constants.DEVICE_INTERFACE,
+                                   {'RSSI': -40}, [],
+                                   '/org/bluez/hci0/dev_E4_43_33_7E_54_1C')
+            removed = dongle.prune_devices(max_age=60)
+        self.assertListEqual(['FD:6B:11:CD:4A:9B'], removed)
+
+    def test_periodic_pruning(self):
+        """
+        Test periodic pruning can be started and stopped.
+        """
+        dongle = self.module_under_test.Adapter(self.path)
+        dongle.mainloop = MagicMock()
+        dongle.start_pruning(30, unpaired=True)
+        dongle.mainloop.add_timer.assert_called_once()
+        self.assertEqual(30000, dongle.mainloop.add_timer.call_args[0][0])
+        dongle.stop_pruning()
+        dongle.mainloop.remove_timer.assert_called_once()
+
     @unittest.skip('mock of discovery not implemented')
     def test_start_discovery(self):
         """
@@ -267,6 +412,168 @@ class TestBluezeroAdapter(unittest.TestCase):
         self.assertEqual(dongle.discovering, 1)
 
 
+cached_devices = {
+    '/org/bluez/hci0': {
+        'org.bluez.Adapter1': {'Address': '00:00:00:00:5A:AD'}},
+    '/org/bluez/hci0/dev_EB_F6_95_27_84_A0': {
+        'org.bluez.Device1': {'Connected': True, 'Paired': False}},
+    '/org/bluez/hci0/dev_F7_17_E4_09_C0_C6': {
+        'org.bluez.Device1': {'Connected': False, 'Paired': True}},
+    '/org/bluez/hci0/dev_E4_43_33_7E_54_1C': {
+        'org.bluez.Device1': {'Connected': False, 'RSSI': -95}},
+    '/org/bluez/hci0/dev_FD_6B_11_CD_4A_9B': {
+        'org.bluez.Device1': {'Connected': False}},
+    '/org/bluez/hci1/dev_F7_17_E4_09_C0_C7': {
+        'org.bluez.Device1': {'Connected': False}},
+}
+
+
+two_adapters = {
+    '/org/bluez/hci0': {
+        'org.bluez.Adapter1': {'Address': '00:00:00:00:5A:AD'}},
+    '/org/bluez/hci1': {
+        'org.bluez.Adapter1': {'Address': '00:00:00:00:5A:AE'}},
+    '/org/bluez/hci0/dev_EB_F6_95_27_84_A0': {
+        'org.bluez.Device1': {'Address': 'EB:F6:95:27:84:A0',
+                              'Connected': True}},
+    '/org/bluez/hci1/dev_F7_17_E4_09_C0_C6': {
+        'org.bluez.Device1': {'Address': 'F7:17:E4:09:C0:C6',
+                              'Connected': False}},
+}
+
+
+class TestBluezeroAdapterPool(unittest.TestCase):
+    """
+    Test spreading links across several adapters.
+    """
+
+    def setUp(self):
+        """
+        Patch the DBus module with an object tree of two adapters.
+        """
+        self.dbus_mock = MagicMock()
+        self.mainloop_mock = MagicMock()
+        self.gobject_mock = MagicMock()
+
+        modules = {
+            'dbus': self.dbus_mock,
+            'dbus.mainloop.glib': self.mainloop_mock,
+            'gi.repository': self.gobject_mock,
+        }
+
+        self.module_patcher = patch.dict('sys.modules', modules)
+        self.module_patcher.start()
+
+        from bluezero import adapter
+        self.module_under_test = adapter
+        self.objects_patcher = patch.object(adapter.dbus_tools,
+                                            'get_managed_objects',
+                                            return_value=two_adapters)
+        self.objects_patcher.start()
+        self.failovers = []
+
+    def tearDown(self):
+        """
+        Stop the module patching.
+        """
+        self.objects_patcher.stop()
+        self.module_patcher.stop()
+
+    def failover_cb(self, device_addr, old_addr, new_addr):
+        self.failovers.append((device_addr, old_addr, new_addr))
+
+    def test_link_count(self):
+        """
+        Test connected devices are counted against their adapter.
+        """
+        pool = self.module_under_test.AdapterPool()
+        self.assertListEqual(['00:00:00:00:5A:AD', '00:00:00:00:5A:AE'],
+                             pool.adapters)
+        self.assertEqual(1, pool.link_count('00:00:00:00:5A:AD'))
+        self.assertEqual(0, pool.link_count('00:00:00:00:5A:AE'))
+
+    def test_acquire_least_loaded(self):
+        """
+        Test a new device goes to the adapter with fewest links.
+        """
+        pool = self.module_under_test.AdapterPool()
+        self.assertEqual('00:00:00:00:5A:AE',
+                         pool.acquire('C0:FF:EE:00:00:01'))
+        self.assertEqual('00:00:00:00:5A:AE',
+                         pool.acquire('c0:ff:ee:00:00:01'))
+        self.assertEqual(1, pool.link_count('00:00:00:00:5A:AE'))
+        pool.release('C0:FF:EE:00:00:01')
+        self.assertEqual(0, pool.link_count('00:00:00:00:5A:AE'))
+
+    def test_acquire_known_device(self):
+        """
+        Test the adapter that discovered a device is preferred.
+        """
+        pool = self.module_under_test.AdapterPool()
+        pool.acquire('C0:FF:EE:00:00:01')
+        self.assertEqual('00:00:00:00:5A:AE',
+                         pool.acquire('F7:17:E4:09:C0:C6'))
+
+    def test_link_limit(self):
+        """
+        Test the per adapter link limit.
+        """
+        pool = self.module_under_test.AdapterPool(max_links=1)
+        pool.acquire('C0:FF:EE:00:00:01')
+        self.assertRaises(self.module_under_test.AdapterError,
+                          pool.acquire, 'C0:FF:EE:00:00:02')
+        self.assertRaises(self.module_under_test.AdapterError,
+                          pool.acquire, 'C0:FF:EE:00:00:02',
+                          '00:00:00:00:5A:AE')
+
+    def test_choose(self):
+        """
+        Test choosing an adapter does not reserve a link on it.
+        """
+        pool = self.module_under_test.AdapterPool()
+        adapter_addr = pool.choose('C0:FF:EE:00:00:01')
+        self.assertEqual('00:00:00:00:5A:AE', adapter_addr)
+        self.assertEqual(0, pool.link_count(adapter_addr))
+        self.assertEqual(adapter_addr,
+                         pool.acquire('C0:FF:EE:00:00:01', adapter_addr))
+        self.assertEqual(1, pool.link_count(adapter_addr))
+
+    def test_scanner(self):
+        """
+        Test scanning is spread over the adapters.
+        """
+        pool = self.module_under_test.AdapterPool()
+        first = pool.acquire_scanner()
+        second = pool.acquire_scanner()
+        self.assertNotEqual(first, second)
+        pool.release_scanner(first)
+        self.assertEqual(0, pool.scan_count(first))
+
+    def test_failover(self):
+        """
+        Test links move to another adapter when one is removed.
+        """
+        pool = self.module_under_test.AdapterPool(
+            failover_cb=self.failover_cb)
+        pool._interfaces_removed('/org/bluez/hci0',
+                                 [constants.ADAPTER_INTERFACE])
+        self.assertListEqual(['00:00:00:00:5A:AE'], pool.adapters)
+        self.assertListEqual([('EB:F6:95:27:84:A0',
+                               '00:00:00:00:5A:AD',
+                               '00:00:00:00:5A:AE')], self.failovers)
+        self.assertEqual(1, pool.link_count('00:00:00:00:5A:AE'))
+
+    def test_disconnect_signal(self):
+        """
+        Test a disconnection frees the link.
+        """
+        pool = self.module_under_test.AdapterPool()
+        pool._properties_changed(constants.DEVICE_INTERFACE,
+                                 {'Connected': False}, [],
+                                 path='/org/bluez/hci0/dev_EB_F6_95_27_84_A0')
+        self.assertEqual(0, pool.link_count('00:00:00:00:5A:AD'))
+
+
 if __name__ == '__main__':
     # avoid writing to stderr
     unittest.main(testRunner=unittest.TextTestRunner(stream=sys.stdout,
@@ -34,6 +34,7 @@ class TestBluezeroExampleAdapter(unittest.TestCase):
             'gi.repository': self.gobject_mock,
         }
         self.dbus_mock.Interface.return_value.GetManagedObjects.return_value = tests.obj_data.full_ubits
+        self.dbus_mock.Interface.return_value.Introspect.return_value = tests.obj_data.bluez_introspect
         self.dbus_mock.Interface.return_value.Get = mock_get
         self.dbus_mock.Interface.return_value.Set = mock_set
         self.dbus_mock.SystemBus = MagicMock()
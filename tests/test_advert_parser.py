@@ -0,0 +1,64 @@
+import unittest
+
+from bluezero import advert_parser
+
+
+class TestAdvertParser(unittest.TestCase):
+    """
+    Test decoding of beacon advertisements
+    """
+    def test_ibeacon(self):
+        data = bytes.fromhex('0215' 'e2c56db5dffb48d2b060d0f5a71096e0'
+                             '0001' '0002' 'c5')
+        record = advert_parser.parse_manufacturer_data(0x004C, list(data))
+        self.assertEqual(advert_parser.IBeacon(
+            'e2c56db5-dffb-48d2-b060-d0f5a71096e0', 1, 2, -59), record)
+        self.assertIsNone(
+            advert_parser.parse_manufacturer_data(0x004C, b'\x10\x05'))
+
+    def test_altbeacon(self):
+        data = b'\xbe\xac' + bytes(range(20)) + b'\xbb\x00'
+        record = advert_parser.parse_manufacturer_data(0x0118, data)
+        self.assertEqual(advert_parser.AltBeacon(0x0118, bytes(range(20)),
+                                                 -69, 0), record)
+
+    def test_eddystone(self):
+        uid = bytes.fromhex('00ec' '8b0ca750e7a74e14bd99' '000000000001'
+                            '0000')
+        self.assertEqual(
+            advert_parser.EddystoneUID(bytes.fromhex('8b0ca750e7a74e14bd99'),
+                                       bytes.fromhex('000000000001'), -20),
+            advert_parser.parse_service_data(
+                '0000feaa-0000-1000-8000-00805f9b34fb', uid))
+        url = [0x10, 0x08, 0x00, 0x63, 0x73, 0x72, 0x00, 0x61, 0x62]
+        self.assertEqual(advert_parser.EddystoneURL('http://www.csr.com/ab',
+                                                    8),
+                         advert_parser.parse_service_data('FEAA', url))
+        tlm = bytes.fromhex('2000' '0bb8' '1580' '000004b0' '00000e15')
+        self.assertEqual(advert_parser.EddystoneTLM(3000, 21.5, 1200, 360.5),
+                         advert_parser.parse_service_data('feaa', tlm))
+        tlm = bytes.fromhex('2000' '0000' '8000' '00000000' '00000000')
+        self.assertIsNone(
+            advert_parser.parse_service_data('feaa', tlm).temperature)
+        self.assertIsNone(advert_parser.parse_service_data('180F', b'\x64'))
+
+    def test_parse(self):
+        records = advert_parser.parse({
+            'Name': 'BBC micro:bit [zezet]',
+            'ManufacturerData': {0x0006: [0x01, 0x09]},
+            'ServiceData': {'0000feaa-0000-1000-8000-00805f9b34fb':
+                            [0x10, 0x00, 0x03, 0x61, 0x07]}})
+        self.assertListEqual(
+            [advert_parser.EddystoneURL('https://a.com', 0),
+             advert_parser.Microbit('BBC micro:bit [zezet]', 'zezet')],
+            records)
+
+    def test_register(self):
+        advert_parser.register_manufacturer_parser(
+            0xFFFF, lambda company_id, data: ('test', data))
+        self.assertEqual(('test', b'\x01'),
+                         advert_parser.parse_manufacturer_data(0xFFFF, [1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import MagicMock
 from unittest.mock import patch
+import tests.dbus_fakes
 import tests.obj_data
 from bluezero import constants
 
@@ -41,6 +42,7 @@ class TestBluezeroAdvertisement(unittest.TestCase):
             'gi.repository': self.gobject_mock,
         }
         self.dbus_mock.Interface.return_value.GetManagedObjects.return_value = tests.obj_data.full_ubits
+        self.dbus_mock.Interface.return_value.Introspect.return_value = tests.obj_data.bluez_introspect
         self.dbus_mock.Interface.return_value.Get = mock_get
         self.dbus_mock.Interface.return_value.Set = mock_set
         self.dbus_mock.return_value
@@ -64,4 +66,105 @@ class TestBluezeroAdvertisement(unittest.TestCase):
         ad_manager = self.module_under_test.AdvertisingManager('/org/bluez/hci0')
         ad_manager.register_advertisement(beacon, {})
         result = self.module_tools.get_managed_objects()['/org/bluez/hci0']['org.bluez.LEAdvertisingManager1']
-        self.assertDictEqual({}, result)
\ No newline at end of file
+        self.assertDictEqual({}, result)
+
+    def test_manager_tracking(self):
+        beacon = MagicMock()
+        ad_manager = self.module_under_test.AdvertisingManager()
+        ad_manager.register_advertisement(beacon, {})
+        self.assertIs(ad_manager, beacon.ad_manager)
+        ad_manager.unregister_advertisement(beacon)
+        self.assertIsNone(beacon.ad_manager)
+
+    def test_manager_capabilities(self):
+        ad_manager = self.module_under_test.AdvertisingManager()
+        ad_manager.advert_mngr_props = MagicMock()
+        ad_manager.advert_mngr_props.Get.return_value = ['1M', '2M']
+        self.assertListEqual(['1M', '2M'],
+                             ad_manager.supported_secondary_channels)
+        ad_manager.advert_mngr_props.Get.assert_called_with(
+            'org.bluez.LEAdvertisingManager1', 'SupportedSecondaryChannels')
+        ad_manager.advert_mngr_props.Get.return_value = {'MaxAdvLen': 251}
+        self.assertEqual(251, ad_manager.supported_capabilities['MaxAdvLen'])
+
+    def test_data_size(self):
+        size = self.module_under_test.advertising_data_size
+        self.assertEqual(0, size({'Type': 'broadcast'}))
+        self.assertEqual(30, size({'Type': 'broadcast',
+                                   'ManufacturerData': {0x004C: bytes(23)},
+                                   'IncludeTxPower': True}))
+        self.assertEqual(3 + 6 + 18 + 6, size({
+            'Type': 'peripheral',
+            'ServiceUUIDs': ['FEAA', '180F',
+                             '12341000-1234-1234-1234-123456789abc'],
+            'ServiceData': {'FEAA': [0x10, 0x00]}}))
+
+    def test_planner(self):
+        planner = self.module_under_test.AdvertisingPlanner(
+            payloads=2, refresh_period=1.5, instances=2)
+        plan = planner.plan()
+        self.assertEqual(500, plan.interval)
+        self.assertIsNone(plan.duration)
+        self.assertAlmostEqual(3, plan.events)
+        self.assertAlmostEqual(0.001128, plan.airtime)
+        self.assertAlmostEqual(0.004512, plan.duty_cycle)
+
+    def test_planner_max_interval(self):
+        planner = self.module_under_test.AdvertisingPlanner(
+            payloads=1, refresh_period=60, repeats=1)
+        self.assertEqual(10240, planner.plan().interval)
+        planner.secondary_channel = '1M'
+        self.assertEqual(60000, planner.plan().interval)
+
+    def test_planner_rotation(self):
+        planner = self.module_under_test.AdvertisingPlanner(
+            payloads=4, refresh_period=2, instances=2, max_duty_cycle=0.002)
+        plan = planner.plan()
+        self.assertEqual(1, plan.duration)
+        self.assertEqual(2, plan.refresh_period)
+        self.assertEqual(1128, plan.interval)
+        self.assertLessEqual(plan.duty_cycle, 0.002)
+        adverts = [MagicMock() for _ in range(4)]
+        ad_manager = MagicMock()
+        planner.apply(adverts, ad_manager)
+        adverts[3].set_properties.assert_called_once_with(
+            {'MinInterval': 1128, 'MaxInterval': 1128, 'Duration': 1})
+        self.assertEqual(4, ad_manager.register_advertisement.call_count)
+        self.assertRaises(ValueError, planner.apply, adverts[:1])
+
+    def test_planner_extended(self):
+        planner = self.module_under_test.AdvertisingPlanner(
+            payloads=1, refresh_period=0.03, payload_size=100,
+            secondary_channel='2M')
+        self.assertTrue(planner.extended)
+        plan = planner.plan()
+        self.assertAlmostEqual(0.00108, plan.airtime)
+        self.assertEqual(20, plan.interval)
+
+
+class TestAdvertisementTypes(unittest.TestCase):
+    """
+    Test the D-Bus types of advertisement properties
+    """
+    def setUp(self):
+        self.module_under_test = tests.dbus_fakes.load(self, 'advertisement')
+
+    def test_update_types(self):
+        dbus = self.module_under_test.dbus
+        beacon = self.module_under_test.Advertisement(None, 'broadcast')
+        beacon.PropertiesChanged = MagicMock()
+        beacon.update({'ServiceData': {'FEAA': [0x10, 0x00, 0x01]},
+                       'ManufacturerData': {0x004C: b'\x02\x15'}})
+        interface, changed, invalidated = \
+            beacon.PropertiesChanged.call_args[0]
+        for name, key_type in (('ServiceData', dbus.String),
+                               ('ManufacturerData', dbus.UInt16)):
+            for key, value in changed[name].items():
+                self.assertIsInstance(key, key_type)
+                self.assertEqual('y', value.signature)
+        self.assertListEqual([0x10, 0x00, 0x01],
+                             changed['ServiceData']['FEAA'])
+        self.assertListEqual([0x02, 0x15],
+                             changed['ManufacturerData'][0x004C])
+        props = beacon.GetAll(constants.LE_ADVERTISEMENT_IFACE)
+        self.assertEqual('y', props['ServiceData']['FEAA'].signature)
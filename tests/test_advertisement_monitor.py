@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import MagicMock
+from unittest.mock import patch
+import tests.obj_data
+
+
+class TestAdvertisementMonitorManager(unittest.TestCase):
+    """
+    Test registering advertisement monitors with an adapter
+    """
+    def setUp(self):
+        """
+        Patch the DBus module
+        :return:
+        """
+        self.dbus_mock = MagicMock()
+        self.dbus_exception_mock = MagicMock()
+        self.dbus_service_mock = MagicMock()
+        self.mainloop_mock = MagicMock()
+        self.gobject_mock = MagicMock()
+
+        modules = {
+            'dbus': self.dbus_mock,
+            'dbus.exceptions': self.dbus_exception_mock,
+            'dbus.service': self.dbus_service_mock,
+            'dbus.mainloop.glib': self.mainloop_mock,
+            'gi.repository': self.gobject_mock,
+        }
+        self.dbus_mock.Interface.return_value.GetManagedObjects.\
+            return_value = tests.obj_data.full_ubits
+        self.dbus_mock.Interface.return_value.Introspect.return_value = \
+            tests.obj_data.bluez_introspect
+        self.module_patcher = patch.dict('sys.modules', modules)
+        self.module_patcher.start()
+        from bluezero import advertisement_monitor
+        self.module_under_test = advertisement_monitor
+
+    def tearDown(self):
+        self.module_patcher.stop()
+
+    def manager(self):
+        manager = self.module_under_test.AdvertisementMonitorManager()
+        manager.manager_methods = MagicMock()
+        return manager
+
+    def test_adapter_path(self):
+        manager = self.module_under_test.AdvertisementMonitorManager()
+        self.assertEqual('/org/bluez/hci0', manager.manager_path)
+        manager.bus.get_object.assert_called_with('org.bluez',
+                                                  '/org/bluez/hci0')
+
+    def test_add_monitor(self):
+        manager = self.manager()
+        with patch.object(self.module_under_test,
+                          'MonitorApplication') as app_mock, \
+                patch.object(self.module_under_test,
+                             'AdvertisementMonitor') as monitor_mock:
+            patterns = [(0, self.module_under_test.AD_TYPE_COMPLETE_NAME,
+                         b'BBC')]
+            found = MagicMock()
+            first = manager.add_monitor(patterns, found, rssi_low=-90)
+            manager.add_monitor(patterns)
+        self.assertIs(monitor_mock.return_value, first)
+        app_mock.assert_called_once_with()
+        monitor_mock.assert_any_call(app_mock.return_value, patterns, found,
+                                     None, rssi_low=-90)
+        self.assertEqual(1, manager.manager_methods.RegisterMonitor.call_count)
+        self.assertTrue(manager.registered)
+        manager.quit()
+        manager.manager_methods.UnregisterMonitor.assert_called_once_with(
+            app_mock.return_value.get_path.return_value)
+        self.assertFalse(manager.registered)
+
+    def test_register_error(self):
+        manager = self.manager()
+        manager.register_application(MagicMock())
+        error_handler = \
+            manager.manager_methods.RegisterMonitor.call_args[1]['error_handler']
+        error_handler('Not supported')
+        self.assertFalse(manager.registered)
+
+    def test_unregister_nothing(self):
+        manager = self.manager()
+        manager.unregister_application()
+        manager.manager_methods.UnregisterMonitor.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
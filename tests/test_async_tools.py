@@ -41,3 +41,14 @@ class TestDbusModuleCalls(unittest.TestCase):
 
     def test_call_timer(self):
         self.module_under_test.add_timer(1000, print)
+
+    def test_call_remove_timer(self):
+        source_id = self.module_under_test.add_timer(1000, print)
+        self.module_under_test.remove_timer(source_id)
+
+    def test_call_io_watch(self):
+        source_id = self.module_under_test.add_io_watch(0, print)
+        self.module_under_test.remove_io_watch(source_id)
+
+    def test_call_idle(self):
+        self.module_under_test.add_idle(print, 'idle')
@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import MagicMock
 from unittest.mock import patch
+import tests.dbus_fakes
 import tests.obj_data
 from bluezero import constants
 
@@ -35,6 +36,7 @@ class TestBluezeroBroadcaster(unittest.TestCase):
             'gi.repository': self.gobject_mock,
         }
         self.dbus_mock.Interface.return_value.GetManagedObjects.return_value = tests.obj_data.full_ubits
+        self.dbus_mock.Interface.return_value.Introspect.return_value = tests.obj_data.bluez_introspect
         self.dbus_mock.Interface.return_value.Get = mock_get
         self.dbus_mock.Interface.return_value.Set = mock_set
         self.dbus_mock.SystemBus = MagicMock()
@@ -54,6 +56,88 @@ class TestBluezeroBroadcaster(unittest.TestCase):
 
     def test_beacon_default_adapter(self):
         my_beacon = self.module_under_test.Beacon()
+
+    def test_beacon_context(self):
+        with patch.object(self.module_under_test,
+                          'advertisement') as advert_mock:
+            with self.module_under_test.Beacon() as beacon:
+                beacon.start()
+            beacon.stop()
+        ad_manager = advert_mock.AdvertisingManager.return_value
+        advert_mock.AdvertisingManager.assert_called_once_with(
+            beacon.dongle.path)
+        ad_manager.register_advertisement.assert_called_once_with(
+            beacon.broadcaster, {})
+        ad_manager.unregister_advertisement.assert_called_once_with(
+            beacon.broadcaster)
+
+    def test_manufacturer_data(self):
+        with patch.object(self.module_under_test,
+                          'advertisement') as advert_mock:
+            beacon = self.module_under_test.Beacon()
+            beacon.add_manufacturer_data(0x004C, [0x02, 0x15])
+            beacon.add_manufacturer_data(0xFFFF, b'\x01')
+        self.assertDictEqual({0x004C: b'\x02\x15', 0xFFFF: b'\x01'},
+                             beacon.broadcaster.manufacturer_data)
+
+    def test_ibeacon(self):
+        data = self.module_under_test.ibeacon(
+            'e2c56db5-dffb-48d2-b060-d0f5a71096e0', 1, 2)
+        self.assertEqual(bytes.fromhex('0215e2c56db5dffb48d2b060d0f5a71096e0'
+                                       '00010002c5'), data)
+
+    def test_pack_too_big(self):
+        with self.assertLogs('bluezero.broadcaster', 'WARNING'):
+            data = self.module_under_test.pack_manufacturer_data('<28s',
+                                                                 bytes(28))
+        self.assertEqual(28, len(data))
+        self.module_under_test.pack_manufacturer_data('<28s', bytes(28),
+                                                      extended=True)
+
+    def rotating_beacon(self, **kwargs):
+        with patch.object(self.module_under_test,
+                          'advertisement') as advert_mock:
+            advert_mock.Advertisement.side_effect = \
+                lambda *args: MagicMock()
+            beacon = self.module_under_test.RotatingBeacon(**kwargs)
+            beacon.eventloop = MagicMock()
+            beacon.add_service_frame('FEAA', [0x10, 0x00], dwell=0.5)
+            beacon.add_manufacturer_frame(0x004C, [0x02, 0x15], dwell=2)
+            beacon.add_service_frame('FEAA', [0x20, 0x00], dwell=1)
+            beacon.start(blocking=False)
+        advert_mock.AdvertisingManager.assert_called_once_with(
+            beacon.dongle.path)
+        return beacon, advert_mock.AdvertisingManager.return_value
+
+    def test_rotating_beacon(self):
+        beacon, ad_manager = self.rotating_beacon(instances=2)
+        first, second = beacon.adverts
+        self.assertEqual(2, ad_manager.register_advertisement.call_count)
+        frame = first.set_properties.call_args[0][0]
+        self.assertListEqual(['FEAA'], frame['ServiceUUIDs'])
+        self.assertIsNone(frame['ManufacturerData'])
+        frame = second.set_properties.call_args[0][0]
+        self.assertIsNone(frame['ServiceData'])
+        beacon.eventloop.add_timer.assert_called_once()
+        interval, callback = beacon.eventloop.add_timer.call_args[0]
+        self.assertEqual(500, interval)
+        self.assertFalse(callback())
+        self.assertEqual(1, beacon.switches)
+        first.set_properties.assert_called_with(beacon.frames[2][0])
+        self.assertEqual(1000, beacon.eventloop.add_timer.call_args[0][0])
+        self.assertEqual(2, ad_manager.register_advertisement.call_count)
+        beacon.stop()
+        beacon.eventloop.remove_timer.assert_called_once()
+        self.assertEqual(2, ad_manager.unregister_advertisement.call_count)
+
+    def test_rotating_beacon_reregister(self):
+        beacon, ad_manager = self.rotating_beacon(reregister=True)
+        callback = beacon.eventloop.add_timer.call_args[0][1]
+        callback()
+        ad_manager.unregister_advertisement.assert_called_once_with(
+            beacon.adverts[0])
+        self.assertEqual(2, ad_manager.register_advertisement.call_count)
+        self.assertEqual(2000, beacon.eventloop.add_timer.call_args[0][0])
     #
     # def test_beacon_specified_adapter(self):
     #     beacon2 = self.module_under_test.Beacon('00:00:00:00:5A:AD')
@@ -64,3 +148,16 @@ class TestBluezeroBroadcaster(unittest.TestCase):
     #                                            0x72, 0x00, 0x61, 0x62, 0x6f,
     #                                            0x75, 0x74])
     #     self.assertEqual(my_beacon.serivce)
+
+
+class TestBeaconPaths(unittest.TestCase):
+    """
+    Test that beacons can be used together
+    """
+    def setUp(self):
+        self.module_under_test = tests.dbus_fakes.load(self, 'broadcaster')
+
+    def test_two_beacons(self):
+        first = self.module_under_test.Beacon()
+        second = self.module_under_test.Beacon()
+        self.assertNotEqual(first.broadcaster.path, second.broadcaster.path)
@@ -37,6 +37,7 @@ class TestBluezeroCentral(unittest.TestCase):
             'gi.repository': self.gobject_mock,
         }
         self.dbus_mock.Interface.return_value.GetManagedObjects.return_value = tests.obj_data.full_ubits
+        self.dbus_mock.Interface.return_value.Introspect.return_value = tests.obj_data.bluez_introspect
         self.dbus_mock.Interface.return_value.Get = mock_get
         self.dbus_mock.Interface.return_value.Set = mock_set
         self.module_patcher = patch.dict('sys.modules', modules)
@@ -62,3 +63,17 @@ class TestBluezeroCentral(unittest.TestCase):
         # Test for the UUID
         self.assertEqual(test_central.connected, True)
 
+
+    def test_pool_connect_failure(self):
+        """Test the link reserved for a connection is released on failure."""
+        pool = MagicMock()
+        pool.choose.return_value = self.adapter_addr
+        test_central = self.module_under_test.Central(
+            device_addr=self.device_addr, adapter_pool=pool)
+        pool.acquire.assert_not_called()
+        test_central.rmt_device.connect = MagicMock(
+            side_effect=RuntimeError('connection failed'))
+        self.assertRaises(RuntimeError, test_central.connect)
+        pool.acquire.assert_called_once_with(test_central.rmt_device.address,
+                                             test_central.dongle.address)
+        pool.release.assert_called_once_with(test_central.rmt_device.address)
@@ -36,6 +36,7 @@ class TestDbusModuleCalls(unittest.TestCase):
             'subprocess': self.process_mock
         }
         self.dbus_mock.Interface.return_value.GetManagedObjects.return_value = tests.obj_data.full_ubits
+        self.dbus_mock.Interface.return_value.Introspect.return_value = tests.obj_data.bluez_introspect
         self.process_mock.check_output = self.get_bluetooth_service
         self.process_mock.Popen.return_value.communicate.return_value = (b'5.43\n', None)
         self.module_patcher = patch.dict('sys.modules', modules)
@@ -76,6 +77,26 @@ class TestDbusModuleCalls(unittest.TestCase):
                                                            profile='e95df2d8-251d-470a-a062-fa1922dfa9a8')
         self.assertEqual(None, my_iface)
 
+    def test_adapter_paths(self):
+        self.assertListEqual(['/org/bluez/hci0'],
+                             self.module_under_test.get_adapter_paths())
+
+    def test_adapter_path_by_name(self):
+        self.assertEqual('/org/bluez/hci1',
+                         self.module_under_test.get_adapter_path('hci1'))
+
+    def test_adapter_path_by_address(self):
+        iface = MagicMock()
+        iface.Introspect.return_value = tests.obj_data.bluez_introspect
+        iface.Get.return_value = '00:00:00:00:5A:AD'
+        with patch.object(self.module_under_test, 'get_dbus_iface',
+                          return_value=iface):
+            self.assertEqual('/org/bluez/hci0',
+                             self.module_under_test.get_adapter_path('00:00:00:00:5a:ad'))
+            self.assertRaises(self.module_under_test.AdapterError,
+                              self.module_under_test.get_adapter_path,
+                              '00:00:00:00:5A:AE')
+
     def test_bluez_version(self):
         bluez_ver = self.module_under_test.bluez_version()
         self.assertEqual('5.43', bluez_ver)
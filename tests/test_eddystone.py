@@ -36,6 +36,7 @@ class TestBluezeroEddystone(unittest.TestCase):
             'gi.repository': self.gobject_mock,
         }
         self.dbus_mock.Interface.return_value.GetManagedObjects.return_value = tests.obj_data.full_ubits
+        self.dbus_mock.Interface.return_value.Introspect.return_value = tests.obj_data.bluez_introspect
         self.dbus_mock.Interface.return_value.Get = mock_get
         self.dbus_mock.Interface.return_value.Set = mock_set
         self.dbus_mock.SystemBus = MagicMock()
@@ -52,3 +53,61 @@ class TestBluezeroEddystone(unittest.TestCase):
 
     def test_load(self):
         self.module_under_test.EddystoneURL('http://camjam.me')
+
+    def test_uid_frame(self):
+        frame = self.module_under_test.UIDFrame(
+            bytes.fromhex('8b0ca750e7a74e14bd99'),
+            bytes.fromhex('000000000001'), -20)
+        self.assertEqual(20, len(frame))
+        self.assertEqual(
+            bytes([0x00, 0xEC, 0x8B, 0x0C, 0xA7, 0x50, 0xE7, 0xA7, 0x4E, 0x14,
+                   0xBD, 0x99, 0x00, 0x00, 0x00, 0x00, 0x00, 0x01, 0x00,
+                   0x00]),
+            frame.service_data['FEAA'])
+        self.assertRaises(ValueError, self.module_under_test.UIDFrame,
+                          b'short', b'123456')
+
+    def test_tlm_frame(self):
+        frame = self.module_under_test.TLMFrame(battery=3000)
+        self.assertEqual(bytearray([0x20, 0x00, 0x0B, 0xB8, 0x80, 0x00,
+                                    0, 0, 0, 0, 0, 0, 0, 0]), frame.data)
+        data = frame.data
+        frame.update(temperature=21.5, adv_count=1200, uptime=360.5)
+        self.assertIs(data, frame.data)
+        self.assertEqual(bytearray([0x20, 0x00, 0x0B, 0xB8, 0x15, 0x80,
+                                    0x00, 0x00, 0x04, 0xB0,
+                                    0x00, 0x00, 0x0E, 0x15]), frame.data)
+        frame.update(adv_count=1201)
+        self.assertEqual(bytearray([0x00, 0x00, 0x04, 0xB1,
+                                    0x00, 0x00, 0x0E, 0x15]), frame.data[6:])
+
+    def test_eid_frame(self):
+        frame = self.module_under_test.EIDFrame(bytes(range(8)), -10)
+        self.assertEqual(bytearray([0x30, 0xF6, 0, 1, 2, 3, 4, 5, 6, 7]),
+                         frame.data)
+        frame.update(bytes(range(8, 16)))
+        self.assertEqual(bytearray(range(8, 16)), frame.data[2:])
+        self.assertRaises(ValueError, frame.update, b'\x01')
+
+    def test_url_non_blocking(self):
+        with patch.object(self.module_under_test,
+                          'broadcaster') as broadcaster_mock:
+            with self.module_under_test.EddystoneURL(
+                    'http://camjam.me', blocking=False) as url_beacon:
+                beacon = broadcaster_mock.Beacon.return_value
+                beacon.start_beacon.assert_not_called()
+                beacon.stop.assert_not_called()
+        self.assertIs(beacon, url_beacon.beacon)
+        beacon.stop.assert_called_once_with()
+
+    def test_url_frame(self):
+        frame = self.module_under_test.URLFrame('http://camjam.me/')
+        self.assertListEqual([0x10, 0x08, 0x02, 0x63, 0x61, 0x6D, 0x6A,
+                              0x61, 0x6D, 0x2E, 0x6D, 0x65, 0x2F],
+                             list(frame.data))
+
+    def test_url_frame_size(self):
+        frame = self.module_under_test.URLFrame('http://abcdefghijklmnopq')
+        self.assertEqual(20, len(frame))
+        self.assertRaises(ValueError, self.module_under_test.URLFrame,
+                          'http://abcdefghijklmnopqr')
@@ -0,0 +1,152 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+
+SCHEMA = {
+    'services': [{
+        'uuid': '180F',
+        'characteristics': [{
+            'name': 'battery_level',
+            'uuid': '2A19',
+            'flags': ['read', 'notify'],
+            'value': 100,
+            'presentation': {'format': 'uint8', 'unit': '27AD'},
+            'description': 'Battery'}]}, {
+        'uuid': '12341000-1234-1234-1234-123456789abc',
+        'primary': False,
+        'characteristics': [{
+            'uuid': '12341001-1234-1234-1234-123456789abc',
+            'presentation': {'format': 'sint16', 'exponent': -2},
+            'value': -150,
+            'descriptors': [{'uuid': '2900', 'value': [1, 0]}]}]}]
+}
+
+
+class TestGattSchema(unittest.TestCase):
+    """
+    Test loading and compiling GATT schemas
+    """
+    def setUp(self):
+        """
+        Patch the DBus module
+        :return:
+        """
+        self.dbus_mock = MagicMock()
+        self.dbus_exception_mock = MagicMock()
+        self.dbus_service_mock = MagicMock()
+        self.mainloop_mock = MagicMock()
+        self.gobject_mock = MagicMock()
+
+        modules = {
+            'dbus': self.dbus_mock,
+            'dbus.exceptions': self.dbus_exception_mock,
+            'dbus.service': self.dbus_service_mock,
+            'dbus.mainloop.glib': self.mainloop_mock,
+            'gi.repository': self.gobject_mock,
+        }
+        self.module_patcher = patch.dict('sys.modules', modules)
+        self.module_patcher.start()
+        from bluezero import gatt_schema
+        self.module_under_test = gatt_schema
+
+    def tearDown(self):
+        self.module_patcher.stop()
+
+    def test_presentation_format(self):
+        self.assertListEqual(
+            [0x0E, 0xFE, 0x2F, 0x27, 0x01, 0x00, 0x00],
+            self.module_under_test.presentation_format('sint16', -2, 0x272F))
+        self.assertRaises(ValueError,
+                          self.module_under_test.presentation_format, 'int7')
+
+    def test_encode_value(self):
+        encode_value = self.module_under_test.encode_value
+        self.assertListEqual([0x6A, 0xFF], encode_value(-150, 'sint16'))
+        self.assertListEqual([0x41, 0x42], encode_value('AB'))
+        self.assertListEqual([], encode_value(None))
+        self.assertRaises(ValueError, encode_value, -1)
+        self.assertRaises(ValueError, encode_value, 1.5)
+        self.assertRaises(ValueError, encode_value, 300, 'uint8')
+        self.assertListEqual([0x01, 0x00, 0x00], encode_value(1, 'uint24'))
+        self.assertListEqual([0x06, 0x05, 0x04, 0x03, 0x02, 0x01],
+                             encode_value(0x010203040506, 'uint48'))
+        self.assertListEqual([0xFF, 0xFF, 0xFF], encode_value(-1, 'sint24'))
+        self.assertRaises(ValueError, encode_value, 1 << 24, 'uint24')
+
+    def test_load(self):
+        schema = self.module_under_test.load(
+            io.StringIO(json.dumps(SCHEMA)))
+        self.assertEqual(2, len(schema))
+        battery = schema[0]['characteristics'][0]
+        self.assertEqual(1, battery['id'])
+        self.assertListEqual([100], battery['value'])
+        self.assertListEqual(
+            [{'id': 1, 'uuid': '2901', 'value': [0x42, 0x61, 0x74, 0x74,
+                                                 0x65, 0x72, 0x79],
+              'flags': ['read']},
+             {'id': 2, 'uuid': '2904',
+              'value': [0x04, 0x00, 0xAD, 0x27, 0x01, 0x00, 0x00],
+              'flags': ['read']}],
+            battery['descriptors'])
+        custom = schema[1]['characteristics'][0]
+        self.assertFalse(schema[1]['primary'])
+        self.assertEqual(custom['uuid'], custom['name'])
+        self.assertListEqual(['read'], custom['flags'])
+        self.assertListEqual([0x6A, 0xFF], custom['value'])
+        self.assertEqual('2900', custom['descriptors'][0]['uuid'])
+
+    def test_load_text(self):
+        self.assertListEqual([], self.module_under_test.load('services: []'))
+        self.assertEqual(2, len(self.module_under_test.load(
+            json.dumps(SCHEMA))))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'schema')
+            with open(path, 'w') as schema_file:
+                json.dump(SCHEMA, schema_file)
+            self.assertEqual(2, len(self.module_under_test.load(path)))
+        self.assertRaises(OSError, self.module_under_test.load,
+                          'missing.yaml')
+
+    def test_load_error(self):
+        self.assertRaises(ValueError, self.module_under_test.load,
+                          {'services': [{'characteristics': []}]})
+
+    def test_load_negative_value(self):
+        schema = {'services': [{'uuid': '180F', 'characteristics': [
+            {'name': 'offset', 'uuid': '2A19', 'value': -1}]}]}
+        with self.assertRaisesRegex(ValueError, 'offset'):
+            self.module_under_test.load(schema)
+
+    def test_load_duplicate_name(self):
+        schema = {'services': [{'uuid': '180F', 'characteristics': [
+            {'name': 'level', 'uuid': '2A19'},
+            {'name': 'level', 'uuid': '2A1A'}]}]}
+        with self.assertRaisesRegex(ValueError, 'level'):
+            self.module_under_test.load(schema)
+        schema = {'services': [
+            {'uuid': '180F', 'characteristics': [{'uuid': '2A19'}]},
+            {'uuid': '180F', 'characteristics': [{'uuid': '2A19'}]}]}
+        with self.assertRaisesRegex(ValueError, '2A19'):
+            self.module_under_test.load(schema)
+
+    def test_database(self):
+        with patch.object(self.module_under_test, 'localGATT') as gatt_mock:
+            database = self.module_under_test.Database(SCHEMA)
+        application = gatt_mock.Application.return_value
+        self.assertEqual(2, gatt_mock.Service.call_count)
+        gatt_mock.Service.assert_any_call(2, SCHEMA['services'][1]['uuid'],
+                                          False, application)
+        self.assertEqual(2, gatt_mock.Characteristic.call_count)
+        self.assertEqual(4, gatt_mock.Descriptor.call_count)
+        self.assertEqual(8, application.add_managed_object.call_count)
+        self.assertIs(gatt_mock.Characteristic.return_value,
+                      database['battery_level'])
+
+
+if __name__ == '__main__':
+    unittest.main()
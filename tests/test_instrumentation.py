@@ -0,0 +1,124 @@
+import unittest
+from unittest.mock import MagicMock
+from unittest.mock import patch
+from bluezero import constants
+
+
+class TestInstrumentation(unittest.TestCase):
+    """
+    Test the recording of D-Bus operations
+    """
+    def setUp(self):
+        """
+        Patch the DBus module
+        :return:
+        """
+        self.dbus_mock = MagicMock()
+        self.mainloop_mock = MagicMock()
+        self.gobject_mock = MagicMock()
+
+        modules = {
+            'dbus': self.dbus_mock,
+            'dbus.mainloop.glib': self.mainloop_mock,
+            'gi.repository': self.gobject_mock,
+        }
+        self.module_patcher = patch.dict('sys.modules', modules)
+        self.module_patcher.start()
+        from bluezero import instrumentation
+        self.module_under_test = instrumentation
+        self.recorder = instrumentation.enable()
+
+    def tearDown(self):
+        self.module_under_test.disable()
+        self.module_patcher.stop()
+
+    def test_disabled_returns_interface(self):
+        self.module_under_test.disable()
+        iface = MagicMock()
+        self.assertIs(iface, self.module_under_test.wrap_interface(
+            iface, constants.ADAPTER_INTERFACE))
+
+    def test_method_call(self):
+        iface = MagicMock()
+        iface.StartDiscovery.return_value = None
+        wrapped = self.module_under_test.wrap_interface(
+            iface, constants.ADAPTER_INTERFACE)
+        wrapped.StartDiscovery()
+        wrapped.StartDiscovery()
+        result = self.module_under_test.snapshot()
+        stats = result['method'][constants.ADAPTER_INTERFACE]['StartDiscovery']
+        self.assertEqual(2, stats['count'])
+        self.assertEqual(0, stats['errors'])
+
+    def test_property_get(self):
+        iface = MagicMock()
+        iface.Get.return_value = 'linaro-alip'
+        wrapped = self.module_under_test.wrap_interface(
+            iface, constants.DBUS_PROP_IFACE)
+        self.assertEqual('linaro-alip',
+                         wrapped.Get(constants.ADAPTER_INTERFACE, 'Name'))
+        result = self.module_under_test.snapshot()
+        stats = result['get'][constants.ADAPTER_INTERFACE]['Name']
+        self.assertEqual(1, stats['count'])
+        self.assertEqual(len('linaro-alip') + 5, stats['bytes_in'])
+
+    def test_method_error(self):
+        iface = MagicMock()
+        iface.Connect.side_effect = RuntimeError('failed')
+        wrapped = self.module_under_test.wrap_interface(
+            iface, constants.DEVICE_INTERFACE)
+        self.assertRaises(RuntimeError, wrapped.Connect)
+        result = self.module_under_test.snapshot()
+        stats = result['method'][constants.DEVICE_INTERFACE]['Connect']
+        self.assertEqual(1, stats['errors'])
+
+    def test_async_reply(self):
+        iface = MagicMock()
+        replies = []
+        wrapped = self.module_under_test.wrap_interface(
+            iface, constants.GATT_MANAGER_IFACE)
+        wrapped.RegisterApplication('/ukBaz/bluezero', {},
+                                    reply_handler=lambda: replies.append(1),
+                                    error_handler=print)
+        self.assertEqual({}, self.module_under_test.snapshot())
+        iface.RegisterApplication.call_args[1]['reply_handler']()
+        self.assertListEqual([1], replies)
+        result = self.module_under_test.snapshot()
+        self.assertEqual(
+            1,
+            result['method'][constants.GATT_MANAGER_IFACE][
+                'RegisterApplication']['count'])
+
+    def test_signal(self):
+        received = []
+        handler = self.module_under_test.wrap_signal_handler(
+            lambda *args, **kwargs: received.append(args),
+            constants.DBUS_OM_IFACE, 'InterfacesAdded')
+        handler('/org/bluez/hci0/dev_00', {constants.DEVICE_INTERFACE: {}})
+        self.assertEqual(1, len(received))
+        result = self.module_under_test.snapshot()
+        self.assertEqual(
+            1,
+            result['signal'][constants.DBUS_OM_IFACE][
+                'InterfacesAdded']['count'])
+
+    def test_prometheus(self):
+        iface = MagicMock()
+        wrapped = self.module_under_test.wrap_interface(
+            iface, constants.ADAPTER_INTERFACE)
+        wrapped.StopDiscovery()
+        text = self.module_under_test.to_prometheus()
+        self.assertIn('# TYPE bluezero_dbus_calls_total counter', text)
+        self.assertIn('bluezero_dbus_calls_total{kind="method",'
+                      'interface="org.bluez.Adapter1",'
+                      'member="StopDiscovery"} 1', text)
+
+    def test_payload_size(self):
+        size = self.module_under_test.payload_size
+        self.assertEqual(7, size(b'abc'))
+        self.assertEqual(4 + 4 + 4, size([1, 2]))
+        self.assertEqual(4 + 6 + 4, size({'a': 1}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+from unittest.mock import MagicMock
+import tests.dbus_fakes
+from bluezero import constants
+
+
+class TestLocalGATT(unittest.TestCase):
+    """
+    Test the D-Bus objects of a local GATT server
+    """
+    def setUp(self):
+        self.module_under_test = tests.dbus_fakes.load(self, 'localGATT')
+        self.app = self.module_under_test.Application()
+        self.service = self.module_under_test.Service(1, '180F', True,
+                                                      self.app)
+        self.chrc = self.module_under_test.Characteristic(
+            1, '2A19', self.service, [100], False, ['read', 'notify'])
+        self.app.add_managed_object(self.service)
+        self.app.add_managed_object(self.chrc)
+
+    def test_cache_reused(self):
+        objects = self.app.GetManagedObjects()
+        self.assertIs(objects, self.app.GetManagedObjects())
+        self.assertListEqual([self.service.path, self.chrc.path],
+                             list(objects))
+
+    def test_cache_rebuilt(self):
+        objects = self.app.GetManagedObjects()
+        desc = self.module_under_test.Descriptor(1, '2901', self.chrc,
+                                                 [0x42], ['read'])
+        self.app.add_managed_object(desc)
+        with_desc = self.app.GetManagedObjects()
+        self.assertIsNot(objects, with_desc)
+        self.assertIn(desc.path, with_desc)
+        self.app.remove_managed_object(desc)
+        self.assertNotIn(desc.path, self.app.GetManagedObjects())
+        self.app.remove_managed_object(self.chrc)
+        self.assertListEqual([self.service.path],
+                             list(self.app.GetManagedObjects()))
+
+    def test_cache_current_values(self):
+        objects = self.app.GetManagedObjects()
+        self.chrc.Set(constants.GATT_CHRC_IFACE, 'Value', [50])
+        self.assertIs(objects, self.app.GetManagedObjects())
+        self.assertListEqual(
+            [50], objects[self.chrc.path][constants.GATT_CHRC_IFACE]['Value'])
+
+    def test_acquire_notify(self):
+        self.chrc.enable_acquire(notify=True)
+        self.chrc.PropertiesChanged = MagicMock()
+        self.chrc.AcquireNotify({'device': '/org/bluez/hci0/dev_A'})
+        props = self.app.GetManagedObjects()[self.chrc.path][
+            constants.GATT_CHRC_IFACE]
+        self.assertTrue(props['NotifyAcquired'])
+        self.chrc.clients.release()
+        self.assertFalse(props['NotifyAcquired'])
+        self.assertListEqual(
+            [{'NotifyAcquired': True}, {'NotifyAcquired': False}],
+            [call[0][1] for call in
+             self.chrc.PropertiesChanged.call_args_list])
+
+    def test_property_types(self):
+        dbus = self.module_under_test.dbus
+        desc = self.module_under_test.Descriptor(1, '2901', self.chrc,
+                                                 [0x42], ['read'])
+        service_props = self.service.GetAll(constants.GATT_SERVICE_IFACE)
+        self.assertIsInstance(service_props['UUID'], dbus.String)
+        self.assertIsInstance(service_props['Primary'], dbus.Boolean)
+        chrc_props = self.chrc.GetAll(constants.GATT_CHRC_IFACE)
+        self.assertEqual('sv', chrc_props.signature)
+        self.assertIsInstance(chrc_props['Service'], dbus.ObjectPath)
+        self.assertIsInstance(chrc_props['Notifying'], dbus.Boolean)
+        self.assertEqual('y', chrc_props['Value'].signature)
+        self.assertEqual('s', chrc_props['Flags'].signature)
+        desc_props = desc.GetAll(constants.GATT_DESC_IFACE)
+        self.assertIsInstance(desc_props['Characteristic'], dbus.ObjectPath)
+        self.assertEqual('y', desc_props['Value'].signature)
+        self.assertIs(chrc_props['Value'], self.chrc.ReadValue({}))
+
+    def test_set_converts(self):
+        dbus = self.module_under_test.dbus
+        self.chrc.PropertiesChanged = MagicMock()
+        self.chrc.Set(constants.GATT_CHRC_IFACE, 'Value', [1, 2])
+        value = self.chrc.Get(constants.GATT_CHRC_IFACE, 'Value')
+        self.assertListEqual([1, 2], value)
+        self.assertEqual('y', value.signature)
+        interface, changed, invalidated = \
+            self.chrc.PropertiesChanged.call_args[0]
+        self.assertEqual('sv', changed.signature)
+        self.assertIs(value, changed['Value'])
+        self.chrc.Set(constants.GATT_CHRC_IFACE, 'Notifying', True)
+        self.assertIsInstance(
+            self.chrc.Get(constants.GATT_CHRC_IFACE, 'Notifying'),
+            dbus.Boolean)
+
+    def test_start_stop_notify(self):
+        self.chrc.PropertiesChanged = MagicMock()
+        self.chrc.StartNotify()
+        self.assertTrue(
+            self.chrc.Get(constants.GATT_CHRC_IFACE, 'Notifying'))
+        self.chrc.StartNotify()
+        self.assertEqual(1, self.chrc.PropertiesChanged.call_count)
+
+        self.chrc.set_notify_rate(10)
+        scheduler = self.chrc._scheduler
+        scheduler.cancel = MagicMock()
+        self.chrc.StopNotify()
+        self.assertFalse(
+            self.chrc.Get(constants.GATT_CHRC_IFACE, 'Notifying'))
+        scheduler.cancel.assert_called_once_with()
+        self.chrc.StopNotify()
+        self.assertEqual(2, self.chrc.PropertiesChanged.call_count)
+        scheduler.cancel.assert_called_once_with()
+
+
+if __name__ == '__main__':
+    unittest.main()
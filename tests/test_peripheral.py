@@ -1,6 +1,9 @@
+import concurrent.futures
+import sys
 import unittest
 from unittest.mock import MagicMock
 from unittest.mock import patch
+import tests.dbus_fakes
 import tests.obj_data
 from bluezero import constants
 
@@ -47,3 +50,192 @@ class TestBluezeroMicrobit(unittest.TestCase):
 
     def test_load(self):
         my_blinkt = self.module_under_test.Service('2404', True)
+
+
+class TestPeripheralCharacteristic(unittest.TestCase):
+    """
+    Test reading and writing characteristic values
+    """
+    def setUp(self):
+        self.module_under_test = tests.dbus_fakes.load(self, 'peripheral')
+        self.service = self.module_under_test.Service('180F', True)
+        self.replies = []
+        self.errors = []
+
+    def characteristic(self, value=None):
+        return self.module_under_test.Characteristic(
+            '2A19', ['read', 'write', 'notify'], self.service, value)
+
+    def read(self, chrc, options=None):
+        chrc.ReadValue(options or {}, self.replies.append,
+                       self.errors.append)
+
+    def write(self, chrc, value, options=None):
+        chrc.WriteValue(value, options or {},
+                        lambda: self.replies.append(None),
+                        self.errors.append)
+
+    def test_multi_byte_value(self):
+        chrc = self.characteristic([0x01, 0x02, 0x03])
+        self.read(chrc)
+        self.assertListEqual([b'\x01\x02\x03'], self.replies)
+        chrc = self.characteristic(0x1234)
+        self.assertEqual(bytearray(b'\x34\x12'), chrc.value)
+        self.assertEqual(0x1234, chrc.int_value)
+        self.write(chrc, b'\x00' * 20)
+        self.assertEqual(20, len(chrc.value))
+
+    def test_read_offset(self):
+        chrc = self.characteristic(b'\x01\x02\x03')
+        self.read(chrc, {'offset': 1})
+        self.read(chrc, {'offset': 3})
+        self.assertListEqual([b'\x02\x03', b''], self.replies)
+        self.read(chrc, {'offset': 4})
+        self.assertEqual(1, len(self.errors))
+        self.assertIsInstance(self.errors[0],
+                              self.module_under_test.InvalidOffsetException)
+
+    def test_write_offset(self):
+        chrc = self.characteristic(b'\x01\x02\x03')
+        self.write(chrc, b'\x09\x08', {'offset': 2})
+        self.assertEqual(bytearray(b'\x01\x02\x09\x08'), chrc.value)
+        self.write(chrc, b'\x07', {'offset': 5})
+        self.assertIsInstance(self.errors[-1],
+                              self.module_under_test.InvalidOffsetException)
+        self.write(chrc, bytes(509), {'offset': 4})
+        self.assertIsInstance(
+            self.errors[-1],
+            self.module_under_test.InvalidValueLengthException)
+        self.assertEqual(bytearray(b'\x01\x02\x09\x08'), chrc.value)
+        self.write(chrc, bytes(513))
+        self.assertIsInstance(
+            self.errors[-1],
+            self.module_under_test.InvalidValueLengthException)
+        self.assertEqual(3, len(self.errors))
+        self.assertListEqual([None], self.replies)
+
+    def test_read_callback(self):
+        chrc = self.characteristic(b'\x01')
+        chrc.add_read_event(lambda: [0x05, 0x06])
+        self.read(chrc)
+        self.assertListEqual([b'\x05\x06'], self.replies)
+        self.assertEqual(bytearray(b'\x05\x06'), chrc.value)
+        chrc.add_read_event(lambda: None)
+        self.read(chrc)
+        self.assertEqual(b'\x05\x06', self.replies[-1])
+
+        def failing_read():
+            raise ValueError('sensor missing')
+        chrc.add_read_event(failing_read)
+        self.read(chrc)
+        self.assertEqual(1, len(self.errors))
+        self.assertIsInstance(self.errors[0], ValueError)
+
+    def test_write_callback(self):
+        chrc = self.characteristic()
+        written = []
+        chrc.add_write_event(lambda: written.append(bytes(chrc.value)))
+        self.write(chrc, b'\x0a\x0b')
+        self.assertListEqual([b'\x0a\x0b'], written)
+        self.assertListEqual([None], self.replies)
+
+        def failing_write():
+            raise ValueError('storage full')
+        chrc.add_write_event(failing_write)
+        self.write(chrc, b'\x0c')
+        self.assertEqual(1, len(self.errors))
+        self.assertIsInstance(self.errors[0], ValueError)
+
+    def test_read_after_write(self):
+        idle = []
+        chrc = self.characteristic(b'\x01')
+        chrc._handlers.eventloop = MagicMock()
+        chrc._handlers.eventloop.add_idle.side_effect = \
+            lambda *args: idle.append(args)
+        written = concurrent.futures.Future()
+        chrc.add_write_event(lambda: written)
+        self.write(chrc, b'\x02\x03')
+        self.read(chrc, {'offset': 1})
+        self.read(chrc)
+        self.assertEqual(bytearray(b'\x02\x03'), chrc.value)
+        self.assertListEqual([], self.replies)
+        self.assertEqual(2, chrc._handlers.pending)
+        written.set_result(None)
+        callback, *args = idle.pop()
+        callback(*args)
+        self.assertListEqual([None, b'\x03', b'\x02\x03'], self.replies)
+
+
+class TestPeripheralApplication(unittest.TestCase):
+    """
+    Test the cached GetManagedObjects response
+    """
+    def setUp(self):
+        self.module_under_test = tests.dbus_fakes.load(self, 'peripheral')
+        self.app = self.module_under_test.Application()
+        self.service = self.module_under_test.Service('180F', True)
+        self.app.add_service(self.service)
+
+    def test_cache_reused(self):
+        objects = self.app.GetManagedObjects()
+        self.assertIs(objects, self.app.GetManagedObjects())
+        self.assertListEqual([self.service.path], list(objects))
+
+    def test_cache_rebuilt(self):
+        objects = self.app.GetManagedObjects()
+        chrc = self.module_under_test.Characteristic(
+            '2A19', ['read'], self.service)
+        self.service.add_characteristic(chrc)
+        with_chrc = self.app.GetManagedObjects()
+        self.assertIsNot(objects, with_chrc)
+        self.assertIn(chrc.path, with_chrc)
+
+        desc = self.module_under_test.Descriptor('2901', ['read'], chrc)
+        chrc.add_descriptor(desc)
+        with_desc = self.app.GetManagedObjects()
+        self.assertIsNot(with_chrc, with_desc)
+        self.assertIn(desc.path, with_desc)
+        self.assertListEqual(
+            [desc.path],
+            with_desc[chrc.path][constants.GATT_CHRC_IFACE]['Descriptors'])
+
+        chrc.remove_descriptor(desc)
+        self.assertNotIn(desc.path, self.app.GetManagedObjects())
+        self.service.remove_characteristic(chrc)
+        self.assertNotIn(chrc.path, self.app.GetManagedObjects())
+        self.app.remove_service(self.service)
+        self.assertDictEqual({}, self.app.GetManagedObjects())
+
+    def test_acquire_notify(self):
+        chrc = self.module_under_test.Characteristic(
+            '2A19', ['read', 'notify'], self.service)
+        self.service.add_characteristic(chrc)
+        chrc.enable_acquire(notify=True, write=True)
+        chrc.PropertiesChanged = MagicMock()
+        objects = self.app.GetManagedObjects()
+        self.assertFalse(objects[chrc.path][constants.GATT_CHRC_IFACE][
+            'NotifyAcquired'])
+
+        chrc.AcquireNotify({'device': '/org/bluez/hci0/dev_A', 'mtu': 27})
+        chrc.PropertiesChanged.assert_called_once_with(
+            constants.GATT_CHRC_IFACE, {'NotifyAcquired': True}, [])
+        objects = self.app.GetManagedObjects()
+        self.assertTrue(objects[chrc.path][constants.GATT_CHRC_IFACE][
+            'NotifyAcquired'])
+        self.assertFalse(objects[chrc.path][constants.GATT_CHRC_IFACE][
+            'WriteAcquired'])
+
+        # BlueZ releases the notifications by closing its end
+        glib = sys.modules['gi.repository'].GLib
+        watch_cb = glib.io_add_watch.call_args[0][3]
+        chrc.PropertiesChanged.reset_mock()
+        self.assertFalse(watch_cb(None, None))
+        chrc.PropertiesChanged.assert_called_once_with(
+            constants.GATT_CHRC_IFACE, {'NotifyAcquired': False}, [])
+        objects = self.app.GetManagedObjects()
+        self.assertFalse(objects[chrc.path][constants.GATT_CHRC_IFACE][
+            'NotifyAcquired'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,302 @@
+import concurrent.futures
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+
+class TestNotificationScheduler(unittest.TestCase):
+    """
+    Test the rate limiting of notifications
+    """
+    def setUp(self):
+        """
+        Patch the DBus module
+        :return:
+        """
+        self.dbus_mock = MagicMock()
+        self.mainloop_mock = MagicMock()
+        self.gobject_mock = MagicMock()
+
+        modules = {
+            'dbus': self.dbus_mock,
+            'dbus.mainloop.glib': self.mainloop_mock,
+            'gi.repository': self.gobject_mock,
+        }
+        self.module_patcher = patch.dict('sys.modules', modules)
+        self.module_patcher.start()
+        from bluezero import server_tools
+        self.module_under_test = server_tools
+        self.now = 100.0
+        self.clock_patcher = patch.object(server_tools.time, 'monotonic',
+                                          lambda: self.now)
+        self.clock_patcher.start()
+        self.sent = []
+        self.eventloop = MagicMock()
+
+    def tearDown(self):
+        self.clock_patcher.stop()
+        self.module_patcher.stop()
+
+    def scheduler(self, **kwargs):
+        return self.module_under_test.NotificationScheduler(
+            self.sent.append, eventloop=self.eventloop, **kwargs)
+
+    def test_no_limit(self):
+        scheduler = self.scheduler()
+        scheduler.submit(1)
+        scheduler.submit([2, 3])
+        self.assertListEqual([b'\x01', b'\x02\x03'], self.sent)
+        self.eventloop.add_timer.assert_not_called()
+
+    def test_coalesce(self):
+        scheduler = self.scheduler(max_rate=10)
+        scheduler.submit(b'a')
+        scheduler.submit(b'b')
+        scheduler.submit(b'c')
+        self.assertListEqual([b'a'], self.sent)
+        self.assertEqual(1, self.eventloop.add_timer.call_count)
+        self.assertEqual(101, self.eventloop.add_timer.call_args[0][0])
+        self.now += 0.1
+        scheduler._timed_out()
+        self.assertListEqual([b'a', b'c'], self.sent)
+        stats = scheduler.stats
+        self.assertEqual(3, stats['submitted'])
+        self.assertEqual(2, stats['sent'])
+        self.assertEqual(1, stats['coalesced'])
+        self.assertAlmostEqual(0.1, stats['max_latency'])
+
+    def test_batch(self):
+        scheduler = self.scheduler(max_rate=10, batch=True, mtu=9)
+        scheduler.submit(b'00')
+        for sample in (b'11', b'22', b'33', b'44'):
+            scheduler.submit(sample)
+        self.now += 0.1
+        scheduler._timed_out()
+        self.assertListEqual([b'00', b'223344'], self.sent)
+        self.assertEqual(1, scheduler.stats['dropped'])
+        self.assertEqual(4, scheduler.stats['samples_sent'])
+
+    def test_batch_too_big(self):
+        scheduler = self.scheduler(batch=True)
+        self.assertRaises(ValueError, scheduler.submit, bytes(21))
+
+    def test_cancel(self):
+        scheduler = self.scheduler(max_rate=1)
+        scheduler.submit(b'a')
+        scheduler.submit(b'b')
+        scheduler.cancel()
+        self.eventloop.remove_timer.assert_called_once()
+        self.assertEqual(0, scheduler.pending)
+        self.assertEqual(1, scheduler.stats['dropped'])
+
+
+class TestAllocatePath(unittest.TestCase):
+    """
+    Test unique object paths are handed out
+    """
+    def setUp(self):
+        modules = {
+            'dbus': MagicMock(),
+            'dbus.mainloop.glib': MagicMock(),
+            'gi.repository': MagicMock(),
+        }
+        self.module_patcher = patch.dict('sys.modules', modules)
+        self.module_patcher.start()
+        from bluezero import server_tools
+        self.module_under_test = server_tools
+
+    def tearDown(self):
+        self.module_patcher.stop()
+
+    def test_allocate(self):
+        allocate_path = self.module_under_test.allocate_path
+        first = allocate_path('/test/app')
+        second = allocate_path('/test/app')
+        third = allocate_path('/test/app')
+        self.assertEqual('/test/app', first)
+        self.assertEqual('/test/app1', second)
+        self.assertEqual('/test/app2', third)
+        self.module_under_test.release_path(second)
+        self.assertEqual('/test/app1', allocate_path('/test/app'))
+
+
+class TestClientTracker(unittest.TestCase):
+    """
+    Test per-client state and acquired sockets
+    """
+    def setUp(self):
+        modules = {
+            'dbus': MagicMock(),
+            'dbus.mainloop.glib': MagicMock(),
+            'gi.repository': MagicMock(),
+        }
+        self.module_patcher = patch.dict('sys.modules', modules)
+        self.module_patcher.start()
+        from bluezero import server_tools
+        self.eventloop = MagicMock()
+        self.clients = server_tools.ClientTracker(eventloop=self.eventloop)
+        self.device = '/org/bluez/hci0/dev_EB_F6_95_27_84_A0'
+
+    def tearDown(self):
+        self.clients.release()
+        self.module_patcher.stop()
+
+    def test_seen(self):
+        self.assertIsNone(self.clients.seen({}))
+        self.clients.seen({'device': self.device, 'mtu': 185})
+        self.clients.seen({'device': '/org/bluez/hci0/dev_00'})
+        self.assertEqual(2, len(self.clients.clients))
+        self.assertEqual(185, self.clients.mtu(self.device))
+        self.assertEqual(23, self.clients.mtu())
+
+    def test_acquire_notify(self):
+        self.assertFalse(self.clients.notify(b'\x01'))
+        bluez_sock, mtu = self.clients.acquire_notify({'device': self.device,
+                                                       'mtu': 27})
+        self.assertEqual(27, mtu)
+        self.assertTrue(self.clients.notify_acquired)
+        self.assertTrue(self.clients.notify(bytes(range(30))))
+        self.assertEqual(bytes(range(24)), bluez_sock.recv(100))
+        bluez_sock.close()
+        self.assertFalse(self.clients.notify(b'\x01'))
+        self.assertFalse(self.clients.notify_acquired)
+
+    def test_acquire_write(self):
+        written = []
+        bluez_sock, mtu = self.clients.acquire_write(
+            {'device': self.device},
+            lambda value, device: written.append((value, device)))
+        self.assertTrue(self.clients.write_acquired)
+        callback = self.eventloop.add_io_watch.call_args[0][1]
+        bluez_sock.send(b'\x10\x20')
+        self.assertTrue(callback(None, None))
+        self.assertListEqual([(b'\x10\x20', self.device)], written)
+        bluez_sock.close()
+        self.assertFalse(callback(None, None))
+        self.assertFalse(self.clients.write_acquired)
+
+
+class TestHandlerRunner(unittest.TestCase):
+    """
+    Test handlers are called and replied to
+    """
+    def setUp(self):
+        modules = {
+            'dbus': MagicMock(),
+            'dbus.mainloop.glib': MagicMock(),
+            'gi.repository': MagicMock(),
+        }
+        self.module_patcher = patch.dict('sys.modules', modules)
+        self.module_patcher.start()
+        from bluezero import server_tools
+        self.module_under_test = server_tools
+        self.eventloop = MagicMock()
+        self.eventloop.add_idle.side_effect = lambda callback, *args: \
+            callback(*args)
+        self.replies = []
+        self.errors = []
+
+    def tearDown(self):
+        self.module_patcher.stop()
+
+    def call(self, handler, executor=None):
+        runner = self.module_under_test.HandlerRunner(
+            executor, eventloop=self.eventloop)
+        runner.call(handler, self.replies.append, self.errors.append)
+
+    def test_direct(self):
+        self.call(lambda: b'\x01')
+        self.assertListEqual([b'\x01'], self.replies)
+        self.eventloop.add_idle.assert_not_called()
+
+    def test_executor(self):
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            self.call(lambda: b'\x02', executor)
+        self.assertListEqual([b'\x02'], self.replies)
+        self.eventloop.add_idle.assert_called_once()
+
+    def test_coroutine(self):
+        async def read():
+            return b'\x03'
+        self.call(read)
+        for attempt in range(100):
+            if self.replies:
+                break
+            time.sleep(0.01)
+        self.assertListEqual([b'\x03'], self.replies)
+
+    def test_error(self):
+        def read():
+            raise ValueError('no reading')
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            self.call(read, executor)
+        self.assertEqual(1, len(self.errors))
+        self.call(read)
+        self.assertEqual(2, len(self.errors))
+
+    def test_ordered(self):
+        idle = []
+        self.eventloop.add_idle.side_effect = lambda *args: idle.append(args)
+        futures = [concurrent.futures.Future() for _ in range(3)]
+        started = []
+
+        def write(number):
+            started.append(number)
+            return futures[number]
+        runner = self.module_under_test.HandlerRunner(
+            eventloop=self.eventloop, ordered=True)
+        for number in range(3):
+            runner.call(write, self.replies.append, self.errors.append,
+                        number)
+        self.assertListEqual([0], started)
+        self.assertEqual(2, runner.pending)
+        futures[1].set_result(b'\x01')
+        futures[0].set_exception(ValueError('write failed'))
+        callback, *args = idle.pop()
+        callback(*args)
+        self.assertEqual(1, len(self.errors))
+        self.assertListEqual([0, 1], started)
+        futures[2].set_result(b'\x02')
+        while idle:
+            callback, *args = idle.pop(0)
+            callback(*args)
+        self.assertListEqual([b'\x01', b'\x02'], self.replies)
+        self.assertEqual(0, runner.pending)
+
+    def test_ordered_inline(self):
+        runner = self.module_under_test.HandlerRunner(
+            eventloop=self.eventloop, ordered=True)
+        for number in range(3):
+            runner.call(lambda value: value, self.replies.append,
+                        self.errors.append, number)
+        self.assertListEqual([0, 1, 2], self.replies)
+
+
+    def test_prepare(self):
+        threads = []
+        runner = self.module_under_test.HandlerRunner(
+            eventloop=self.eventloop, ordered=True)
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            runner.executor = executor
+            runner.call(lambda: threads.append(threading.get_ident()),
+                        self.replies.append, self.errors.append,
+                        prepare=lambda: threads.append(
+                            threading.get_ident()))
+        self.assertEqual(threading.get_ident(), threads[0])
+        self.assertNotEqual(threading.get_ident(), threads[1])
+
+        def invalid():
+            raise ValueError('invalid value')
+        handler = MagicMock()
+        runner.call(handler, self.replies.append, self.errors.append,
+                    prepare=invalid)
+        runner.call(None, self.replies.append, self.errors.append)
+        handler.assert_not_called()
+        self.assertEqual(1, len(self.errors))
+        self.assertListEqual([None, None], self.replies)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -53,6 +53,17 @@ class TestDbusModuleCalls(unittest.TestCase):
             [0x10, 0x00, 0x00, 0x63, 0x73, 0x72,
              0x00, 0x61, 0x62, 0x6f, 0x75, 0x74])
 
+    def test_encode_url(self):
+        encode_url = self.module_under_test.encode_url
+        self.assertEqual(b'\x03go\x00x\x07',
+                         encode_url('https://go.com/x.com'))
+        self.assertEqual(b'\x02a\x0b.b\x04',
+                         encode_url('http://a.info.b.info/'))
+        self.assertRaises(ValueError, encode_url, 'ftp://a.com')
+        self.assertListEqual([b'\x00csr\x07', b'\x02camjam.me/'],
+                             self.module_under_test.encode_urls(
+                                 ['http://www.csr.com', 'http://camjam.me/']))
+
     def test_IntToUint32_with_zeros(self):
         little_endian = self.module_under_test.int_to_uint32(2094)
         self.assertListEqual(little_endian, [0x2E, 0x08, 0x00, 0x00])
@@ -152,6 +163,14 @@ class TestDbusModuleCalls(unittest.TestCase):
         result = self.module_under_test.int_to_uint16(0b1111111011101111)
         self.assertEqual(result, [0xEF, 0xFE])
 
+    def test_value_to_bytes(self):
+        value_to_bytes = self.module_under_test.value_to_bytes
+        self.assertEqual(b'\x00', value_to_bytes(0))
+        self.assertEqual(b'\x34\x12', value_to_bytes(0x1234))
+        self.assertEqual(b'\x01\x02', value_to_bytes([1, 2]))
+        self.assertEqual(b'abc', value_to_bytes(memoryview(b'abc')))
+        self.assertEqual(b'abc', value_to_bytes('abc'))
+
     def test_bytes_to_xyz(self):
         # result = self.module_under_test.bytes_to_xyz([32, 176, 40,239, 96, 84])
         result = self.module_under_test.bytes_to_xyz([0x20, 0x00, 0xD0, 0x00, 0x20, 0xFC])